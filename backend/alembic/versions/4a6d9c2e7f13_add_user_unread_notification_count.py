@@ -0,0 +1,32 @@
+"""add user unread notification count
+
+Revision ID: 4a6d9c2e7f13
+Revises: e3f7a2c5d8b1
+Create Date: 2026-10-17 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a6d9c2e7f13'
+down_revision = 'e3f7a2c5d8b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('unread_notification_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE users SET unread_notification_count = (
+            SELECT count(*) FROM notifications
+            WHERE notifications.user_id = users.id AND notifications.is_read IS NOT TRUE
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'unread_notification_count')
@@ -0,0 +1,48 @@
+"""unique payment per lease and due date
+
+Revision ID: 5b8e2f41c9d3
+Revises: 1c2a7b7af2f1
+Create Date: 2026-10-17 09:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2f41c9d3'
+down_revision = '1c2a7b7af2f1'
+branch_labels = None
+depends_on = None
+
+
+# Ligne conservée par (lease_id, due_date) : un paiement réglé d'abord, sinon le plus ancien
+_KEEPER = """
+    SELECT k.id FROM payments k
+    WHERE k.lease_id = {alias}.lease_id AND k.due_date = {alias}.due_date
+    ORDER BY CASE WHEN k.status = 'paid' OR k.payment_date IS NOT NULL THEN 0 ELSE 1 END, k.id
+    LIMIT 1
+"""
+
+
+def upgrade() -> None:
+    # Fusion des doublons existants : l'historique des relances est rattaché à la ligne
+    # conservée, les autres lignes sont supprimées, puis la contrainte est posée.
+    op.execute(
+        f"""
+        UPDATE reminder_history SET payment_id = (
+            SELECT ({_KEEPER.format(alias="p")}) FROM payments p WHERE p.id = reminder_history.payment_id
+        )
+        WHERE payment_id IS NOT NULL
+        """
+    )
+    op.execute(
+        f"""
+        DELETE FROM payments
+        WHERE id <> ({_KEEPER.format(alias="payments")})
+        """
+    )
+    op.create_unique_constraint('uq_payments_lease_id_due_date', 'payments', ['lease_id', 'due_date'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_payments_lease_id_due_date', 'payments', type_='unique')
@@ -0,0 +1,39 @@
+"""create checkout sessions
+
+Revision ID: b7e1d4f9a2c6
+Revises: 4a6d9c2e7f13
+Create Date: 2026-10-17 15:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e1d4f9a2c6'
+down_revision = '4a6d9c2e7f13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'checkout_sessions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('reference', sa.String(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('stripe_id', sa.String(), nullable=True),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('reference', 'amount', 'currency', name='uq_checkout_sessions_reference_amount_currency'),
+    )
+    op.create_index(op.f('ix_checkout_sessions_id'), 'checkout_sessions', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_checkout_sessions_id'), table_name='checkout_sessions')
+    op.drop_table('checkout_sessions')
@@ -0,0 +1,39 @@
+"""create stripe events
+
+Revision ID: c2f8a6b3d914
+Revises: b7e1d4f9a2c6
+Create Date: 2026-10-17 16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2f8a6b3d914'
+down_revision = 'b7e1d4f9a2c6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('stripe_events',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('ordering_key', sa.String(), nullable=True),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'processed', 'failed', name='stripeeventstatus'), nullable=False),
+    sa.Column('stripe_created', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stripe_events_status_created_id', 'stripe_events', ['status', 'stripe_created', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stripe_events_status_created_id', table_name='stripe_events')
+    op.drop_table('stripe_events')
+    sa.Enum(name='stripeeventstatus').drop(op.get_bind(), checkfirst=True)
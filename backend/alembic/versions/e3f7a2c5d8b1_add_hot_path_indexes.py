@@ -0,0 +1,52 @@
+"""add hot path indexes
+
+Revision ID: e3f7a2c5d8b1
+Revises: 9d4c1a7e2b60
+Create Date: 2026-10-17 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3f7a2c5d8b1'
+down_revision = '9d4c1a7e2b60'
+branch_labels = None
+depends_on = None
+
+
+# (lease_id, due_date) est déjà couvert par uq_payments_lease_id_due_date
+INDEXES = [
+    ('ix_payments_status_due_date', 'payments', ['status', 'due_date']),
+    ('ix_leases_property_id_status', 'leases', ['property_id', 'status']),
+    ('ix_leases_tenant_id_status', 'leases', ['tenant_id', 'status']),
+    ('ix_leases_status_id', 'leases', ['status', 'id']),
+    ('ix_properties_owner_id_status', 'properties', ['owner_id', 'status']),
+    ('ix_notifications_user_id_created_at', 'notifications', ['user_id', 'created_at']),
+    ('ix_maintenance_requests_property_id_created_at', 'maintenance_requests', ['property_id', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    op.create_index(
+        'ix_payments_unpaid_due_date', 'payments', ['due_date'], unique=False,
+        postgresql_where=sa.text('payment_date IS NULL'),
+        sqlite_where=sa.text('payment_date IS NULL'),
+    )
+    # reminder_history n'est pas (encore) géré par les migrations : index seulement si la table existe
+    if sa.inspect(op.get_bind()).has_table('reminder_history'):
+        op.create_index(
+            'ix_reminder_history_tenant_id_due_date_step', 'reminder_history',
+            ['tenant_id', 'due_date', 'step'], unique=False,
+        )
+
+
+def downgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('reminder_history'):
+        op.drop_index('ix_reminder_history_tenant_id_due_date_step', table_name='reminder_history')
+    op.drop_index('ix_payments_unpaid_due_date', table_name='payments')
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
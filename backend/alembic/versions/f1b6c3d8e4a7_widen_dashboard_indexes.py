@@ -0,0 +1,36 @@
+"""widen dashboard indexes
+
+Revision ID: f1b6c3d8e4a7
+Revises: d5a9e1c7b342
+Create Date: 2026-10-17 18:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b6c3d8e4a7'
+down_revision = 'd5a9e1c7b342'
+branch_labels = None
+depends_on = None
+
+
+# Colonnes ajoutées pour que les agrégats du tableau de bord ne lisent que les index
+INDEXES = [
+    ('payments', 'ix_payments_status_due_date', ['status', 'due_date'],
+     'ix_payments_status_due_date_lease_id_amount', ['status', 'due_date', 'lease_id', 'amount']),
+    ('properties', 'ix_properties_owner_id_status', ['owner_id', 'status'],
+     'ix_properties_owner_id_status_property_type', ['owner_id', 'status', 'property_type']),
+]
+
+
+def upgrade() -> None:
+    for table, old_name, _, new_name, new_columns in INDEXES:
+        op.create_index(new_name, table, new_columns, unique=False)
+        op.drop_index(old_name, table_name=table)
+
+
+def downgrade() -> None:
+    for table, old_name, old_columns, new_name, _ in reversed(INDEXES):
+        op.create_index(old_name, table, old_columns, unique=False)
+        op.drop_index(new_name, table_name=table)
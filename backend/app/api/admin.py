@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.services.email_outbox_service import outbox_stats, retry_dead_letters
+from app.services.stripe_event_service import stripe_event_stats
+from app.utils.dependencies import get_current_admin
+from app.utils.user_cache import CachedUser
+from app.utils.executor import blocking_executor
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+
+@router.get("/outbox")
+def get_outbox_stats(
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_admin),
+):
+    """Profondeur de l'outbox email (par statut) et débit d'envoi récent."""
+    return outbox_stats(db)
+
+
+@router.post("/outbox/retry-dead")
+def retry_dead_outbox_emails(
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_admin),
+):
+    return {"requeued": retry_dead_letters(db)}
+
+
+@router.get("/stripe-events")
+def get_stripe_event_stats(
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_admin),
+):
+    """Backlog des webhooks Stripe à traiter et retard du consommateur (secondes)."""
+    return stripe_event_stats(db)
+
+
+@router.get("/blocking-pool")
+def get_blocking_pool_stats(current_user: CachedUser = Depends(get_current_admin)):
+    """Occupation du pool de threads réservé aux appels bloquants (relances, uploads, webhook)."""
+    return blocking_executor.stats()
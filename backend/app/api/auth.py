@@ -1,24 +1,26 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token
-from app.utils.security import get_password_hash, verify_password, create_access_token
+from app.utils.security import hash_password_async, verify_password_async, create_access_token
 from app.utils.dependencies import get_current_user
+from app.utils.executor import run_blocking
+from app.utils.user_cache import CachedUser, invalidate_user
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
-@router.post("/register", response_model=UserResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
-        raise HTTPException(
-            status_code=400, 
-            detail="Email already registered"
-        )
-    
-    hashed_password = get_password_hash(user.password)
+# Les routes qui manipulent des mots de passe sont async : bcrypt tourne dans le pool
+# de processus (app.utils.security) et l'accès base dans le pool bloquant, de sorte
+# qu'une rafale de logins n'occupe pas les threads des autres routes.
+
+def _find_user(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+
+def _create_user(db: Session, user: UserCreate, hashed_password: str) -> UserResponse:
     new_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -31,24 +33,52 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
-    return new_user
+    invalidate_user(new_user.email)
+    return UserResponse.model_validate(new_user)
+
+
+def _store_rehash(db: Session, user: User, new_hash: str) -> None:
+    user.hashed_password = new_hash
+    db.commit()
+
+
+@router.post("/register", response_model=UserResponse)
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_blocking(_find_user, db, user.email)
+    if db_user:
+        raise HTTPException(
+            status_code=400, 
+            detail="Email already registered"
+        )
+    
+    hashed_password = await hash_password_async(user.password)
+    return await run_blocking(_create_user, db, user, hashed_password)
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(), 
     db: Session = Depends(get_db)
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_blocking(_find_user, db, form_data.username)
+    valid, new_hash = (
+        await verify_password_async(form_data.password, user.hashed_password) if user else (False, None)
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Coût bcrypt modifié depuis la création du hash : on le met à jour
+        await run_blocking(_store_rehash, db, user, new_hash)
     
-    access_token = create_access_token(subject=user.email)
+    access_token = create_access_token(
+        subject=user.email,
+        claims={"uid": user.id, "role": getattr(user.role, "value", user.role)},
+    )
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-def read_users_me(current_user: User = Depends(get_current_user)):
+def read_users_me(current_user: CachedUser = Depends(get_current_user)):
     return current_user
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.schemas.dashboard import DashboardSummary
+from app.services.dashboard_service import get_owner_summary
+from app.utils.dependencies import get_current_landlord
+from app.utils.user_cache import CachedUser
+
+router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
+
+
+@router.get("/summary", response_model=DashboardSummary)
+def get_dashboard_summary(
+    upcoming_days: int = Query(30, ge=1, le=365),
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_landlord),
+):
+    """Taux d'occupation, loyers attendus/encaissés du mois, impayés, échéances à venir et maintenance ouverte."""
+    return get_owner_summary(db, current_user.id, upcoming_days=upcoming_days)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db
+from app.models.import_job import ImportJob
+from app.schemas.bulk_import import ImportJobResponse
+from app.services.import_service import ImportFormatError, run_import
+from app.utils.dependencies import get_current_landlord
+from app.utils.user_cache import CachedUser
+from app.utils.executor import run_blocking
+
+router = APIRouter(prefix="/api/imports", tags=["Imports"])
+
+
+def _run_import(db: Session, owner_id: int, upload: UploadFile) -> ImportJobResponse:
+    try:
+        job = run_import(db, owner_id, upload.file, filename=upload.filename)
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return ImportJobResponse.model_validate(job)
+
+
+@router.post("/", response_model=ImportJobResponse)
+async def import_csv(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_landlord),
+):
+    """
+    Import CSV de biens, locataires et baux (une ligne = un bien, son locataire et son bail éventuels).
+    Renvoyer le même fichier reprend un import interrompu ; un import terminé n'est pas rejoué.
+    """
+    return await run_blocking(_run_import, db, current_user.id, file)
+
+
+@router.get("/", response_model=List[ImportJobResponse])
+def list_imports(
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_landlord),
+):
+    stmt = select(ImportJob).where(ImportJob.owner_id == current_user.id).order_by(ImportJob.id.desc()).limit(50)
+    return db.execute(stmt).scalars().all()
+
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+def get_import(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_landlord),
+):
+    job = db.execute(
+        select(ImportJob).where(ImportJob.id == job_id, ImportJob.owner_id == current_user.id)
+    ).scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return job
@@ -1,25 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.orm import Session, contains_eager
+from typing import List, Optional, Union
 from datetime import date
 from app.database import get_db
 from app.models.lease import Lease, LeaseStatus
 from app.models.property import Property, PropertyStatus
-from app.models.user import User
 from app.schemas.lease import LeaseCreate, LeaseUpdate, LeaseResponse
 from app.utils.dependencies import get_current_landlord
+from app.utils.user_cache import CachedUser
+from app.utils.pagination import KeysetOrder, Page, apply_keyset, build_page
 
 # Prefix sans /api pour exposer /leases et /api/leases
 router = APIRouter(prefix="/leases", tags=["Leases"])
 
-@router.get("/", response_model=List[LeaseResponse])
+LEASES_ORDER = KeysetOrder(Lease.id)
+
+@router.get("/", response_model=Union[List[LeaseResponse], Page[LeaseResponse]])
 def get_leases(
     skip: int = 0, 
     limit: int = 100, 
     status: Optional[LeaseStatus] = None,
     property_id: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
+    current_user: CachedUser = Depends(get_current_landlord)
 ):
     query = db.query(Lease)
     
@@ -31,13 +35,15 @@ def get_leases(
     if property_id:
         query = query.filter(Lease.property_id == property_id)
         
-    return query.offset(skip).limit(limit).all()
+    if cursor is not None:
+        return build_page(apply_keyset(query, LEASES_ORDER, cursor, limit).all(), LEASES_ORDER, limit)
+    return query.order_by(*LEASES_ORDER.order_by()).offset(skip).limit(limit).all()
 
 @router.post("/", response_model=LeaseResponse)
 def create_lease(
     lease: LeaseCreate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
+    current_user: CachedUser = Depends(get_current_landlord)
 ):
     # Verify property ownership
     property = db.query(Property).filter(Property.id == lease.property_id).first()
@@ -71,7 +77,7 @@ def create_lease(
 def get_lease(
     lease_id: int, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
+    current_user: CachedUser = Depends(get_current_landlord)
 ):
     lease = db.query(Lease).join(Property).filter(
         Lease.id == lease_id,
@@ -87,7 +93,7 @@ def update_lease(
     lease_id: int,
     lease_update: LeaseUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
     lease = db.query(Lease).join(Property).filter(
         Lease.id == lease_id,
@@ -121,9 +127,9 @@ def terminate_lease(
     lease_id: int, 
     end_date: date,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
+    current_user: CachedUser = Depends(get_current_landlord)
 ):
-    lease = db.query(Lease).join(Property).filter(
+    lease = db.query(Lease).join(Property).options(contains_eager(Lease.property)).filter(
         Lease.id == lease_id,
         Property.owner_id == current_user.id
     ).first()
@@ -145,9 +151,9 @@ def terminate_lease(
 def delete_lease(
     lease_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
-    lease = db.query(Lease).join(Property).filter(
+    lease = db.query(Lease).join(Property).options(contains_eager(Lease.property)).filter(
         Lease.id == lease_id,
         Property.owner_id == current_user.id
     ).first()
@@ -1,41 +1,44 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 from app.database import get_db
 from app.models.maintenance import MaintenanceRequest
 from app.models.property import Property
 from app.models.tenant import Tenant
-from app.models.user import User
 from app.schemas.maintenance import MaintenanceCreate, MaintenanceUpdate, MaintenanceResponse
 from app.utils.dependencies import get_current_landlord
+from app.utils.user_cache import CachedUser
+from app.utils.pagination import KeysetOrder, Page, apply_keyset, build_page
 from app.models.notification import Notification, NotificationType
 
 router = APIRouter(prefix="/api/maintenance", tags=["Maintenance"])
 
+REQUESTS_ORDER = KeysetOrder(MaintenanceRequest.created_at, MaintenanceRequest.id, descending=True)
 
-@router.get("/", response_model=List[MaintenanceResponse])
+
+@router.get("/", response_model=Union[List[MaintenanceResponse], Page[MaintenanceResponse]])
 def list_requests(
     skip: int = 0,
     limit: int = 200,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
-    return (
+    query = (
         db.query(MaintenanceRequest)
         .join(Property)
         .filter(Property.owner_id == current_user.id)
-        .order_by(MaintenanceRequest.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
     )
+    if cursor is not None:
+        return build_page(apply_keyset(query, REQUESTS_ORDER, cursor, limit).all(), REQUESTS_ORDER, limit)
+    return query.order_by(*REQUESTS_ORDER.order_by()).offset(skip).limit(limit).all()
 
 
 @router.post("/", response_model=MaintenanceResponse)
 def create_request(
     request: MaintenanceCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
     property_obj = db.query(Property).filter(Property.id == request.property_id).first()
     if not property_obj or property_obj.owner_id != current_user.id:
@@ -67,7 +70,7 @@ def update_request(
     request_id: int,
     request_update: MaintenanceUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
     db_request = (
         db.query(MaintenanceRequest)
@@ -1,33 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import List, Optional, Union
+from app.config import settings
+from app.database import get_db, get_async_db
 from app.models.notification import Notification
-from app.models.user import User
 from app.schemas.notification import NotificationResponse
-from app.utils.dependencies import get_current_active_user
+from app.services.notification_service import mark_all_read, notification_bus, unread_count
+from app.utils.dependencies import (
+    get_current_active_user,
+    get_current_active_user_async,
+    get_current_active_user_sse,
+)
+from app.utils.executor import run_blocking
+from app.utils.pagination import KeysetOrder, Page, apply_keyset, build_page
+from app.utils.user_cache import CachedUser
 
 router = APIRouter(prefix="/api/notifications", tags=["Notifications"])
+# Lectures chaudes servies par la pile async (ASYNC_DB_ENABLED), montées avant `router`
+async_router = APIRouter(prefix="/api/notifications", tags=["Notifications"])
 
 
-@router.get("/", response_model=List[NotificationResponse])
+NOTIFICATIONS_ORDER = KeysetOrder(Notification.created_at, Notification.id, descending=True)
+
+
+def _notifications_stmt(user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    stmt = select(Notification).where(Notification.user_id == user_id)
+    if cursor is not None:
+        return apply_keyset(stmt, NOTIFICATIONS_ORDER, cursor, limit)
+    return stmt.order_by(*NOTIFICATIONS_ORDER.order_by()).offset(skip).limit(limit)
+
+
+def _notifications_result(rows, cursor: Optional[str], limit: int):
+    return rows if cursor is None else build_page(rows, NOTIFICATIONS_ORDER, limit)
+
+
+@router.get("/", response_model=Union[List[NotificationResponse], Page[NotificationResponse]])
 def list_notifications(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: CachedUser = Depends(get_current_active_user),
 ):
-    return (
-        db.query(Notification)
-        .filter(Notification.user_id == current_user.id)
-        .order_by(Notification.created_at.desc())
-        .all()
-    )
+    rows = db.execute(_notifications_stmt(current_user.id, skip, limit, cursor)).scalars().all()
+    return _notifications_result(rows, cursor, limit)
+
+
+@async_router.get("/", response_model=Union[List[NotificationResponse], Page[NotificationResponse]])
+async def list_notifications_async(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_active_user_async),
+):
+    rows = (await db.execute(_notifications_stmt(current_user.id, skip, limit, cursor))).scalars().all()
+    return _notifications_result(rows, cursor, limit)
+
+
+@router.get("/unread-count")
+def get_unread_count(
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_active_user),
+):
+    return {"unread": unread_count(db, current_user.id)}
+
+
+@router.put("/read-all")
+def mark_all_as_read(
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_active_user),
+):
+    updated = mark_all_read(db, current_user.id)
+    return {"updated": updated, "unread": unread_count(db, current_user.id)}
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_active_user_sse),
+):
+    """Flux Server-Sent Events des nouvelles notifications de l'utilisateur (remplace le polling)."""
+    unread = await run_blocking(unread_count, db, current_user.id)
+    # Le flux peut rester ouvert des heures : on rend la connexion au pool tout de suite
+    db.close()
+    subscription = notification_bus.subscribe(current_user.id)
+
+    async def events():
+        try:
+            yield _sse("unread_count", {"unread": unread})
+            while True:
+                try:
+                    payload = await asyncio.wait_for(
+                        subscription.get(), timeout=settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse("notification", payload)
+        finally:
+            notification_bus.unsubscribe(subscription)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
 
 
 @router.put("/{notification_id}/read", response_model=NotificationResponse)
 def mark_as_read(
     notification_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: CachedUser = Depends(get_current_active_user),
 ):
     notification = (
         db.query(Notification)
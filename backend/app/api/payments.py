@@ -1,59 +1,160 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import date, datetime
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.payment import Payment, PaymentStatus, PaymentMethod
 from app.models.lease import Lease
 from app.models.property import Property
-from app.models.user import User
 from app.schemas.payment import PaymentCreate, PaymentUpdate, PaymentResponse
-from app.utils.dependencies import get_current_landlord
+from app.utils.dependencies import get_current_landlord, get_current_landlord_async
+from app.utils.user_cache import CachedUser
+from app.utils.eager_loading import PAYMENT_WITH_PARTIES
+from app.utils.pagination import KeysetOrder, Page, apply_keyset, build_page
 from app.models.notification import Notification, NotificationType
 from app.config import settings
 import stripe
-from app.utils.email import send_email
+from app.services.email_outbox_service import enqueue_email
+from app.utils.metrics import track_stripe
 from app.utils.stripe_helper import create_checkout_session, to_stripe_amount, ZERO_DECIMAL_CURRENCIES
-from app.utils.receipt import generate_payment_receipt, generate_due_notice
+from app.services.document_service import document_renderer, notice_spec, receipt_spec
+from app.services.receipt_export_service import monthly_receipt_specs, stream_receipts_zip
+from app.services.ledger_export_service import LedgerFilters, stream_ledger
 from app.models.tenant import Tenant
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/payments", tags=["Payments"])
+# Lectures chaudes servies par la pile async (ASYNC_DB_ENABLED), montées avant `router`
+async_router = APIRouter(prefix="/api/payments", tags=["Payments"])
 
 # Configure Stripe si clé dispo
 if settings.STRIPE_SECRET_KEY:
     stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
-@router.get("/", response_model=List[PaymentResponse])
+PAYMENTS_ORDER = KeysetOrder(Payment.due_date, Payment.id, descending=True)
+
+
+def _list_payments_stmt(
+    owner_id: int,
+    skip: int,
+    limit: int,
+    status: Optional[PaymentStatus],
+    due_before: Optional[date],
+    cursor: Optional[str] = None,
+):
+    stmt = (
+        select(Payment)
+        .join(Lease)
+        .join(Property)
+        .where(Property.owner_id == owner_id)
+    )
+
+    if status:
+        stmt = stmt.where(Payment.status == status)
+    if due_before:
+        stmt = stmt.where(Payment.due_date <= due_before)
+
+    # Mode curseur (cursor fourni, vide pour la première page) : pas d'OFFSET
+    if cursor is not None:
+        return apply_keyset(stmt, PAYMENTS_ORDER, cursor, limit)
+    return stmt.order_by(*PAYMENTS_ORDER.order_by()).offset(skip).limit(limit)
+
+
+def _payments_result(rows, cursor: Optional[str], limit: int):
+    return rows if cursor is None else build_page(rows, PAYMENTS_ORDER, limit)
+
+
+@router.get("/", response_model=Union[List[PaymentResponse], Page[PaymentResponse]])
 def list_payments(
     skip: int = 0,
     limit: int = 200,
     status: Optional[PaymentStatus] = None,
     due_before: Optional[date] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
-    query = (
-        db.query(Payment)
-        .join(Lease)
-        .join(Property)
-        .filter(Property.owner_id == current_user.id)
+    """Liste paginée par offset (liste brute) ou, si `cursor` est fourni, par curseur ({items, next_cursor})."""
+    stmt = _list_payments_stmt(current_user.id, skip, limit, status, due_before, cursor)
+    return _payments_result(db.execute(stmt).scalars().all(), cursor, limit)
+
+
+@async_router.get("/", response_model=Union[List[PaymentResponse], Page[PaymentResponse]])
+async def list_payments_async(
+    skip: int = 0,
+    limit: int = 200,
+    status: Optional[PaymentStatus] = None,
+    due_before: Optional[date] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_landlord_async),
+):
+    stmt = _list_payments_stmt(current_user.id, skip, limit, status, due_before, cursor)
+    return _payments_result((await db.execute(stmt)).scalars().all(), cursor, limit)
+
+
+def _receipts_zip(bind, owner_id: int, month: str):
+    # Session propre au flux : celle de la dépendance est fermée avant l'envoi de la réponse
+    with Session(bind=bind) as stream_db:
+        yield from stream_receipts_zip(monthly_receipt_specs(stream_db, owner_id, month), document_renderer)
+
+
+@router.get("/receipts/export")
+def export_monthly_receipts(
+    month: str = Query(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="Mois des échéances (YYYY-MM)"),
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_landlord),
+):
+    """Archive ZIP des quittances du mois, générée et envoyée au fil de l'eau."""
+    return StreamingResponse(
+        _receipts_zip(db.get_bind(), current_user.id, month),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="quittances-{month}.zip"'},
     )
 
-    if status:
-        query = query.filter(Payment.status == status)
-    if due_before:
-        query = query.filter(Payment.due_date <= due_before)
 
-    return query.order_by(Payment.due_date.desc()).offset(skip).limit(limit).all()
+LEDGER_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _ledger_export(bind, owner_id: int, filters: LedgerFilters, fmt: str):
+    with Session(bind=bind) as stream_db:
+        yield from stream_ledger(stream_db, owner_id, filters, fmt)
+
+
+@router.get("/export")
+def export_payments_ledger(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    status: Optional[PaymentStatus] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    paid_from: Optional[date] = None,
+    paid_to: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_landlord),
+):
+    """Grand livre des paiements (CSV ou XLSX) lu par curseur serveur et envoyé au fil de l'eau."""
+    filters = LedgerFilters(status, due_from, due_to, paid_from, paid_to)
+    filename = f"paiements-{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        _ledger_export(db.get_bind(), current_user.id, filters, format),
+        media_type=LEDGER_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/{payment_id}", response_model=PaymentResponse)
 def get_payment(
     payment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
     payment = (
         db.query(Payment)
@@ -71,7 +172,7 @@ def get_payment(
 def create_payment(
     payment: PaymentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
     lease = db.query(Lease).join(Property).filter(
         Lease.id == payment.lease_id,
@@ -83,7 +184,12 @@ def create_payment(
 
     new_payment = Payment(**payment.model_dump())
     db.add(new_payment)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Contrainte (lease_id, due_date) : l'échéance existe déjà (générée ou saisie)
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Un paiement existe déjà pour ce bail à cette échéance")
     db.refresh(new_payment)
 
     client_secret = None
@@ -93,13 +199,14 @@ def create_payment(
         if stripe_amount is None:
             print(f"[stripe] montant PI invalide pour paiement {new_payment.id} ({payment.amount} XAF)")
         else:
-            intent = stripe.PaymentIntent.create(
-                amount=stripe_amount,
-                currency="xaf",
-                metadata={"payment_id": new_payment.id},
-                description=f"Loyer bail #{payment.lease_id}",
-                automatic_payment_methods={"enabled": True},
-            )
+            with track_stripe("payment_intent_create"):
+                intent = stripe.PaymentIntent.create(
+                    amount=stripe_amount,
+                    currency="xaf",
+                    metadata={"payment_id": new_payment.id},
+                    description=f"Loyer bail #{payment.lease_id}",
+                    automatic_payment_methods={"enabled": True},
+                )
             new_payment.transaction_reference = intent.id
             client_secret = intent.client_secret
             db.commit()
@@ -116,12 +223,13 @@ def update_payment(
     payment_id: int,
     payment_update: PaymentUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
     db_payment = (
         db.query(Payment)
         .join(Lease)
         .join(Property)
+        .options(*PAYMENT_WITH_PARTIES)
         .filter(Payment.id == payment_id, Property.owner_id == current_user.id)
         .first()
     )
@@ -137,6 +245,9 @@ def update_payment(
 
     # Si un paiement passe en payé, ajouter une notification
     if previous_status != PaymentStatus.PAID and db_payment.status == PaymentStatus.PAID:
+        # Date d'encaissement imprimée sur la quittance : fixée une fois pour toutes
+        if db_payment.payment_date is None:
+            db_payment.payment_date = date.today()
         notification = Notification(
             user_id=current_user.id,
             type=NotificationType.PAYMENT_CONFIRMATION,
@@ -145,16 +256,18 @@ def update_payment(
         )
         db.add(notification)
         # Génère une quittance simple et envoie un mail
-        tenant = db.query(Tenant).join(Lease).filter(Lease.id == db_payment.lease_id, Tenant.id == Lease.tenant_id).first()
+        tenant = db_payment.lease.tenant
         tenant_name = ""
         tenant_email = ""
         if tenant and tenant.user:
             tenant_name = f"{tenant.user.first_name} {tenant.user.last_name}"
             tenant_email = tenant.user.email
         prop = db_payment.lease.property
-        receipt_path = generate_payment_receipt(db_payment.id, db_payment.amount, tenant_name, prop.title if prop else "")
-        db_payment.receipt_url = f"/{receipt_path}"
-        send_email(
+        db_payment.receipt_url = document_renderer.request(
+            receipt_spec(db_payment.id, db_payment.amount, tenant_name, prop.title if prop else "", db_payment.payment_date)
+        )
+        enqueue_email(
+            db,
             tenant_email,
             "Quittance de paiement",
             f"Bonjour {tenant_name},\nVotre paiement #{db_payment.id} de {db_payment.amount:.0f} F CFA a été enregistré.\nQuittance: {db_payment.receipt_url}"
@@ -178,7 +291,7 @@ def update_payment(
 def create_or_get_intent(
     payment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
     if not settings.STRIPE_SECRET_KEY:
         raise HTTPException(status_code=400, detail="Stripe non configuré")
@@ -197,7 +310,8 @@ def create_or_get_intent(
     client_secret = None
     if payment.transaction_reference:
         try:
-            intent = stripe.PaymentIntent.retrieve(payment.transaction_reference)
+            with track_stripe("payment_intent_retrieve"):
+                intent = stripe.PaymentIntent.retrieve(payment.transaction_reference)
             client_secret = intent.client_secret
         except Exception:
             client_secret = None
@@ -206,13 +320,14 @@ def create_or_get_intent(
         stripe_amount = to_stripe_amount(payment.amount, "xaf")
         if stripe_amount is None:
             raise HTTPException(status_code=400, detail="Montant Stripe invalide pour ce paiement")
-        intent = stripe.PaymentIntent.create(
-            amount=stripe_amount,
-            currency="xaf",
-            metadata={"payment_id": payment.id},
-            description=f"Loyer bail #{payment.lease_id}",
-            automatic_payment_methods={"enabled": True},
-        )
+        with track_stripe("payment_intent_create"):
+            intent = stripe.PaymentIntent.create(
+                amount=stripe_amount,
+                currency="xaf",
+                metadata={"payment_id": payment.id},
+                description=f"Loyer bail #{payment.lease_id}",
+                automatic_payment_methods={"enabled": True},
+            )
         payment.transaction_reference = intent.id
         client_secret = intent.client_secret
         db.commit()
@@ -227,7 +342,7 @@ def create_or_get_intent(
 def create_checkout_link(
     payment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
     if not settings.STRIPE_SECRET_KEY:
         raise HTTPException(status_code=400, detail="Stripe non configuré")
@@ -253,9 +368,11 @@ def create_checkout_link(
         success_url=success_url,
         cancel_url=cancel_url,
         metadata={"payment_id": payment.id, "lease_id": payment.lease_id},
+        db=db,
     )
     if not checkout_url:
         raise HTTPException(status_code=502, detail="Impossible de créer la session Stripe")
+    db.commit()
 
     return {"url": checkout_url}
 
@@ -264,24 +381,20 @@ def create_checkout_link(
 def send_due_notice(
     payment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
     payment = (
         db.query(Payment)
         .join(Lease)
         .join(Property)
+        .options(*PAYMENT_WITH_PARTIES)
         .filter(Payment.id == payment_id, Property.owner_id == current_user.id)
         .first()
     )
     if not payment:
         raise HTTPException(status_code=404, detail="Paiement introuvable")
 
-    tenant = (
-        db.query(Tenant)
-        .join(Lease)
-        .filter(Lease.id == payment.lease_id, Tenant.id == Lease.tenant_id)
-        .first()
-    )
+    tenant = payment.lease.tenant
     tenant_name = ""
     tenant_email = ""
     if tenant and tenant.user:
@@ -289,13 +402,8 @@ def send_due_notice(
         tenant_email = tenant.user.email
 
     property_title = payment.lease.property.title if payment.lease and payment.lease.property else ""
-    notice_path = generate_due_notice(
-        payment.id,
-        payment.amount,
-        payment.due_date,
-        tenant_name,
-        property_title,
-    )
+    notice = notice_spec(payment.id, payment.amount, payment.due_date, tenant_name, property_title)
+    notice_url = document_renderer.request(notice)
     app_base = settings.APP_URL or settings.FRONTEND_URL or "http://localhost:8080"
     success_url = f"{app_base.rstrip('/')}/payments?status=success&pid={payment.id}&cs_id={{CHECKOUT_SESSION_ID}}"
     cancel_url = f"{app_base.rstrip('/')}/payments?status=cancel&pid={payment.id}"
@@ -306,15 +414,18 @@ def send_due_notice(
         success_url=success_url,
         cancel_url=cancel_url,
         metadata={"payment_id": payment.id, "lease_id": payment.lease_id},
+        db=db,
     )
     pay_line = f"\nPayer en ligne (Stripe) : {checkout_url}" if checkout_url else ""
 
-    send_email(
+    enqueue_email(
+        db,
         tenant_email,
         "Avis d'échéance de loyer",
-        f"Bonjour {tenant_name},\nVotre loyer de {payment.amount:.0f} F CFA pour {property_title} est dû le {payment.due_date}.{pay_line}\nAvis: /{notice_path}",
+        f"Bonjour {tenant_name},\nVotre loyer de {payment.amount:.0f} F CFA pour {property_title} est dû le {payment.due_date}.{pay_line}\nAvis: {notice_url}",
     )
-    return {"notice_url": f"/{notice_path}"}
+    db.commit()
+    return {"notice_url": notice_url, "ready": document_renderer.is_ready(notice)}
 
 
 class PaymentConfirmRequest(BaseModel):
@@ -325,6 +436,8 @@ class PaymentConfirmRequest(BaseModel):
 
 def _send_receipt_to_tenant(db: Session, payment: Payment) -> None:
     """Génère la quittance PDF et l'envoie au locataire par email."""
+    # Après les commits de l'appelant tout est expiré : bail, bien et locataire rechargés en une requête
+    payment = db.query(Payment).options(*PAYMENT_WITH_PARTIES).filter(Payment.id == payment.id).one()
     lease = payment.lease
     tenant = lease.tenant if lease else None
     user = tenant.user if tenant else None
@@ -339,22 +452,22 @@ def _send_receipt_to_tenant(db: Session, payment: Payment) -> None:
     if not tenant_email:
         return
 
-    receipt_path = generate_payment_receipt(
-        payment.id,
-        payment.amount,
-        tenant_name,
-        prop.title if prop else "",
+    payment.receipt_url = document_renderer.request(
+        receipt_spec(payment.id, payment.amount, tenant_name, prop.title if prop else "", payment.payment_date)
     )
-    payment.receipt_url = f"/{receipt_path}"
-    db.commit()
-    db.refresh(payment)
-
-    send_email(
+    enqueue_email(
+        db,
         tenant_email,
         "Votre reçu de paiement",
         f"Bonjour {tenant_name},\nVotre paiement #{payment.id} a été enregistré.\nReçu : {payment.receipt_url}",
         html_content=f"<p>Bonjour {tenant_name},</p><p>Votre paiement #{payment.id} pour <strong>{prop.title if prop else ''}</strong> a été enregistré.</p><p><a href='{payment.receipt_url}'>Télécharger votre reçu</a></p>",
     )
+    db.commit()
+    db.refresh(payment)
+
+
+def _payment_due_today(db: Session, lease_id: int) -> Optional[Payment]:
+    return db.query(Payment).filter(Payment.lease_id == lease_id, Payment.due_date == date.today()).first()
 
 
 @router.post("/confirm")
@@ -372,7 +485,8 @@ def confirm_payment_from_success(
         raise HTTPException(status_code=400, detail="checkout_session_id requis")
 
     try:
-        session = stripe.checkout.Session.retrieve(payload.checkout_session_id, expand=["payment_intent"])
+        with track_stripe("checkout_session_retrieve"):
+            session = stripe.checkout.Session.retrieve(payload.checkout_session_id, expand=["payment_intent"])
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"Session Stripe introuvable : {exc}")
 
@@ -419,20 +533,28 @@ def confirm_payment_from_success(
         divisor = 1 if currency in ZERO_DECIMAL_CURRENCIES else 100
         amount = float(total) / divisor
 
-        payment = Payment(
-            lease_id=lease.id,
-            amount=amount,
-            due_date=date.today(),
-            status=PaymentStatus.PAID,
-            payment_method=PaymentMethod.STRIPE,
-            payment_date=date.today(),
-            transaction_reference=getattr(pi, "id", None) or session.payment_intent,
-        )
-        db.add(payment)
-        db.commit()
-        db.refresh(payment)
-        updated = True
-        created_new = True
+        # Le locataire est déjà débité : une échéance du jour existante est réutilisée
+        # (contrainte lease_id, due_date), y compris si elle apparaît entre-temps.
+        payment = _payment_due_today(db, lease.id)
+        if not payment:
+            payment = Payment(
+                lease_id=lease.id,
+                amount=amount,
+                due_date=date.today(),
+                status=PaymentStatus.PAID,
+                payment_method=PaymentMethod.STRIPE,
+                payment_date=date.today(),
+                transaction_reference=getattr(pi, "id", None) or session.payment_intent,
+            )
+            db.add(payment)
+            try:
+                db.commit()
+                db.refresh(payment)
+                updated = True
+                created_new = True
+            except IntegrityError:
+                db.rollback()
+                payment = _payment_due_today(db, lease.id)
 
     if payment.status != PaymentStatus.PAID:
         payment.status = PaymentStatus.PAID
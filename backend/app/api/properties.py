@@ -1,16 +1,51 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.database import get_db
+from typing import List, Optional, Union
+from app.database import get_db, get_async_db
 from app.models.property import Property, PropertyStatus, PropertyType
-from app.models.user import User
 from app.schemas.property import PropertyCreate, PropertyUpdate, PropertyResponse
 from app.utils.dependencies import get_current_landlord, get_current_user
+from app.utils.user_cache import CachedUser
+from app.utils.pagination import KeysetOrder, Page, apply_keyset, build_page
 
 # Prefix sans /api pour exposer les routes sur /api/properties et /properties
 router = APIRouter(prefix="/properties", tags=["Properties"])
+# Lectures chaudes servies par la pile async (ASYNC_DB_ENABLED), montées avant `router`
+async_router = APIRouter(prefix="/properties", tags=["Properties"])
 
-@router.get("/", response_model=List[PropertyResponse])
+PROPERTIES_ORDER = KeysetOrder(Property.id)
+
+
+def _properties_stmt(
+    skip: int,
+    limit: int,
+    city: Optional[str],
+    type: Optional[PropertyType],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    cursor: Optional[str] = None,
+):
+    stmt = select(Property).where(Property.status != PropertyStatus.OFFLINE)
+    
+    if city:
+        stmt = stmt.where(Property.city.ilike(f"%{city}%"))
+    if type:
+        stmt = stmt.where(Property.property_type == type)
+    if min_price:
+        stmt = stmt.where(Property.rent_amount >= min_price)
+    if max_price:
+        stmt = stmt.where(Property.rent_amount <= max_price)
+
+    if cursor is not None:
+        return apply_keyset(stmt, PROPERTIES_ORDER, cursor, limit)
+    return stmt.order_by(*PROPERTIES_ORDER.order_by()).offset(skip).limit(limit)
+
+def _properties_result(rows, cursor: Optional[str], limit: int):
+    return rows if cursor is None else build_page(rows, PROPERTIES_ORDER, limit)
+
+@router.get("/", response_model=Union[List[PropertyResponse], Page[PropertyResponse]])
 def get_properties(
     skip: int = 0, 
     limit: int = 100, 
@@ -18,26 +53,31 @@ def get_properties(
     type: Optional[PropertyType] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(Property).filter(Property.status != PropertyStatus.OFFLINE)
-    
-    if city:
-        query = query.filter(Property.city.ilike(f"%{city}%"))
-    if type:
-        query = query.filter(Property.property_type == type)
-    if min_price:
-        query = query.filter(Property.rent_amount >= min_price)
-    if max_price:
-        query = query.filter(Property.rent_amount <= max_price)
-        
-    return query.offset(skip).limit(limit).all()
+    stmt = _properties_stmt(skip, limit, city, type, min_price, max_price, cursor)
+    return _properties_result(db.execute(stmt).scalars().all(), cursor, limit)
+
+@async_router.get("/", response_model=Union[List[PropertyResponse], Page[PropertyResponse]])
+async def get_properties_async(
+    skip: int = 0, 
+    limit: int = 100, 
+    city: Optional[str] = None,
+    type: Optional[PropertyType] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    stmt = _properties_stmt(skip, limit, city, type, min_price, max_price, cursor)
+    return _properties_result((await db.execute(stmt)).scalars().all(), cursor, limit)
 
 @router.post("/", response_model=PropertyResponse)
 def create_property(
     property: PropertyCreate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
+    current_user: CachedUser = Depends(get_current_landlord)
 ):
     new_property = Property(
         **property.model_dump(),
@@ -60,7 +100,7 @@ def update_property(
     property_id: int, 
     property_update: PropertyUpdate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
+    current_user: CachedUser = Depends(get_current_landlord)
 ):
     db_property = db.query(Property).filter(Property.id == property_id).first()
     if not db_property:
@@ -81,7 +121,7 @@ def update_property(
 def delete_property(
     property_id: int, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
+    current_user: CachedUser = Depends(get_current_landlord)
 ):
     db_property = db.query(Property).filter(Property.id == property_id).first()
     if not db_property:
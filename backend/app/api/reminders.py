@@ -1,50 +1,52 @@
 from datetime import date, timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.payment import Payment, PaymentStatus
 from app.models.lease import Lease, LeaseStatus
 from app.models.tenant import Tenant
 from app.models.user import User
 from app.models.property import Property
-from app.utils.dependencies import get_current_landlord
-from app.utils.email import send_email
+from app.utils.dependencies import get_current_landlord, get_current_landlord_async
+from app.utils.user_cache import CachedUser
+from app.services.email_outbox_service import enqueue_email
 from pydantic import BaseModel, Field
 from app.config import settings
 from app.utils.stripe_helper import create_checkout_session
 
 router = APIRouter(prefix="/api/reminders", tags=["Reminders"])
+# Lectures chaudes servies par la pile async (ASYNC_DB_ENABLED), montées avant `router`
+async_router = APIRouter(prefix="/api/reminders", tags=["Reminders"])
 
+OPEN_PAYMENT_STATUSES = [PaymentStatus.PENDING, PaymentStatus.LATE, PaymentStatus.PARTIAL]
 
-@router.get("/", response_model=List[dict])
-def get_payment_reminders(
-    due_within_days: int = 30,
-    include_late: bool = True,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
-):
-    """Retourne les paiements en attente/retard pour alimenter la page de relance."""
+
+def _payment_reminders_stmt(owner_id: int, due_within_days: int, include_late: bool):
     cutoff = date.today() + timedelta(days=due_within_days)
 
-    query = (
-        db.query(Payment, Lease, Property, Tenant, User)
+    stmt = (
+        select(Payment, Lease, Property, Tenant, User)
         .join(Lease, Payment.lease_id == Lease.id)
         .join(Property, Lease.property_id == Property.id)
         .join(Tenant, Lease.tenant_id == Tenant.id)
         .join(User, Tenant.user_id == User.id)
-        .filter(Property.owner_id == current_user.id)
+        .where(Property.owner_id == owner_id)
     )
 
     if include_late:
-        query = query.filter(Payment.status.in_([PaymentStatus.PENDING, PaymentStatus.LATE, PaymentStatus.PARTIAL]))
+        stmt = stmt.where(Payment.status.in_(OPEN_PAYMENT_STATUSES))
     else:
-        query = query.filter(Payment.status == PaymentStatus.PENDING)
+        stmt = stmt.where(Payment.status == PaymentStatus.PENDING)
+
+    return stmt.where(Payment.due_date <= cutoff).order_by(Payment.due_date.asc())
 
-    query = query.filter(Payment.due_date <= cutoff)
 
+def _payment_reminder_rows(rows) -> List[dict]:
     results = []
-    for payment, lease, prop, tenant, user in query.order_by(Payment.due_date.asc()).all():
+    for payment, lease, prop, tenant, user in rows:
         days_due = (payment.due_date - date.today()).days
         results.append(
             {
@@ -63,62 +65,94 @@ def get_payment_reminders(
     return results
 
 
+@router.get("/", response_model=List[dict])
+def get_payment_reminders(
+    due_within_days: int = 30,
+    include_late: bool = True,
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_landlord),
+):
+    """Retourne les paiements en attente/retard pour alimenter la page de relance."""
+    rows = db.execute(_payment_reminders_stmt(current_user.id, due_within_days, include_late)).all()
+    return _payment_reminder_rows(rows)
+
+
+@async_router.get("/", response_model=List[dict])
+async def get_payment_reminders_async(
+    due_within_days: int = 30,
+    include_late: bool = True,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_landlord_async),
+):
+    """Retourne les paiements en attente/retard pour alimenter la page de relance."""
+    rows = (await db.execute(_payment_reminders_stmt(current_user.id, due_within_days, include_late))).all()
+    return _payment_reminder_rows(rows)
+
+
 class LeaseReminderRequest(BaseModel):
     subject: str = Field(..., min_length=3, max_length=200)
     html_content: str
     plain_text_content: Optional[str] = None
 
 
-@router.get("/leases", response_model=List[dict])
-def get_lease_expiration_reminders(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
-):
-    """Retourne les baux classés par date de fin (proche → lointain) pour préparer les relances."""
-    today = date.today()
-    app_base = (settings.APP_URL or settings.FRONTEND_URL or "http://localhost:8080").rstrip("/")
-    query = (
-        db.query(Lease, Property, Tenant, User)
+def _app_base() -> str:
+    return (settings.APP_URL or settings.FRONTEND_URL or "http://localhost:8080").rstrip("/")
+
+
+def _lease_reminders_stmt(owner_id: int):
+    """
+    Baux actifs du bailleur avec, en une seule requête, leur plus ancienne échéance
+    ouverte (ROW_NUMBER() par bail) au lieu d'une requête par bail.
+    """
+    ranked = (
+        select(
+            Payment.lease_id,
+            Payment.id.label("payment_id"),
+            Payment.amount.label("payment_amount"),
+            func.row_number()
+            .over(partition_by=Payment.lease_id, order_by=(Payment.due_date.asc(), Payment.id.asc()))
+            .label("rank"),
+        )
+        .join(Lease, Payment.lease_id == Lease.id)
+        .join(Property, Lease.property_id == Property.id)
+        .where(
+            Property.owner_id == owner_id,
+            Lease.status == LeaseStatus.ACTIVE,
+            Payment.status.in_(OPEN_PAYMENT_STATUSES),
+        )
+        .subquery()
+    )
+    return (
+        select(Lease, Property, Tenant, User, ranked.c.payment_id, ranked.c.payment_amount)
         .join(Property, Lease.property_id == Property.id)
         .join(Tenant, Lease.tenant_id == Tenant.id)
         .join(User, Tenant.user_id == User.id)
-        .filter(
-            Property.owner_id == current_user.id,
+        .outerjoin(ranked, and_(ranked.c.lease_id == Lease.id, ranked.c.rank == 1))
+        .where(
+            Property.owner_id == owner_id,
             Lease.status == LeaseStatus.ACTIVE,
             Lease.end_date.isnot(None),
         )
         .order_by(Lease.end_date.asc())
     )
 
+
+@router.get("/leases", response_model=List[dict])
+def get_lease_expiration_reminders(
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_landlord),
+):
+    """
+    Retourne les baux classés par date de fin (proche → lointain) pour préparer les relances.
+    Aucun appel Stripe ici : le lien de paiement est créé à la demande via
+    POST /leases/{id}/checkout, `pay_url` pointe vers la page des paiements.
+    """
+    today = date.today()
+    pay_url = f"{_app_base()}/payments"
+
     reminders = []
-    for lease, prop, tenant, user in query.all():
+    for lease, prop, tenant, user, payment_id, payment_amount in db.execute(_lease_reminders_stmt(current_user.id)):
         days_left = (lease.end_date - today).days if lease.end_date else None
-        pay_url = f"{app_base}/payments"
-
-        # Trouver un paiement en attente/retard pour ce bail afin de lier la session Stripe
-        payment = (
-            db.query(Payment)
-            .filter(
-                Payment.lease_id == lease.id,
-                Payment.status.in_([PaymentStatus.PENDING, PaymentStatus.LATE, PaymentStatus.PARTIAL]),
-            )
-            .order_by(Payment.due_date.asc())
-            .first()
-        )
-        payment_id = payment.id if payment else None
-
-        # Générer un lien Checkout Stripe (montant = loyer ou montant du paiement)
-        checkout_url = create_checkout_session(
-            amount=(payment.amount if payment else lease.rent_amount) or 0,
-            currency="xaf",
-            description=f"Loyer bail #{lease.id}",
-            success_url=f"{app_base}/payment-success?lease_id={lease.id}&pid={payment_id or ''}&cs_id={{CHECKOUT_SESSION_ID}}",
-            cancel_url=f"{app_base}/payment-cancel?lease_id={lease.id}&pid={payment_id or ''}",
-            metadata={"lease_id": lease.id, "payment_id": payment_id} if payment_id else {"lease_id": lease.id},
-        )
-        if checkout_url:
-            pay_url = checkout_url
-
         reminders.append(
             {
                 "lease_id": lease.id,
@@ -133,18 +167,46 @@ def get_lease_expiration_reminders(
                 "status": lease.status.value,
                 "days_until_end": days_left,
                 "rent_amount": lease.rent_amount,
+                "payment_id": payment_id,
+                "amount_due": payment_amount if payment_id else lease.rent_amount,
                 "pay_url": pay_url,
             }
         )
     return reminders
 
 
+@router.post("/leases/{lease_id}/checkout")
+def create_lease_checkout_link(
+    lease_id: int,
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_landlord),
+):
+    """Crée le lien Checkout Stripe d'un bail (plus ancienne échéance ouverte, sinon le loyer)."""
+    row = db.execute(_lease_reminders_stmt(current_user.id).where(Lease.id == lease_id)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Bail introuvable")
+
+    lease, _, _, _, payment_id, payment_amount = row
+    app_base = _app_base()
+    checkout_url = create_checkout_session(
+        amount=(payment_amount if payment_id else lease.rent_amount) or 0,
+        currency="xaf",
+        description=f"Loyer bail #{lease.id}",
+        success_url=f"{app_base}/payment-success?lease_id={lease.id}&pid={payment_id or ''}&cs_id={{CHECKOUT_SESSION_ID}}",
+        cancel_url=f"{app_base}/payment-cancel?lease_id={lease.id}&pid={payment_id or ''}",
+        metadata={"lease_id": lease.id, "payment_id": payment_id} if payment_id else {"lease_id": lease.id},
+        db=db,
+    )
+    db.commit()
+    return {"url": checkout_url or f"{app_base}/payments", "payment_id": payment_id}
+
+
 @router.post("/leases/{lease_id}/send")
 def send_lease_expiration_reminder(
     lease_id: int,
     payload: LeaseReminderRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord),
+    current_user: CachedUser = Depends(get_current_landlord),
 ):
     lease = (
         db.query(Lease, Property, Tenant, User)
@@ -165,17 +227,19 @@ def send_lease_expiration_reminder(
     html = payload.html_content
     plain = payload.plain_text_content or html
 
-    success, reason = send_email(
+    # L'envoi effectif est assuré par le worker d'outbox
+    entry = enqueue_email(
+        db,
         user.email,
         subject,
         plain,
         html_content=html,
     )
-    if not success:
-        raise HTTPException(status_code=502, detail=reason or "Envoi SendGrid refusé (clé ou configuration)")
+    db.commit()
 
     return {
-        "message": "Relance envoyée",
+        "message": "Relance programmée",
         "sent_to": user.email,
         "lease_id": lease_obj.id,
+        "outbox_id": entry.id,
     }
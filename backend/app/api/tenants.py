@@ -1,40 +1,58 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.orm import Session, contains_eager
+from typing import List, Optional, Union
 from app.database import get_db
 from app.models.tenant import Tenant
 from app.models.user import User, UserRole
 from app.models.lease import Lease, LeaseStatus
 from app.schemas.tenant import TenantCreate, TenantUpdate, TenantDetailResponse, TenantCreateWithUser
 from app.utils.dependencies import get_current_landlord
-from app.utils.security import get_password_hash
+from app.utils.eager_loading import TENANT_WITH_USER
+from app.utils.executor import run_blocking
+from app.utils.pagination import KeysetOrder, Page, apply_keyset, build_page
+from app.utils.security import hash_password_async
+from app.utils.user_cache import CachedUser, invalidate_user
 
 # Prefix sans /api pour pouvoir exposer les routes aussi bien sur /api/tenants que /tenants
 router = APIRouter(prefix="/tenants", tags=["Tenants"])
 
-@router.get("/", response_model=List[TenantDetailResponse])
+TENANTS_ORDER = KeysetOrder(Tenant.id)
+
+
+def _load_tenant(db: Session, tenant_id: int) -> Optional[Tenant]:
+    """Profil + compte utilisateur en une requête (TenantDetailResponse)."""
+    return db.query(Tenant).options(*TENANT_WITH_USER).filter(Tenant.id == tenant_id).first()
+
+
+@router.get("/", response_model=Union[List[TenantDetailResponse], Page[TenantDetailResponse]])
 def get_tenants(
     skip: int = 0, 
     limit: int = 100, 
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
+    current_user: CachedUser = Depends(get_current_landlord)
 ):
     query = db.query(Tenant)
     # Join with User to search by name/email if needed
     if search:
-        query = query.join(User).filter(
+        # La jointure de recherche alimente aussi Tenant.user (pas de requête par locataire)
+        query = query.join(User).options(contains_eager(Tenant.user)).filter(
             (User.first_name.ilike(f"%{search}%")) | 
             (User.last_name.ilike(f"%{search}%")) | 
             (User.email.ilike(f"%{search}%"))
         )
-    return query.offset(skip).limit(limit).all()
+    else:
+        query = query.options(*TENANT_WITH_USER)
+    if cursor is not None:
+        return build_page(apply_keyset(query, TENANTS_ORDER, cursor, limit).all(), TENANTS_ORDER, limit)
+    return query.order_by(*TENANTS_ORDER.order_by()).offset(skip).limit(limit).all()
 
 @router.post("/", response_model=TenantDetailResponse)
 def create_tenant(
     tenant: TenantCreate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
+    current_user: CachedUser = Depends(get_current_landlord)
 ):
     # Check if user exists
     user = db.query(User).filter(User.id == tenant.user_id).first()
@@ -49,15 +67,11 @@ def create_tenant(
     new_tenant = Tenant(**tenant.model_dump())
     db.add(new_tenant)
     db.commit()
-    db.refresh(new_tenant)
-    return new_tenant
+    return _load_tenant(db, new_tenant.id)
 
-@router.post("/with-user", response_model=TenantDetailResponse)
-def create_tenant_with_user(
-    payload: TenantCreateWithUser,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
-):
+def _create_tenant_with_user(
+    db: Session, payload: TenantCreateWithUser, hashed_password: str
+) -> TenantDetailResponse:
     # Check email uniqueness
     existing_user = db.query(User).filter(User.email == payload.email).first()
     if existing_user:
@@ -65,7 +79,7 @@ def create_tenant_with_user(
 
     user = User(
         email=payload.email,
-        hashed_password=get_password_hash(payload.password),
+        hashed_password=hashed_password,
         first_name=payload.first_name,
         last_name=payload.last_name,
         phone=payload.phone,
@@ -85,30 +99,37 @@ def create_tenant_with_user(
     )
     db.add(new_tenant)
     db.commit()
-    db.refresh(new_tenant)
-    return new_tenant
+    invalidate_user(payload.email)
+    return TenantDetailResponse.model_validate(_load_tenant(db, new_tenant.id))
+
+@router.post("/with-user", response_model=TenantDetailResponse)
+async def create_tenant_with_user(
+    payload: TenantCreateWithUser,
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_landlord)
+):
+    # bcrypt hors des threads de requête, puis écriture dans le pool bloquant
+    hashed_password = await hash_password_async(payload.password)
+    return await run_blocking(_create_tenant_with_user, db, payload, hashed_password)
 
 @router.get("/{tenant_id}", response_model=TenantDetailResponse)
 def get_tenant(
     tenant_id: int, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
+    current_user: CachedUser = Depends(get_current_landlord)
 ):
-    tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
+    tenant = _load_tenant(db, tenant_id)
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
     return tenant
 
-@router.put("/{tenant_id}", response_model=TenantDetailResponse)
-def update_tenant(
-    tenant_id: int, 
-    tenant_update: TenantUpdate, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
-):
-    db_tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
+def _update_tenant(
+    db: Session, tenant_id: int, tenant_update: TenantUpdate, hashed_password: Optional[str]
+) -> TenantDetailResponse:
+    db_tenant = _load_tenant(db, tenant_id)
     if not db_tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
+    previous_email = db_tenant.user.email if db_tenant.user else None
 
     # Handle user updates (email, names, phone, password)
     if tenant_update.email:
@@ -125,8 +146,8 @@ def update_tenant(
         if value is not None:
             setattr(db_tenant.user, field, value)
 
-    if tenant_update.password:
-        db_tenant.user.hashed_password = get_password_hash(tenant_update.password)
+    if hashed_password:
+        db_tenant.user.hashed_password = hashed_password
 
     # Update tenant-specific fields
     update_data = tenant_update.model_dump(
@@ -137,16 +158,27 @@ def update_tenant(
         setattr(db_tenant, key, value)
 
     db.commit()
-    db.refresh(db_tenant)
-    return db_tenant
+    db_tenant = _load_tenant(db, tenant_id)
+    invalidate_user(previous_email, db_tenant.user.email if db_tenant.user else None)
+    return TenantDetailResponse.model_validate(db_tenant)
+
+@router.put("/{tenant_id}", response_model=TenantDetailResponse)
+async def update_tenant(
+    tenant_id: int, 
+    tenant_update: TenantUpdate, 
+    db: Session = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_landlord)
+):
+    hashed_password = await hash_password_async(tenant_update.password) if tenant_update.password else None
+    return await run_blocking(_update_tenant, db, tenant_id, tenant_update, hashed_password)
 
 @router.delete("/{tenant_id}")
 def delete_tenant(
     tenant_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_landlord)
+    current_user: CachedUser = Depends(get_current_landlord)
 ):
-    tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
+    tenant = _load_tenant(db, tenant_id)
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
     
@@ -164,10 +196,12 @@ def delete_tenant(
 
     # Delete both tenant profile and its user account (to free the email)
     # Keep landlords/admins safe by only removing tenant-role users.
+    email = tenant.user.email if tenant.user else None
     if tenant.user and tenant.user.role == UserRole.TENANT:
         db.delete(tenant.user)
     else:
         db.delete(tenant)
     db.commit()
+    invalidate_user(email)
     
     return {"message": "Tenant profile and user deleted successfully"}
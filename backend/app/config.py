@@ -5,12 +5,26 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    # Pile async optionnelle (asyncpg / aiosqlite) pour les routes de lecture chaudes
+    ASYNC_DB_ENABLED: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None  # déduit de DATABASE_URL si absent
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+
+    # Mots de passe : coût bcrypt (les hashs d'un autre coût sont recalculés au login)
+    # et taille du pool de processus dédié (0 = nombre de cœurs)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 0
+
+    # Cache de l'utilisateur authentifié (memory | redis)
+    USER_CACHE_BACKEND: str = "memory"
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_REDIS_URL: Optional[str] = None
     
     # Cloudinary
     CLOUDINARY_CLOUD_NAME: Optional[str] = None
@@ -21,6 +35,14 @@ class Settings(BaseSettings):
     STRIPE_SECRET_KEY: Optional[str] = None
     STRIPE_PUBLISHABLE_KEY: Optional[str] = None
     STRIPE_WEBHOOK_SECRET: Optional[str] = None
+    # Sessions Checkout réutilisées (table checkout_sessions) : durée de vie demandée
+    # à Stripe (max 24h) et marge avant expiration en deçà de laquelle on en recrée une
+    STRIPE_CHECKOUT_TTL_SECONDS: int = 23 * 3600
+    STRIPE_CHECKOUT_REFRESH_MARGIN_SECONDS: int = 3600
+    # Webhooks : événements enregistrés puis traités par lots en tâche de fond
+    STRIPE_EVENTS_BATCH_SIZE: int = 100
+    STRIPE_EVENTS_POLL_SECONDS: float = 2.0
+    STRIPE_EVENTS_MAX_ATTEMPTS: int = 5
     
     # SendGrid
     SENDGRID_API_KEY: Optional[str] = None
@@ -33,12 +55,66 @@ class Settings(BaseSettings):
     SMTP_USERNAME: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
     SMTP_USE_TLS: bool = True
+    SMTP_POOL_SIZE: int = 8
+    SMTP_POOL_MAX_AGE_SECONDS: float = 300.0
+    SMTP_POOL_NOOP_AFTER_SECONDS: float = 30.0
+
+    # Envoi groupé des emails (relances planifiées)
+    EMAIL_DISPATCH_CONCURRENCY: int = 8
+    EMAIL_SMTP_RATE_PER_SECOND: float = 10.0  # 0 = pas de limite
+    EMAIL_SENDGRID_RATE_PER_SECOND: float = 50.0
+    REMINDER_HISTORY_BATCH_SIZE: int = 200
+
+    # Outbox email (envoi asynchrone durable)
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_SECONDS: float = 5.0
+    OUTBOX_MAX_ATTEMPTS: int = 6
+    OUTBOX_BACKOFF_BASE_SECONDS: float = 30.0
+    OUTBOX_BACKOFF_MAX_SECONDS: float = 3600.0
+    # Bail posé sur un lot réclamé : au-delà (worker arrêté en plein envoi), les emails redeviennent dus
+    OUTBOX_CLAIM_SECONDS: float = 600.0
 
     # Frontend
     FRONTEND_URL: str = "http://localhost:5173"
     APP_URL: str = "http://localhost:8080"
     TIMEZONE: str = "UTC"
+
+    # Génération des échéances (mode bulk)
+    PAYMENT_GENERATION_CHUNK_SIZE: int = 1000
+
+    # Import CSV en masse : lignes par lot (un commit + point de reprise par lot) et erreurs conservées
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000
     
+    # Flux SSE des notifications : intervalle des keep-alive
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: float = 15.0
+
+    # Cache du tableau de bord (par bailleur, invalidé à l'écriture)
+    DASHBOARD_CACHE_TTL_SECONDS: float = 60.0
+
+    # Quittances / avis PDF : dossier servi sous /receipts et taille du pool de rendu (0 = nombre de cœurs)
+    DOCUMENTS_DIR: str = "receipts"
+    DOCUMENT_RENDER_WORKERS: int = 0
+
+    # Pool de threads pour les appels bloquants depuis le code async
+    BLOCKING_POOL_SIZE: int = 8
+
+    # Instrumentation SQL par requête HTTP (en-tête Server-Timing, journal "locatus.sql") :
+    # seuil des requêtes lentes, nombre de SELECT de même forme signalé comme N+1,
+    # et levée d'une erreur sur N+1 (mode test)
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_SLOW_QUERY_MS: float = 100.0
+    SQL_SLOW_QUERY_LOG_LIMIT: int = 5
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10
+    SQL_N_PLUS_ONE_RAISE: bool = False
+
+    # Filet de sécurité contre les N+1 : relations chaudes (Tenant.user, Payment.lease, Lease.property,
+    # Lease.tenant, Property.owner) en lazy="raise_on_sql", tout accès non prévu par un plan de chargement lève
+    ORM_RAISE_ON_LAZY_LOAD: bool = False
+
+    # Endpoint /metrics (format Prometheus) et middleware de latence par route
+    METRICS_ENABLED: bool = True
+
     # Environment
     ENVIRONMENT: str = "development"
     
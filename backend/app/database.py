@@ -2,6 +2,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.utils.metrics import watch_pool
 
 db_url = settings.DATABASE_URL
 if db_url.startswith("sqlite"):
@@ -18,10 +19,46 @@ else:
     )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+watch_pool("sync", engine.pool)
+
+
+def to_async_url(url: str) -> str:
+    """postgresql:// -> postgresql+asyncpg://, sqlite:// -> sqlite+aiosqlite://"""
+    scheme, sep, rest = url.partition("://")
+    driver = scheme.split("+")[0]
+    if driver in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if driver == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DB_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url = settings.ASYNC_DATABASE_URL or to_async_url(db_url)
+    if async_url.startswith("sqlite"):
+        async_engine = create_async_engine(async_url)
+    else:
+        async_engine = create_async_engine(
+            async_url,
+            pool_pre_ping=True,
+            pool_size=10,
+            max_overflow=20,
+        )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    watch_pool("async", async_engine.pool)
 
 Base = declarative_base()
 
 
+def hot_relationship_lazy() -> str:
+    """Stratégie des relations chaudes : chargement paresseux, ou erreur si ORM_RAISE_ON_LAZY_LOAD."""
+    return "raise_on_sql" if settings.ORM_RAISE_ON_LAZY_LOAD else "select"
+
+
 def get_db():
     """Dependency for getting database session"""
     db = SessionLocal()
@@ -29,3 +66,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency for getting an async database session (ASYNC_DB_ENABLED)"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database disabled: set ASYNC_DB_ENABLED=true")
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -4,6 +4,7 @@ from app.config import settings
 from fastapi import UploadFile, File, HTTPException
 import os
 from uuid import uuid4
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 import cloudinary
 import cloudinary.uploader
@@ -19,7 +20,15 @@ from app.models.user import User
 from app.models.reminder_history import ReminderHistory
 from sqlalchemy import and_
 from app.utils.dependencies import get_current_user
+from app.utils.user_cache import CachedUser
 from app.utils.stripe_helper import create_checkout_session
+from app.services.email_outbox_service import drain_outbox
+from app.services.stripe_event_service import drain_stripe_events
+from app.services.document_service import shutdown_render_pool
+from app.utils.executor import blocking_executor, run_blocking
+from app.utils.metrics import MetricsMiddleware, registry as metrics_registry, track_job
+from app.utils.security import shutdown_password_pool
+from app.utils.sql_instrumentation import SQLInstrumentationMiddleware
 
 app = FastAPI(
     title="LOCATUS API",
@@ -45,10 +54,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-from app.api import auth, properties, tenants, leases, payments, maintenance, notifications, reminders, stripe_webhook
+# Requêtes SQL par requête HTTP : en-tête Server-Timing, journal "locatus.sql", détection des N+1
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    app.add_middleware(SQLInstrumentationMiddleware)
+# Latence par route et requêtes en cours, exposées sur /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+from app.api import auth, properties, tenants, leases, payments, maintenance, notifications, reminders, stripe_webhook, admin, dashboard, imports
 
 api_prefix = "/api"
 
+if settings.ASYNC_DB_ENABLED:
+    # Lectures chaudes en async : enregistrées en premier, elles remplacent les routes sync homonymes
+    app.include_router(properties.async_router, prefix=api_prefix)
+    app.include_router(properties.async_router, include_in_schema=False)
+    app.include_router(payments.async_router)
+    app.include_router(notifications.async_router)
+    app.include_router(reminders.async_router)
+
 app.include_router(auth.router)
 # Exposition principale sur /api/...
 app.include_router(properties.router, prefix=api_prefix)
@@ -59,6 +83,9 @@ app.include_router(maintenance.router)
 app.include_router(notifications.router)
 app.include_router(reminders.router)
 app.include_router(stripe_webhook.router)
+app.include_router(admin.router)
+app.include_router(dashboard.router)
+app.include_router(imports.router)
 # Alias plats sans /api pour les appels directs depuis http://localhost:8080/tenants, /properties, /leases
 app.include_router(properties.router, include_in_schema=False)
 app.include_router(tenants.router, include_in_schema=False)
@@ -76,11 +103,18 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Format texte Prometheus : API, pools (SQL, appels bloquants), emails, Stripe, tâches de fond."""
+        return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Endpoint simple d'upload (stockage local ./uploads)
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
-RECEIPTS_DIR = "receipts"
+RECEIPTS_DIR = settings.DOCUMENTS_DIR
 os.makedirs(RECEIPTS_DIR, exist_ok=True)
 app.mount("/receipts", StaticFiles(directory=RECEIPTS_DIR), name="receipts")
 
@@ -93,10 +127,15 @@ if settings.CLOUDINARY_CLOUD_NAME and settings.CLOUDINARY_API_KEY and settings.C
         secure=True
     )
 
+def _write_file(path: str, data: bytes) -> None:
+    with open(path, "wb") as buffer:
+        buffer.write(data)
+
+
 @app.post("/api/upload")
 async def upload_image(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
 ):
     # petite protection : uniquement images
     allowed_types = {"image/png", "image/jpeg", "image/jpg", "image/webp"}
@@ -109,7 +148,9 @@ async def upload_image(
     # Si Cloudinary est configuré on l'utilise, sinon fallback local
     if settings.CLOUDINARY_CLOUD_NAME and settings.CLOUDINARY_API_KEY and settings.CLOUDINARY_API_SECRET:
         try:
-            upload_result = cloudinary.uploader.upload(
+            # Appel réseau synchrone : exécuté hors de la boucle d'événements
+            upload_result = await run_blocking(
+                cloudinary.uploader.upload,
                 data,
                 folder="locatus"
             )
@@ -120,8 +161,7 @@ async def upload_image(
         ext = os.path.splitext(file.filename or "")[1].lower()
         safe_name = f"{uuid4().hex}{ext if ext in ['.png', '.jpg', '.jpeg', '.webp'] else ''}"
         path = os.path.join(UPLOAD_DIR, safe_name)
-        with open(path, "wb") as buffer:
-            buffer.write(data)
+        await run_blocking(_write_file, path, data)
         return {"url": f"/uploads/{safe_name}"}
 
 
@@ -132,51 +172,60 @@ REMINDER_WINDOW_DAYS = 5  # paiements dont l'échéance est dans <= 5 jours ou d
 LAST_MONTHLY_REMINDER_RUN = None
 
 
+async def run_reminder_cycle():
+    """Une itération de relances ; le travail synchrone (DB, SMTP, Stripe) tourne dans le pool bloquant."""
+    global LAST_MONTHLY_REMINDER_RUN
+    now = datetime.utcnow()
+    # Relance élargie le 1er du mois (tous les paiements du mois en cours)
+    if now.day == 1 and LAST_MONTHLY_REMINDER_RUN != now.date():
+        await run_blocking(send_monthly_first_day_reminders)
+        LAST_MONTHLY_REMINDER_RUN = now.date()
+    await run_blocking(send_pending_reminders)
+
+
 async def reminder_loop():
     """Boucle périodique pour envoyer des relances de paiement (SendGrid)."""
     can_email = bool(settings.SMTP_HOST or settings.SENDGRID_API_KEY)
     if not can_email:
         return
-    global LAST_MONTHLY_REMINDER_RUN
     while True:
         try:
-            now = datetime.utcnow()
-            # Relance élargie le 1er du mois (tous les paiements du mois en cours)
-            if now.day == 1 and LAST_MONTHLY_REMINDER_RUN != now.date():
-                send_monthly_first_day_reminders()
-                LAST_MONTHLY_REMINDER_RUN = now.date()
-            send_pending_reminders()
+            with track_job("reminder_loop"):
+                await run_reminder_cycle()
         except Exception as e:
             print(f"[reminders] error: {e}")
         await asyncio.sleep(3600)  # vérifie toutes les heures
 
 
+def _pending_reminders_query(db, now: datetime):
+    cutoff = now + timedelta(days=REMINDER_WINDOW_DAYS)
+    return (
+        db.query(Payment, Lease, Property, Tenant, User)
+        .join(Lease, Payment.lease_id == Lease.id)
+        .join(Property, Lease.property_id == Property.id)
+        .join(Tenant, Lease.tenant_id == Tenant.id)
+        .join(User, Tenant.user_id == User.id)
+        .filter(
+            Property.status != PropertyStatus.OFFLINE,
+            Payment.status.in_([PaymentStatus.PENDING, PaymentStatus.LATE, PaymentStatus.PARTIAL]),
+            Payment.due_date <= cutoff.date(),
+            (Payment.reminder_count == None) | (Payment.reminder_count < REMINDER_MAX),
+            (
+                (Payment.last_reminder_at == None)
+                | (Payment.last_reminder_at <= now - timedelta(hours=REMINDER_INTERVAL_HOURS))
+            ),
+        )
+    )
+
+
 def send_pending_reminders():
     db = SessionLocal()
     try:
         now = datetime.utcnow()
-        cutoff = now + timedelta(days=REMINDER_WINDOW_DAYS)
-        payments = (
-            db.query(Payment, Lease, Property, Tenant, User)
-            .join(Lease, Payment.lease_id == Lease.id)
-            .join(Property, Lease.property_id == Property.id)
-            .join(Tenant, Lease.tenant_id == Tenant.id)
-            .join(User, Tenant.user_id == User.id)
-            .filter(
-                Property.status != PropertyStatus.OFFLINE,
-                Payment.status.in_([PaymentStatus.PENDING, PaymentStatus.LATE, PaymentStatus.PARTIAL]),
-                Payment.due_date <= cutoff.date(),
-                (Payment.reminder_count == None) | (Payment.reminder_count < REMINDER_MAX),
-                (
-                    (Payment.last_reminder_at == None)
-                    | (Payment.last_reminder_at <= now - timedelta(hours=REMINDER_INTERVAL_HOURS))
-                ),
-            )
-            .all()
-        )
+        payments = _pending_reminders_query(db, now).all()
 
         for payment, lease, prop, tenant, user in payments:
-            send_reminder_email(user.email, user.first_name, prop.title, payment)
+            send_reminder_email(user.email, user.first_name, prop.title, payment, db=db)
             payment.reminder_count = (payment.reminder_count or 0) + 1
             payment.last_reminder_at = now
         db.commit()
@@ -184,8 +233,8 @@ def send_pending_reminders():
         db.close()
 
 
-def send_reminder_email(to_email: str, first_name: str, property_title: str, payment: Payment):
-    """Envoie une relance via SMTP (fallback SendGrid si configuré)."""
+def send_reminder_email(to_email: str, first_name: str, property_title: str, payment: Payment, db=None):
+    """Envoie une relance via SMTP (fallback SendGrid si configuré) ; `db` permet de réutiliser la session Checkout."""
     if not to_email:
         return
     subject = f"Relance de paiement - {property_title}"
@@ -199,6 +248,7 @@ def send_reminder_email(to_email: str, first_name: str, property_title: str, pay
         success_url=success_url,
         cancel_url=cancel_url,
         metadata={"payment_id": payment.id, "lease_id": payment.lease_id},
+        db=db,
     ) or f"{app_base.rstrip('/')}/payments"
     content = f"""
 Bonjour {first_name},
@@ -253,7 +303,7 @@ def send_monthly_first_day_reminders():
                 continue
 
             try:
-                send_reminder_email(user.email, user.first_name, prop.title, payment)
+                send_reminder_email(user.email, user.first_name, prop.title, payment, db=db)
             except Exception as e:
                 print(f"[reminders] monthly send failed for payment {payment.id}: {e}")
                 continue
@@ -276,7 +326,54 @@ def send_monthly_first_day_reminders():
         db.close()
 
 
+def _drain_outbox_once():
+    db = SessionLocal()
+    try:
+        return drain_outbox(db)
+    finally:
+        db.close()
+
+
+async def outbox_loop():
+    """Worker d'outbox : expédie les emails mis en file par les endpoints."""
+    while True:
+        try:
+            await run_blocking(_drain_outbox_once)
+        except Exception as e:
+            print(f"[outbox] error: {e}")
+        await asyncio.sleep(settings.OUTBOX_POLL_SECONDS)
+
+
+def _drain_stripe_events_once():
+    db = SessionLocal()
+    try:
+        return drain_stripe_events(db)
+    finally:
+        db.close()
+
+
+async def stripe_events_loop():
+    """Consommateur des webhooks Stripe enregistrés par /api/stripe/webhook."""
+    while True:
+        try:
+            await run_blocking(_drain_stripe_events_once)
+        except Exception as e:
+            print(f"[stripe] events error: {e}")
+        await asyncio.sleep(settings.STRIPE_EVENTS_POLL_SECONDS)
+
+
 @app.on_event("startup")
 async def startup_event():
     if settings.SENDGRID_API_KEY:
         asyncio.create_task(reminder_loop())
+    if settings.SMTP_HOST or settings.SENDGRID_API_KEY:
+        asyncio.create_task(outbox_loop())
+    if settings.STRIPE_WEBHOOK_SECRET:
+        asyncio.create_task(stripe_events_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    blocking_executor.shutdown()
+    shutdown_password_pool()
+    shutdown_render_pool()
@@ -5,3 +5,7 @@ from app.models.lease import Lease
 from app.models.payment import Payment
 from app.models.notification import Notification
 from app.models.maintenance import MaintenanceRequest
+from app.models.email_outbox import EmailOutbox
+from app.models.checkout_session import CheckoutSession
+from app.models.stripe_event import StripeEvent
+from app.models.import_job import ImportJob
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class CheckoutSession(Base):
+    """
+    Dernière session Stripe Checkout (ou Payment Link de secours) créée pour un objet
+    facturé, réutilisée tant qu'elle n'approche pas de son expiration.
+    `reference` vaut payment:{id} ou lease:{id} suivi d'une empreinte des URLs de retour et du libellé
+    (voir stripe_helper._checkout_reference) ; `amount` est en plus petite unité Stripe.
+    """
+
+    __tablename__ = "checkout_sessions"
+    __table_args__ = (
+        UniqueConstraint("reference", "amount", "currency", name="uq_checkout_sessions_reference_amount_currency"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    reference = Column(String, nullable=False)
+    amount = Column(Integer, nullable=False)
+    currency = Column(String(3), nullable=False)
+    stripe_id = Column(String, nullable=True)
+    url = Column(String, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<CheckoutSession {self.reference} {self.amount} {self.currency}>"
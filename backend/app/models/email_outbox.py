@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, Index
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
+
+
+class EmailOutbox(Base):
+    """
+    Email sortant en attente d'envoi, écrit dans la même transaction que le changement métier
+    puis expédié par le worker d'outbox (app.services.email_outbox_service).
+    """
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    html_content = Column(Text)
+    status = Column(
+        SQLEnum(OutboxStatus, values_callable=lambda x: [e.value for e in x], name="outboxstatus"),
+        default=OutboxStatus.PENDING,
+        nullable=False,
+    )
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(String)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} to={self.to_email} ({self.status})>"
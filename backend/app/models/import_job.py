@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, UniqueConstraint, Enum as SQLEnum
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+
+class ImportStatus(str, enum.Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportJob(Base):
+    """
+    Import CSV en masse d'un bailleur (app.services.import_service).
+    `rows_processed` est le point de reprise : il est commité avec chaque lot, si bien
+    qu'un nouvel envoi du même fichier (même empreinte) reprend après la dernière ligne écrite.
+    """
+
+    __tablename__ = "import_jobs"
+    __table_args__ = (
+        UniqueConstraint("owner_id", "digest", name="uq_import_jobs_owner_id_digest"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    filename = Column(String)
+    digest = Column(String(64), nullable=False)  # SHA-256 du fichier
+    status = Column(
+        SQLEnum(ImportStatus, values_callable=lambda x: [e.value for e in x], name="importstatus"),
+        default=ImportStatus.RUNNING,
+        nullable=False,
+    )
+    rows_processed = Column(Integer, default=0, nullable=False)
+    rows_imported = Column(Integer, default=0, nullable=False)
+    rows_failed = Column(Integer, default=0, nullable=False)
+    errors = Column(JSON)  # [{"row": n° de ligne, "error": message}], tronqué à IMPORT_MAX_REPORTED_ERRORS
+    last_error = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<ImportJob {self.id} owner={self.owner_id} ({self.status})>"
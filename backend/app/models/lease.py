@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, Float, Date, String, Enum as SQLEnum, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, Date, String, Enum as SQLEnum, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.database import Base
+from app.database import Base, hot_relationship_lazy
 import enum
 from typing import Optional
 
@@ -14,6 +14,12 @@ class LeaseStatus(str, enum.Enum):
 
 class Lease(Base):
     __tablename__ = "leases"
+    __table_args__ = (
+        Index("ix_leases_property_id_status", "property_id", "status"),
+        Index("ix_leases_tenant_id_status", "tenant_id", "status"),
+        # Parcours des baux actifs par tranches d'id (génération des échéances)
+        Index("ix_leases_status_id", "status", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
@@ -36,8 +42,8 @@ class Lease(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    property = relationship("Property", back_populates="leases")
-    tenant = relationship("Tenant", back_populates="leases")
+    property = relationship("Property", back_populates="leases", lazy=hot_relationship_lazy())
+    tenant = relationship("Tenant", back_populates="leases", lazy=hot_relationship_lazy())
     payments = relationship("Payment", back_populates="lease", cascade="all, delete-orphan")
     
     def __repr__(self):
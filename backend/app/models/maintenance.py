@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum as SQLEnum, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Enum as SQLEnum, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -29,6 +29,9 @@ class MaintenancePriority(str, enum.Enum):
 
 class MaintenanceRequest(Base):
     __tablename__ = "maintenance_requests"
+    __table_args__ = (
+        Index("ix_maintenance_requests_property_id_created_at", "property_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
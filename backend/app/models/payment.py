@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, Float, Date, String, Enum as SQLEnum, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, Date, String, Enum as SQLEnum, ForeignKey, DateTime, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.database import Base
+from app.database import Base, hot_relationship_lazy
 import enum
 
 
@@ -22,6 +22,20 @@ class PaymentMethod(str, enum.Enum):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Sert aussi d'index (lease_id, due_date) pour les jointures depuis leases
+        UniqueConstraint("lease_id", "due_date", name="uq_payments_lease_id_due_date"),
+        # Relances et listes filtrées par statut puis échéance ; lease_id et amount rendent
+        # l'index couvrant pour les agrégats du tableau de bord
+        Index("ix_payments_status_due_date_lease_id_amount", "status", "due_date", "lease_id", "amount"),
+        # Relances planifiées : échéances non réglées uniquement (index partiel)
+        Index(
+            "ix_payments_unpaid_due_date",
+            "due_date",
+            postgresql_where=text("payment_date IS NULL"),
+            sqlite_where=text("payment_date IS NULL"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     lease_id = Column(Integer, ForeignKey("leases.id"), nullable=False)
@@ -44,7 +58,7 @@ class Payment(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    lease = relationship("Lease", back_populates="payments")
+    lease = relationship("Lease", back_populates="payments", lazy=hot_relationship_lazy())
     
     def __repr__(self):
         return f"<Payment lease_id={self.lease_id} amount={self.amount} ({self.status})>"
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, Enum as SQLEnum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.database import Base
+from app.database import Base, hot_relationship_lazy
 import enum
 
 
@@ -21,6 +21,10 @@ class PropertyStatus(str, enum.Enum):
 
 class Property(Base):
     __tablename__ = "properties"
+    __table_args__ = (
+        # property_type rend l'index couvrant pour la répartition du tableau de bord
+        Index("ix_properties_owner_id_status_property_type", "owner_id", "status", "property_type"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -52,7 +56,7 @@ class Property(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    owner = relationship("User", back_populates="properties")
+    owner = relationship("User", back_populates="properties", lazy=hot_relationship_lazy())
     leases = relationship("Lease", back_populates="property", cascade="all, delete-orphan")
     maintenance_requests = relationship("MaintenanceRequest", back_populates="property", cascade="all, delete-orphan")
     
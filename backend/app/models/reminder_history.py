@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, JSON, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Date, DateTime, JSON, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -12,6 +12,8 @@ class ReminderHistory(Base):
     __tablename__ = "reminder_history"
     __table_args__ = (
         UniqueConstraint("key", name="uq_reminder_history_key"),
+        # Anti-jointure "déjà envoyé" des relances planifiées
+        Index("ix_reminder_history_tenant_id_due_date_step", "tenant_id", "due_date", "step"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
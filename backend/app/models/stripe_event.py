@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, Index
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+
+class StripeEventStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSED = "processed"
+    FAILED = "failed"
+
+
+class StripeEvent(Base):
+    """
+    Événement webhook Stripe brut, enregistré par l'endpoint (clé = id Stripe, ce qui
+    dédoublonne les renvois) puis traité par le consommateur
+    (app.services.stripe_event_service).
+    """
+
+    __tablename__ = "stripe_events"
+    __table_args__ = (
+        Index("ix_stripe_events_status_created_id", "status", "stripe_created", "id"),
+    )
+
+    id = Column(String, primary_key=True)
+    type = Column(String, nullable=False)
+    # payment:{id} ou lease:{id} : les événements d'une même clé sont traités dans l'ordre
+    ordering_key = Column(String, nullable=True)
+    payload = Column(Text, nullable=False)
+    status = Column(
+        SQLEnum(StripeEventStatus, values_callable=lambda x: [e.value for e in x], name="stripeeventstatus"),
+        default=StripeEventStatus.PENDING,
+        nullable=False,
+    )
+    stripe_created = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(String)
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    processed_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<StripeEvent {self.id} {self.type} ({self.status})>"
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, Date, JSON, ForeignKey
 from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import Base, hot_relationship_lazy
 
 
 class Tenant(Base):
@@ -16,7 +16,7 @@ class Tenant(Base):
     notes = Column(String)
     
     # Relationships
-    user = relationship("User", back_populates="tenant_profile")
+    user = relationship("User", back_populates="tenant_profile", lazy=hot_relationship_lazy())
     leases = relationship("Lease", back_populates="tenant", cascade="all, delete-orphan")
     maintenance_requests = relationship("MaintenanceRequest", back_populates="tenant", cascade="all, delete-orphan")
     
@@ -26,6 +26,8 @@ class User(Base):
         nullable=False,
     )
     is_active = Column(Boolean, default=True)
+    # Maintenu par app.services.notification_service (hooks de session)
+    unread_notification_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
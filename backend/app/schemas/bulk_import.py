@@ -0,0 +1,89 @@
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime
+from app.models.import_job import ImportStatus
+from app.models.property import PropertyType
+
+TENANT_FIELDS = ("tenant_email", "tenant_first_name", "tenant_last_name", "tenant_phone", "tenant_password")
+
+
+class ImportRow(BaseModel):
+    """
+    Une ligne du CSV d'import : un bien, et optionnellement son locataire et son bail.
+    Les cellules vides valent None ; les colonnes inconnues sont ignorées.
+    """
+
+    title: str
+    property_type: PropertyType
+    address: str
+    city: str
+    postal_code: Optional[str] = None
+    description: Optional[str] = None
+    surface_area: Optional[float] = Field(None, ge=0)
+    rooms: Optional[int] = Field(None, ge=0)
+    bedrooms: Optional[int] = Field(None, ge=0)
+    bathrooms: Optional[int] = Field(None, ge=0)
+    rent_amount: float = Field(..., ge=0)
+    charges: Optional[float] = Field(0, ge=0)
+    deposit: Optional[float] = Field(None, ge=0)
+
+    tenant_email: Optional[EmailStr] = None
+    tenant_first_name: Optional[str] = None
+    tenant_last_name: Optional[str] = None
+    tenant_phone: Optional[str] = None
+    tenant_password: Optional[str] = None
+
+    lease_start_date: Optional[date] = None
+    lease_end_date: Optional[date] = None
+    lease_rent_amount: Optional[float] = Field(None, ge=0)
+    lease_charges: Optional[float] = Field(None, ge=0)
+    lease_deposit_paid: Optional[float] = Field(None, ge=0)
+    lease_payment_day: Optional[int] = Field(None, ge=1, le=31)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _blank_cells_to_none(cls, data: Any) -> Any:
+        if isinstance(data, dict):
+            return {
+                key: (value.strip() or None) if isinstance(value, str) else value
+                for key, value in data.items()
+                if key is not None
+            }
+        return data
+
+    @model_validator(mode="after")
+    def _check_groups(self) -> "ImportRow":
+        has_tenant = any(getattr(self, name) for name in TENANT_FIELDS)
+        if has_tenant and not (self.tenant_email and self.tenant_first_name and self.tenant_last_name):
+            raise ValueError("tenant_email, tenant_first_name et tenant_last_name sont requis pour un locataire")
+        has_lease = any(
+            value is not None
+            for value in (self.lease_end_date, self.lease_rent_amount, self.lease_charges,
+                          self.lease_deposit_paid, self.lease_payment_day)
+        )
+        if has_lease and not self.lease_start_date:
+            raise ValueError("lease_start_date est requis pour un bail")
+        if self.lease_start_date and not self.tenant_email:
+            raise ValueError("un bail nécessite un locataire")
+        if self.lease_start_date and self.lease_end_date and self.lease_end_date < self.lease_start_date:
+            raise ValueError("lease_end_date est antérieure à lease_start_date")
+        return self
+
+
+REQUIRED_COLUMNS = [name for name, field in ImportRow.model_fields.items() if field.is_required()]
+
+
+class ImportJobResponse(BaseModel):
+    id: int
+    filename: Optional[str] = None
+    status: ImportStatus
+    rows_processed: int
+    rows_imported: int
+    rows_failed: int
+    errors: Optional[List[Dict[str, Any]]] = []
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,53 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import date, datetime
+
+
+class MonthlyCollection(BaseModel):
+    month: str  # YYYY-MM
+    collected: float  # loyers réglés pour les échéances du mois
+
+
+class DashboardPayment(BaseModel):
+    id: int
+    lease_id: int
+    amount: float
+    due_date: date
+    payment_date: Optional[date] = None
+    status: str
+    property_title: str
+    property_city: str
+
+
+class DashboardSummary(BaseModel):
+    """Agrégats du tableau de bord d'un bailleur, calculés côté SQL."""
+
+    generated_at: datetime
+    today: date
+    month: str  # YYYY-MM
+
+    properties_total: int
+    properties_by_status: Dict[str, int]
+    properties_by_type: Dict[str, int]
+    occupancy_rate: float  # 0..1, biens occupés / biens hors "fermé"
+
+    active_leases: int
+    active_tenants: int
+    monthly_rent_roll: float  # loyers + charges des baux actifs
+
+    expected_this_month: float
+    collected_this_month: float
+    collection_rate: float
+
+    late_count: int
+    late_amount: float
+    upcoming_days: int
+    upcoming_count: int
+    upcoming_amount: float
+
+    open_maintenance: Dict[str, int]
+    open_maintenance_total: int
+
+    revenue_trend: List[MonthlyCollection]  # six derniers mois, le plus ancien d'abord
+    upcoming_payments: List[DashboardPayment]  # prochaines échéances non réglées
+    recent_payments: List[DashboardPayment]  # dernières échéances (ordre de la liste des paiements)
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import calendar
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.lease import Lease, LeaseStatus
+from app.models.maintenance import MaintenanceRequest, MaintenanceStatus
+from app.models.payment import Payment, PaymentStatus
+from app.models.property import Property, PropertyStatus
+from app.schemas.dashboard import DashboardPayment, DashboardSummary, MonthlyCollection
+
+UNPAID_STATUSES = (PaymentStatus.PENDING, PaymentStatus.LATE, PaymentStatus.PARTIAL)
+OPEN_MAINTENANCE_STATUSES = (MaintenanceStatus.PENDING, MaintenanceStatus.IN_PROGRESS)
+
+
+def _value(item) -> str:
+    return getattr(item, "value", item) or "unknown"
+
+
+def _month_bounds(today: date) -> Tuple[date, date]:
+    last_day = calendar.monthrange(today.year, today.month)[1]
+    return today.replace(day=1), today.replace(day=last_day)
+
+
+TREND_MONTHS = 6
+UPCOMING_LIMIT = 4
+RECENT_LIMIT = 5
+
+
+def _trend_months(month_start: date) -> List[Tuple[date, date]]:
+    """Bornes des TREND_MONTHS derniers mois (mois courant inclus), le plus ancien d'abord."""
+    months = [_month_bounds(month_start)]
+    while len(months) < TREND_MONTHS:
+        months.append(_month_bounds(months[-1][0] - timedelta(days=1)))
+    return months[::-1]
+
+
+def _owner_payments(owner_id: int):
+    return (
+        select(
+            Payment.id, Payment.lease_id, Payment.amount, Payment.due_date, Payment.payment_date, Payment.status,
+            Property.title, Property.city,
+        )
+        .join(Lease, Payment.lease_id == Lease.id)
+        .join(Property, Lease.property_id == Property.id)
+        .where(Property.owner_id == owner_id)
+    )
+
+
+def _dashboard_payments(rows) -> List[DashboardPayment]:
+    return [
+        DashboardPayment(
+            id=payment_id, lease_id=lease_id, amount=amount, due_date=due_date, payment_date=payment_date,
+            status=_value(status), property_title=title, property_city=city,
+        )
+        for payment_id, lease_id, amount, due_date, payment_date, status, title, city in rows
+    ]
+
+
+def compute_owner_summary(db: Session, owner_id: int, today: Optional[date] = None, upcoming_days: int = 30) -> DashboardSummary:
+    """
+    Calcule les agrégats du tableau de bord en requêtes GROUP BY filtrées par bailleur
+    (index properties.owner_id puis jointures indexées), plus les deux courtes listes de la page.
+    Les agrégats de paiements ne lisent que l'index couvrant (status, due_date, lease_id, amount),
+    jamais la table payments.
+    """
+    today = today or date.today()
+    month_start, month_end = _month_bounds(today)
+    upcoming_end = today + timedelta(days=upcoming_days)
+
+    by_status: Dict[str, int] = {}
+    by_type: Dict[str, int] = {}
+    rows = db.execute(
+        select(Property.status, Property.property_type, func.count(Property.id))
+        .where(Property.owner_id == owner_id)
+        .group_by(Property.status, Property.property_type)
+    )
+    for status, property_type, count in rows:
+        by_status[_value(status)] = by_status.get(_value(status), 0) + count
+        by_type[_value(property_type)] = by_type.get(_value(property_type), 0) + count
+    properties_total = sum(by_status.values())
+    rentable = properties_total - by_status.get(PropertyStatus.OFFLINE.value, 0)
+    occupied = by_status.get(PropertyStatus.OCCUPIED.value, 0)
+
+    active_leases, active_tenants, rent_roll = db.execute(
+        select(
+            func.count(Lease.id),
+            func.count(func.distinct(Lease.tenant_id)),
+            func.coalesce(func.sum(Lease.rent_amount + func.coalesce(Lease.charges, 0)), 0),
+        )
+        .join(Property, Lease.property_id == Property.id)
+        .where(Property.owner_id == owner_id, Lease.status == LeaseStatus.ACTIVE)
+    ).one()
+
+    # La liste exhaustive des statuts fait parcourir l'index (status, due_date, ...) par plages
+    # plutôt que de sonder les paiements bail par bail
+    expected, collected = 0, 0
+    rows = db.execute(
+        select(Payment.status, func.sum(Payment.amount))
+        .join(Lease, Payment.lease_id == Lease.id)
+        .join(Property, Lease.property_id == Property.id)
+        .where(
+            Property.owner_id == owner_id,
+            Payment.status.in_(tuple(PaymentStatus)),
+            Payment.due_date.between(month_start, month_end),
+        )
+        .group_by(Payment.status)
+    )
+    for status, amount in rows:
+        expected += amount
+        if status == PaymentStatus.PAID:
+            collected = amount
+
+    # Tendance : encaissements par mois d'échéance, regroupés par date puis répartis en Python ;
+    # le mois courant vient de la requête précédente
+    trend = _trend_months(month_start)
+    collected_by_month = {start.strftime("%Y-%m"): 0.0 for start, _ in trend}
+    collected_by_month[month_start.strftime("%Y-%m")] = float(collected)
+    rows = db.execute(
+        select(Payment.due_date, func.sum(Payment.amount))
+        .join(Lease, Payment.lease_id == Lease.id)
+        .join(Property, Lease.property_id == Property.id)
+        .where(
+            Property.owner_id == owner_id,
+            Payment.status == PaymentStatus.PAID,
+            Payment.due_date >= trend[0][0],
+            Payment.due_date < month_start,
+        )
+        .group_by(Payment.due_date)
+    )
+    for due_date, amount in rows:
+        collected_by_month[due_date.strftime("%Y-%m")] += float(amount)
+
+    # Impayés : en retard si statut "late" ou échéance passée, à venir sinon (même règle que le front).
+    # Deux plages de l'index (status, due_date, ...) plutôt qu'un CASE évalué sur chaque ligne.
+    unpaid = (
+        select(func.count(Payment.id), func.coalesce(func.sum(Payment.amount), 0))
+        .join(Lease, Payment.lease_id == Lease.id)
+        .join(Property, Lease.property_id == Property.id)
+        .where(Property.owner_id == owner_id, Payment.status.in_(UNPAID_STATUSES))
+    )
+    late_count, late_amount = db.execute(unpaid.where(Payment.due_date < today)).one()
+    upcoming_count, upcoming_amount = 0, 0
+    rows = db.execute(
+        unpaid.add_columns(Payment.status)
+        .where(Payment.due_date.between(today, upcoming_end))
+        .group_by(Payment.status)
+    )
+    for count, amount, status in rows:
+        if status == PaymentStatus.LATE:
+            late_count, late_amount = late_count + count, late_amount + amount
+        else:
+            upcoming_count, upcoming_amount = upcoming_count + count, upcoming_amount + amount
+
+    open_maintenance = {status.value: 0 for status in OPEN_MAINTENANCE_STATUSES}
+    rows = db.execute(
+        select(MaintenanceRequest.status, func.count(MaintenanceRequest.id))
+        .join(Property, MaintenanceRequest.property_id == Property.id)
+        .where(Property.owner_id == owner_id, MaintenanceRequest.status.in_(OPEN_MAINTENANCE_STATUSES))
+        .group_by(MaintenanceRequest.status)
+    )
+    for status, count in rows:
+        open_maintenance[_value(status)] = count
+
+    # Un parcours ordonné de l'index par statut s'arrête après UPCOMING_LIMIT lignes ; un IN sur
+    # les trois statuts trierait toutes les échéances futures. (lease_id, due_date) est unique.
+    upcoming_rows = []
+    for status in UNPAID_STATUSES:
+        upcoming_rows += db.execute(
+            _owner_payments(owner_id)
+            .where(Payment.status == status, Payment.due_date >= today)
+            .order_by(Payment.due_date.asc(), Payment.lease_id.asc())
+            .limit(UPCOMING_LIMIT)
+        ).all()
+    upcoming_rows.sort(key=lambda row: (row.due_date, row.lease_id))
+    upcoming_payments = _dashboard_payments(upcoming_rows[:UPCOMING_LIMIT])
+    # Derniers encaissements, dans l'ordre de l'index (status, due_date, lease_id)
+    recent_payments = _dashboard_payments(db.execute(
+        _owner_payments(owner_id)
+        .where(Payment.status == PaymentStatus.PAID, Payment.due_date <= today)
+        .order_by(Payment.due_date.desc(), Payment.lease_id.desc())
+        .limit(RECENT_LIMIT)
+    ))
+
+    return DashboardSummary(
+        generated_at=datetime.now(timezone.utc),
+        today=today,
+        month=month_start.strftime("%Y-%m"),
+        properties_total=properties_total,
+        properties_by_status=by_status,
+        properties_by_type=by_type,
+        occupancy_rate=round(occupied / rentable, 4) if rentable else 0.0,
+        active_leases=active_leases,
+        active_tenants=active_tenants,
+        monthly_rent_roll=float(rent_roll),
+        expected_this_month=float(expected),
+        collected_this_month=float(collected),
+        collection_rate=round(float(collected) / float(expected), 4) if expected else 0.0,
+        late_count=int(late_count),
+        late_amount=float(late_amount),
+        upcoming_days=upcoming_days,
+        upcoming_count=int(upcoming_count),
+        upcoming_amount=float(upcoming_amount),
+        open_maintenance=open_maintenance,
+        open_maintenance_total=sum(open_maintenance.values()),
+        revenue_trend=[
+            MonthlyCollection(month=month, collected=amount) for month, amount in collected_by_month.items()
+        ],
+        upcoming_payments=upcoming_payments,
+        recent_payments=recent_payments,
+    )
+
+
+class SummaryCache:
+    """
+    Cache par bailleur, propre au processus. Les écritures ORM sur biens, baux,
+    paiements et demandes de maintenance l'invalident après commit (voir hooks
+    plus bas) ; le TTL borne la fraîcheur entre plusieurs workers.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl = ttl_seconds
+        self._items: Dict[Tuple[int, date, int], Tuple[float, DashboardSummary]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[int, date, int]) -> Optional[DashboardSummary]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] < time.monotonic():
+                self._items.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Tuple[int, date, int], summary: DashboardSummary) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, summary)
+
+    def invalidate(self, owner_ids: Optional[Iterable[int]] = None) -> None:
+        """Sans argument, vide tout le cache (écritures en masse hors ORM)."""
+        with self._lock:
+            if owner_ids is None:
+                self._items.clear()
+                return
+            owners = set(owner_ids)
+            for key in [key for key in self._items if key[0] in owners]:
+                del self._items[key]
+
+
+summary_cache = SummaryCache(settings.DASHBOARD_CACHE_TTL_SECONDS)
+
+
+def get_owner_summary(db: Session, owner_id: int, upcoming_days: int = 30) -> DashboardSummary:
+    today = date.today()
+    key = (owner_id, today, upcoming_days)
+    summary = summary_cache.get(key)
+    if summary is None:
+        summary = compute_owner_summary(db, owner_id, today=today, upcoming_days=upcoming_days)
+        summary_cache.set(key, summary)
+    return summary
+
+
+def invalidate_dashboard(owner_ids: Optional[Iterable[int]] = None) -> None:
+    summary_cache.invalidate(owner_ids)
+
+
+# --- Invalidation automatique sur les écritures ORM -------------------------
+
+_PENDING_KEY = "dashboard_owner_ids"
+
+
+def _touched_owner_ids(session: Session) -> Set[int]:
+    owners: Set[int] = set()
+    property_ids: Set[int] = set()
+    lease_ids: Set[int] = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Property):
+            if obj.owner_id is not None:
+                owners.add(obj.owner_id)
+        elif isinstance(obj, (Lease, MaintenanceRequest)):
+            if obj.property_id is not None:
+                property_ids.add(obj.property_id)
+        elif isinstance(obj, Payment):
+            if obj.lease_id is not None:
+                lease_ids.add(obj.lease_id)
+    if lease_ids:
+        property_ids.update(
+            session.connection().execute(select(Lease.property_id).where(Lease.id.in_(lease_ids))).scalars()
+        )
+    if property_ids:
+        owners.update(
+            session.connection().execute(select(Property.owner_id).where(Property.id.in_(property_ids))).scalars()
+        )
+    return owners
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_dashboard_owners(session, flush_context, instances):
+    if not (session.new or session.dirty or session.deleted):
+        return
+    owners = _touched_owner_ids(session)
+    if owners:
+        session.info.setdefault(_PENDING_KEY, set()).update(owners)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    owners = session.info.pop(_PENDING_KEY, None)
+    if owners:
+        summary_cache.invalidate(owners)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
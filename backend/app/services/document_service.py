@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from itertools import islice
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.receipt import generate_due_notice, generate_payment_receipt
+
+# À incrémenter quand la mise en page change : les anciens fichiers ne sont plus servis
+RENDER_VERSION = 1
+DOCUMENTS_URL_PREFIX = "/receipts"
+# Nom des quittances produites avant le cache par contenu (app.utils.receipt)
+LEGACY_RECEIPT_FILENAME = "receipt-{payment_id}.pdf"
+
+
+@dataclass(frozen=True)
+class DocumentSpec:
+    """Champs imprimés sur un document ; leur empreinte nomme le fichier produit."""
+
+    kind: str  # "receipt" | "notice"
+    payment_id: int
+    amount: float
+    tenant_name: str
+    property_title: str
+    issued_on: date
+    due_date: Optional[date] = None
+
+    @property
+    def digest(self) -> str:
+        fields = [
+            RENDER_VERSION,
+            self.kind,
+            self.payment_id,
+            round(float(self.amount or 0), 2),
+            self.tenant_name or "",
+            self.property_title or "",
+            self.issued_on.isoformat(),
+            self.due_date.isoformat() if self.due_date else None,
+        ]
+        return hashlib.sha256(json.dumps(fields, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    @property
+    def filename(self) -> str:
+        return f"{self.kind}-{self.payment_id}-{self.digest[:20]}.pdf"
+
+    @property
+    def url(self) -> str:
+        return f"{DOCUMENTS_URL_PREFIX}/{self.filename}"
+
+
+def receipt_spec(payment_id: int, amount: float, tenant_name: str, property_title: str, issued_on: Optional[date] = None) -> DocumentSpec:
+    return DocumentSpec("receipt", payment_id, amount, tenant_name, property_title, issued_on or date.today())
+
+
+def notice_spec(
+    payment_id: int,
+    amount: float,
+    due_date: date,
+    tenant_name: str,
+    property_title: str,
+    issued_on: Optional[date] = None,
+) -> DocumentSpec:
+    return DocumentSpec("notice", payment_id, amount, tenant_name, property_title, issued_on or date.today(), due_date)
+
+
+def render_document(spec: DocumentSpec, output_dir: str) -> str:
+    """
+    Produit le PDF s'il n'existe pas encore (exécuté dans un processus du pool).
+    Écriture dans un fichier temporaire puis renommage : un fichier visible est complet.
+    """
+    path = os.path.join(output_dir, spec.filename)
+    if os.path.exists(path):
+        return path
+    os.makedirs(output_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if spec.kind == "notice":
+        generate_due_notice(
+            spec.payment_id, spec.amount, spec.due_date, spec.tenant_name, spec.property_title,
+            output_dir=output_dir, issued_on=spec.issued_on, filename=tmp,
+        )
+    else:
+        generate_payment_receipt(
+            spec.payment_id, spec.amount, spec.tenant_name, spec.property_title,
+            output_dir=output_dir, issued_on=spec.issued_on, filename=tmp,
+        )
+    os.replace(tmp, path)
+    return path
+
+
+def render_documents(specs: List[DocumentSpec], output_dir: str) -> List[str]:
+    """Rendu d'un lot dans un même processus (un seul aller-retour IPC par lot)."""
+    return [render_document(spec, output_dir) for spec in specs]
+
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Pool de processus dédié à ReportLab (rendu CPU, hors threads de requête)."""
+    global _render_pool
+    if _render_pool is None:
+        with _render_pool_lock:
+            if _render_pool is None:
+                workers = settings.DOCUMENT_RENDER_WORKERS or os.cpu_count() or 1
+                _render_pool = ProcessPoolExecutor(max_workers=workers)
+    return _render_pool
+
+
+def shutdown_render_pool() -> None:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+            _render_pool = None
+
+
+class DocumentRenderer:
+    """
+    Rendu des documents avec cache par contenu : un document déjà produit est une simple
+    vérification de fichier, un rendu en cours est partagé entre les demandeurs.
+    """
+
+    def __init__(self, output_dir: str, executor: Optional[Executor] = None):
+        self.output_dir = output_dir
+        self._executor = executor
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.renders = 0
+        self.failures = 0
+
+    def path_for(self, spec: DocumentSpec) -> str:
+        return os.path.join(self.output_dir, spec.filename)
+
+    def is_ready(self, spec: DocumentSpec) -> bool:
+        return os.path.exists(self.path_for(spec))
+
+    def existing_path(self, spec: DocumentSpec) -> Optional[str]:
+        """
+        Fichier déjà sur disque pour ce document : nom par contenu, sinon, pour une quittance,
+        l'ancien receipt-{id}.pdf produit avant le cache (repris tel quel par les exports).
+        """
+        path = self.path_for(spec)
+        if os.path.exists(path):
+            return path
+        if spec.kind == "receipt":
+            legacy = os.path.join(self.output_dir, LEGACY_RECEIPT_FILENAME.format(payment_id=spec.payment_id))
+            if os.path.exists(legacy):
+                return legacy
+        return None
+
+    def submit(self, spec: DocumentSpec) -> "Future[str]":
+        """Future du chemin du document, déjà résolue si le fichier existe."""
+        path = self.path_for(spec)
+        with self._lock:
+            if os.path.exists(path):
+                self.hits += 1
+                done: Future = Future()
+                done.set_result(path)
+                return done
+            future = self._pending.get(spec.digest)
+            if future is not None:
+                self.hits += 1
+                return future
+            self.renders += 1
+            future = (self._executor or get_render_pool()).submit(render_document, spec, self.output_dir)
+            self._pending[spec.digest] = future
+        future.add_done_callback(lambda f, digest=spec.digest: self._finished(digest, f))
+        return future
+
+    def _finished(self, digest: str, future: Future) -> None:
+        with self._lock:
+            self._pending.pop(digest, None)
+            if not future.cancelled() and future.exception() is not None:
+                self.failures += 1
+                logging.error(f"[documents] rendu {digest[:20]} en échec: {future.exception()}")
+
+    def request(self, spec: DocumentSpec) -> str:
+        """Lance le rendu si besoin et retourne aussitôt l'URL définitive du document."""
+        self.submit(spec)
+        return spec.url
+
+    def ensure(self, spec: DocumentSpec, timeout: Optional[float] = None) -> str:
+        """Chemin du document, en attendant la fin du rendu si nécessaire."""
+        return self.submit(spec).result(timeout)
+
+    def ensure_many(
+        self, specs: Iterable[DocumentSpec], chunk_size: int = 32, window: Optional[int] = None
+    ) -> Iterator[Tuple[DocumentSpec, str]]:
+        """
+        (spec, chemin) des documents, dans l'ordre, pour un export en masse. Les fichiers existants,
+        y compris les anciennes quittances receipt-{id}.pdf, sont repris ; les documents manquants
+        sont rendus par lots de `chunk_size` ; au plus `window` lots sont en vol, de sorte
+        que la mémoire reste bornée quel que soit le nombre de documents.
+        """
+        executor = self._executor or get_render_pool()
+        window = window or 2 * (getattr(executor, "_max_workers", None) or os.cpu_count() or 1)
+        in_flight: Deque = deque()
+        iterator = iter(specs)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if chunk:
+                existing = [self.existing_path(spec) for spec in chunk]
+                missing = [spec for spec, path in zip(chunk, existing) if path is None]
+                with self._lock:
+                    self.hits += len(chunk) - len(missing)
+                    self.renders += len(missing)
+                future = executor.submit(render_documents, missing, self.output_dir) if missing else None
+                in_flight.append((chunk, existing, future))
+            if in_flight and (not chunk or len(in_flight) >= window):
+                done_chunk, done_existing, future = in_flight.popleft()
+                if future is not None:
+                    future.result()
+                for spec, path in zip(done_chunk, done_existing):
+                    yield spec, path or self.path_for(spec)
+            if not chunk and not in_flight:
+                return
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "renders": self.renders, "failures": self.failures, "pending": len(self._pending)}
+
+
+document_renderer = DocumentRenderer(settings.DOCUMENTS_DIR)
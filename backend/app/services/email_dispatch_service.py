@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.config import settings
+from app.utils.email import EmailSender
+from app.utils.rate_limit import RateLimiter
+
+
+@dataclass
+class OutgoingEmail:
+    """Message déjà rendu, prêt à être envoyé. `context` est rendu tel quel à l'appelant."""
+
+    to_email: str
+    subject: str
+    content: str
+    html_content: Optional[str] = None
+    context: Any = None
+
+
+@dataclass
+class DispatchResult:
+    message: OutgoingEmail
+    success: bool
+    reason: Optional[str] = None
+
+
+@dataclass
+class DispatchOptions:
+    concurrency: int = field(default_factory=lambda: settings.EMAIL_DISPATCH_CONCURRENCY)
+    smtp_rate_per_second: float = field(default_factory=lambda: settings.EMAIL_SMTP_RATE_PER_SECOND)
+    sendgrid_rate_per_second: float = field(default_factory=lambda: settings.EMAIL_SENDGRID_RATE_PER_SECOND)
+
+
+def dispatch_emails(
+    messages: List[OutgoingEmail],
+    options: Optional[DispatchOptions] = None,
+    sender_factory: Optional[Callable[[Dict[str, RateLimiter]], EmailSender]] = None,
+) -> Iterator[DispatchResult]:
+    """
+    Envoie les messages via un pool borné de workers.
+
+    Chaque worker garde son propre EmailSender (connexion SMTP persistante) ; les
+    limiteurs de débit sont partagés par provider. Les résultats sont produits dans
+    l'ordre des messages, au fil des envois.
+    """
+    opts = options or DispatchOptions()
+    factory = sender_factory or (lambda limiters: EmailSender(rate_limiters=limiters))
+    limiters = {
+        "smtp": RateLimiter(opts.smtp_rate_per_second),
+        "sendgrid": RateLimiter(opts.sendgrid_rate_per_second),
+    }
+
+    local = threading.local()
+    senders: List[EmailSender] = []
+    senders_lock = threading.Lock()
+
+    def _sender() -> EmailSender:
+        sender = getattr(local, "sender", None)
+        if sender is None:
+            sender = factory(limiters)
+            local.sender = sender
+            with senders_lock:
+                senders.append(sender)
+        return sender
+
+    def _send(message: OutgoingEmail) -> DispatchResult:
+        try:
+            success, reason = _sender().send(
+                message.to_email,
+                message.subject,
+                message.content,
+                html_content=message.html_content,
+            )
+        except Exception as exc:
+            success, reason = False, str(exc)
+        return DispatchResult(message=message, success=success, reason=reason)
+
+    if not messages:
+        return
+
+    workers = max(1, min(opts.concurrency, len(messages)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="email-dispatch") as pool:
+            for result in pool.map(_send, messages):
+                yield result
+    finally:
+        for sender in senders:
+            sender.close()
+
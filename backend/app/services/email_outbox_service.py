@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.utils.email import send_many
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_email(
+    db: Session,
+    to_email: str,
+    subject: str,
+    content: str,
+    html_content: Optional[str] = None,
+) -> Optional[EmailOutbox]:
+    """
+    Ajoute un email à l'outbox dans la transaction courante (pas de commit ici) :
+    il ne partira que si le changement métier est commité.
+    """
+    if not to_email:
+        return None
+    entry = EmailOutbox(
+        to_email=to_email,
+        subject=subject,
+        content=content,
+        html_content=html_content,
+        status=OutboxStatus.PENDING,
+        attempts=0,
+        next_attempt_at=_utcnow(),
+    )
+    db.add(entry)
+    return entry
+
+
+def _backoff(attempts: int) -> timedelta:
+    base = settings.OUTBOX_BACKOFF_BASE_SECONDS
+    return timedelta(seconds=min(base * (2 ** max(0, attempts - 1)), settings.OUTBOX_BACKOFF_MAX_SECONDS))
+
+
+def process_outbox_batch(db: Session, batch_size: Optional[int] = None, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Envoie un lot d'emails dus en trois temps, sans transaction ouverte pendant les envois.
+
+    1. Réclamation : les lignes dues sont verrouillées (FOR UPDATE SKIP LOCKED sur PostgreSQL),
+       leur next_attempt_at repoussé de OUTBOX_CLAIM_SECONDS (bail) et la tentative comptée, puis commit.
+       Les autres workers ne les voient plus ; si celui-ci meurt, elles redeviennent dues à l'expiration.
+    2. Envoi SMTP/SendGrid hors transaction, aucune connexion du pool retenue.
+    3. Résultat écrit dans une seconde transaction courte, uniquement sur les lignes dont le bail
+       est toujours le nôtre. Un échec reprogramme l'envoi avec un backoff exponentiel ;
+       au-delà de OUTBOX_MAX_ATTEMPTS la ligne passe en "dead".
+    """
+    current = now or _utcnow()
+    size = batch_size or settings.OUTBOX_BATCH_SIZE
+    entries = (
+        db.query(EmailOutbox)
+        .filter(
+            EmailOutbox.status == OutboxStatus.PENDING,
+            EmailOutbox.next_attempt_at <= current,
+        )
+        .order_by(EmailOutbox.next_attempt_at.asc(), EmailOutbox.id.asc())
+        .limit(size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    stats = {"claimed": len(entries), "sent": 0, "retried": 0, "dead": 0}
+    if not entries:
+        db.rollback()
+        return stats
+
+    lease = current + timedelta(seconds=settings.OUTBOX_CLAIM_SECONDS)
+    claimed = [
+        (e.id, (e.attempts or 0) + 1, (e.to_email, e.subject, e.content, e.html_content)) for e in entries
+    ]
+    ids = [entry_id for entry_id, _, _ in claimed]
+    db.query(EmailOutbox).filter(EmailOutbox.id.in_(ids)).update(
+        {EmailOutbox.attempts: EmailOutbox.attempts + 1, EmailOutbox.next_attempt_at: lease},
+        synchronize_session=False,
+    )
+    db.commit()
+
+    results = send_many([message for _, _, message in claimed])
+
+    sent_ids = []
+    for (entry_id, attempts, _), (success, reason) in zip(claimed, results):
+        if success:
+            sent_ids.append(entry_id)
+            continue
+        if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            values = {EmailOutbox.status: OutboxStatus.DEAD, EmailOutbox.last_error: reason}
+            stats["dead"] += 1
+            logging.error(f"[outbox] email {entry_id} abandonné après {attempts} tentatives: {reason}")
+        else:
+            values = {EmailOutbox.next_attempt_at: current + _backoff(attempts), EmailOutbox.last_error: reason}
+            stats["retried"] += 1
+        db.query(EmailOutbox).filter(EmailOutbox.id == entry_id, EmailOutbox.next_attempt_at == lease).update(
+            values, synchronize_session=False
+        )
+    if sent_ids:
+        db.query(EmailOutbox).filter(EmailOutbox.id.in_(sent_ids), EmailOutbox.next_attempt_at == lease).update(
+            {EmailOutbox.status: OutboxStatus.SENT, EmailOutbox.sent_at: current, EmailOutbox.last_error: None},
+            synchronize_session=False,
+        )
+        stats["sent"] = len(sent_ids)
+    db.commit()
+    return stats
+
+
+def drain_outbox(db: Session, max_batches: int = 50) -> Dict[str, int]:
+    """Enchaîne les lots tant qu'il reste des emails dus (borné par max_batches)."""
+    totals = {"claimed": 0, "sent": 0, "retried": 0, "dead": 0}
+    for _ in range(max_batches):
+        stats = process_outbox_batch(db)
+        for key, value in stats.items():
+            totals[key] += value
+        if stats["claimed"] < settings.OUTBOX_BATCH_SIZE:
+            break
+    return totals
+
+
+def retry_dead_letters(db: Session) -> int:
+    """Remet en file les emails abandonnés (action admin)."""
+    count = (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.status == OutboxStatus.DEAD)
+        .update(
+            {
+                EmailOutbox.status: OutboxStatus.PENDING,
+                EmailOutbox.attempts: 0,
+                EmailOutbox.next_attempt_at: _utcnow(),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return count
+
+
+def outbox_stats(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Profondeur de file par statut et débit d'envoi récent."""
+    current = now or _utcnow()
+    depth = {status.value: 0 for status in OutboxStatus}
+    for status, count in db.query(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status):
+        depth[getattr(status, "value", status)] = count
+
+    def _sent_since(delta: timedelta) -> int:
+        return (
+            db.query(func.count(EmailOutbox.id))
+            .filter(EmailOutbox.status == OutboxStatus.SENT, EmailOutbox.sent_at >= current - delta)
+            .scalar()
+            or 0
+        )
+
+    oldest_pending = (
+        db.query(func.min(EmailOutbox.created_at))
+        .filter(EmailOutbox.status == OutboxStatus.PENDING)
+        .scalar()
+    )
+    return {
+        "depth": depth,
+        "sent_last_minute": _sent_since(timedelta(minutes=1)),
+        "sent_last_hour": _sent_since(timedelta(hours=1)),
+        "oldest_pending_at": oldest_pending,
+    }
@@ -0,0 +1,303 @@
+"""
+Import CSV en masse (biens, locataires, baux) pour l'arrivée d'une agence.
+
+Le fichier est lu et validé ligne à ligne (Pydantic), puis écrit par lots :
+- les mots de passe fournis sont hashés en parallèle dans le pool de processus bcrypt,
+  les comptes sans mot de passe reçoivent un hash inutilisable (aucun calcul) ;
+- chaque table reçoit un INSERT multi-lignes par lot (insertmanyvalues, avec RETURNING
+  pour relier utilisateurs → locataires → baux) ;
+- le lot et le point de reprise du job sont commités ensemble : renvoyer le même
+  fichier reprend après la dernière ligne écrite.
+Les erreurs sont rapportées par ligne sans interrompre l'import.
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.import_job import ImportJob, ImportStatus
+from app.models.lease import Lease, LeaseStatus
+from app.models.property import Property, PropertyStatus
+from app.models.tenant import Tenant
+from app.models.user import User, UserRole
+from app.schemas.bulk_import import REQUIRED_COLUMNS, ImportRow
+from app.services.dashboard_service import invalidate_dashboard
+from app.utils.security import hash_passwords, unusable_password_hash
+from app.utils.user_cache import invalidate_user
+
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+
+class ImportFormatError(ValueError):
+    """Fichier inexploitable dans son ensemble (en-tête manquant, encodage)."""
+
+
+@dataclass
+class _Row:
+    line: int
+    data: ImportRow
+    hashed_password: Optional[str] = None
+
+
+def file_digest(stream: BinaryIO) -> str:
+    """SHA-256 du fichier, lu par blocs ; le flux est replacé au début."""
+    digest = hashlib.sha256()
+    for block in iter(lambda: stream.read(DIGEST_CHUNK_SIZE), b""):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def _format_errors(exc: ValidationError) -> str:
+    messages = []
+    for error in exc.errors():
+        location = ".".join(str(part) for part in error["loc"])
+        messages.append(f"{location}: {error['msg']}" if location else error["msg"])
+    return "; ".join(messages)
+
+
+def _read_rows(stream: BinaryIO) -> Tuple[csv.DictReader, Iterator[Dict[str, Any]]]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    try:
+        header = reader.fieldnames or []
+    except UnicodeDecodeError as exc:
+        raise ImportFormatError("Le fichier doit être encodé en UTF-8") from exc
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise ImportFormatError(f"Colonnes manquantes : {', '.join(missing)}")
+    return reader, iter(reader)
+
+
+def _validate(reader: csv.DictReader, records: Iterator[Dict[str, Any]], size: int) -> Tuple[int, List[_Row], List[Dict[str, Any]]]:
+    """Valide au plus `size` lignes ; retourne (lignes lues, lignes valides, erreurs)."""
+    valid: List[_Row] = []
+    errors: List[Dict[str, Any]] = []
+    count = 0
+    for record in islice(records, size):
+        count += 1
+        try:
+            valid.append(_Row(reader.line_num, ImportRow.model_validate(record)))
+        except ValidationError as exc:
+            errors.append({"row": reader.line_num, "error": _format_errors(exc)})
+    return count, valid, errors
+
+
+def _existing_tenants(db: Session, emails: List[str]) -> Dict[str, Optional[int]]:
+    """email → id du profil locataire (None : compte existant sans profil locataire)."""
+    if not emails:
+        return {}
+    rows = db.execute(
+        select(User.email, Tenant.id).outerjoin(Tenant, Tenant.user_id == User.id).where(User.email.in_(emails))
+    ).all()
+    return {email: tenant_id for email, tenant_id in rows}
+
+
+def _insert_rows(db: Session, owner_id: int, rows: List[_Row]) -> Tuple[int, List[Dict[str, Any]], List[str]]:
+    """
+    Écrit un lot : un INSERT multi-lignes par table. Retourne (lignes importées, erreurs, emails créés).
+    Un locataire déjà connu (en base ou plus haut dans le lot) est réutilisé.
+    """
+    errors: List[Dict[str, Any]] = []
+    existing = _existing_tenants(db, sorted({row.data.tenant_email for row in rows if row.data.tenant_email}))
+
+    accepted: List[_Row] = []
+    new_users: Dict[str, _Row] = {}
+    for row in rows:
+        email = row.data.tenant_email
+        if email and email in existing and existing[email] is None:
+            errors.append({"row": row.line, "error": "Email already registered"})
+            continue
+        if email and email not in existing and email not in new_users:
+            new_users[email] = row
+        accepted.append(row)
+
+    tenant_ids = {email: tenant_id for email, tenant_id in existing.items() if tenant_id is not None}
+    if new_users:
+        user_ids = db.execute(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                {
+                    "email": email,
+                    "hashed_password": row.hashed_password or unusable_password_hash(),
+                    "first_name": row.data.tenant_first_name,
+                    "last_name": row.data.tenant_last_name,
+                    "phone": row.data.tenant_phone,
+                    "role": UserRole.TENANT,
+                }
+                for email, row in new_users.items()
+            ],
+        ).scalars().all()
+        created = db.execute(
+            insert(Tenant).returning(Tenant.id, sort_by_parameter_order=True),
+            [{"user_id": user_id, "identity_documents": [], "income_proof": [], "references": []} for user_id in user_ids],
+        ).scalars().all()
+        tenant_ids.update(zip(new_users, created))
+
+    if not accepted:
+        return 0, errors, []
+    property_ids = db.execute(
+        insert(Property).returning(Property.id, sort_by_parameter_order=True),
+        [
+            {
+                "owner_id": owner_id,
+                "title": row.data.title,
+                "description": row.data.description,
+                "property_type": row.data.property_type,
+                "address": row.data.address,
+                "city": row.data.city,
+                "postal_code": row.data.postal_code,
+                "surface_area": row.data.surface_area,
+                "rooms": row.data.rooms,
+                "bedrooms": row.data.bedrooms,
+                "bathrooms": row.data.bathrooms,
+                "rent_amount": row.data.rent_amount,
+                "charges": row.data.charges or 0,
+                "deposit": row.data.deposit,
+                "application_fee": 0,
+                "status": PropertyStatus.OCCUPIED if row.data.lease_start_date else PropertyStatus.AVAILABLE,
+                "images": [],
+                "amenities": [],
+            }
+            for row in accepted
+        ],
+    ).scalars().all()
+
+    leases = [
+        {
+            "property_id": property_id,
+            "tenant_id": tenant_ids[row.data.tenant_email],
+            "start_date": row.data.lease_start_date,
+            "end_date": row.data.lease_end_date,
+            "rent_amount": row.data.lease_rent_amount if row.data.lease_rent_amount is not None else row.data.rent_amount,
+            "charges": row.data.lease_charges if row.data.lease_charges is not None else (row.data.charges or 0),
+            "deposit_paid": row.data.lease_deposit_paid,
+            "payment_day": row.data.lease_payment_day or 1,
+            "status": LeaseStatus.ACTIVE,
+        }
+        for row, property_id in zip(accepted, property_ids)
+        if row.data.lease_start_date
+    ]
+    if leases:
+        db.execute(insert(Lease), leases)
+    return len(accepted), errors, list(new_users)
+
+
+def _hash_batch(db: Session, rows: List[_Row]) -> None:
+    """Hash (pool de processus) des mots de passe fournis pour les comptes qui seront créés."""
+    candidates = [row for row in rows if row.data.tenant_email and row.data.tenant_password]
+    known = _existing_tenants(db, sorted({row.data.tenant_email for row in candidates}))
+    first: Dict[str, _Row] = {}
+    for row in candidates:
+        if row.data.tenant_email not in known:
+            first.setdefault(row.data.tenant_email, row)
+    for row, hashed in zip(first.values(), hash_passwords([row.data.tenant_password for row in first.values()])):
+        row.hashed_password = hashed
+
+
+def _import_batch(db: Session, owner_id: int, rows: List[_Row]) -> Tuple[int, List[Dict[str, Any]], List[str]]:
+    """
+    Lot entier dans un savepoint ; en cas de conflit (ex. email créé entre-temps),
+    repli ligne à ligne pour isoler les lignes fautives.
+    """
+    try:
+        with db.begin_nested():
+            return _insert_rows(db, owner_id, rows)
+    except IntegrityError:
+        imported, errors, emails = 0, [], []
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    count, row_errors, created = _insert_rows(db, owner_id, [row])
+            except IntegrityError as exc:
+                errors.append({"row": row.line, "error": f"Conflit en base : {exc.orig}"})
+                continue
+            imported += count
+            errors.extend(row_errors)
+            emails.extend(created)
+        return imported, errors, emails
+
+
+def _get_or_create_job(db: Session, owner_id: int, digest: str, filename: Optional[str]) -> ImportJob:
+    job = db.execute(
+        select(ImportJob).where(ImportJob.owner_id == owner_id, ImportJob.digest == digest)
+    ).scalar_one_or_none()
+    if job is None:
+        job = ImportJob(owner_id=owner_id, digest=digest, filename=filename, errors=[])
+        db.add(job)
+    elif job.status != ImportStatus.COMPLETED:
+        job.status = ImportStatus.RUNNING
+        job.last_error = None
+    db.commit()
+    return job
+
+
+def run_import(
+    db: Session,
+    owner_id: int,
+    stream: BinaryIO,
+    filename: Optional[str] = None,
+    batch_size: Optional[int] = None,
+) -> ImportJob:
+    """
+    Importe (ou reprend) le fichier pour le bailleur. Un fichier déjà importé en entier
+    n'est pas rejoué : le job existant est retourné tel quel.
+    """
+    size = max(1, batch_size or settings.IMPORT_BATCH_SIZE)
+    digest = file_digest(stream)
+    reader, records = _read_rows(stream)
+    job = _get_or_create_job(db, owner_id, digest, filename)
+    if job.status == ImportStatus.COMPLETED:
+        return job
+
+    imported_any = False
+    try:
+        # Lignes déjà commitées lors d'une exécution précédente
+        for _ in islice(records, job.rows_processed):
+            pass
+        while True:
+            count, valid, errors = _validate(reader, records, size)
+            if not count:
+                break
+            _hash_batch(db, valid)
+            imported, insert_errors, emails = _import_batch(db, owner_id, valid)
+            errors = sorted(errors + insert_errors, key=lambda error: error["row"])
+
+            room = max(0, settings.IMPORT_MAX_REPORTED_ERRORS - len(job.errors or []))
+            job.rows_processed += count
+            job.rows_imported += imported
+            job.rows_failed += len(errors)
+            if errors and room:
+                job.errors = list(job.errors or []) + errors[:room]
+            # Point de reprise commité avec les lignes du lot
+            db.commit()
+            imported_any = imported_any or imported > 0
+            if emails:
+                invalidate_user(*emails)
+        job.status = ImportStatus.COMPLETED
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        logging.exception(f"[import] job {job.id} interrompu à la ligne {job.rows_processed}")
+        job.status = ImportStatus.FAILED
+        job.last_error = str(exc)[:500]
+        db.commit()
+        raise
+    finally:
+        # Insertions hors ORM : les hooks d'invalidation du tableau de bord ne les voient pas
+        if imported_any:
+            invalidate_dashboard([owner_id])
+    return job
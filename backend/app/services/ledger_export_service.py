@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass
+from datetime import date
+from enum import Enum
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.lease import Lease
+from app.models.payment import Payment, PaymentStatus
+from app.models.property import Property
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.utils.xlsx_stream import stream_xlsx
+
+# Lignes lues par aller-retour sur le curseur serveur, et lignes CSV par morceau émis
+FETCH_BATCH_SIZE = 2000
+CSV_FLUSH_ROWS = 1000
+
+LEDGER_COLUMNS = [
+    ("payment_id", Payment.id),
+    ("due_date", Payment.due_date),
+    ("amount", Payment.amount),
+    ("status", Payment.status),
+    ("payment_date", Payment.payment_date),
+    ("payment_method", Payment.payment_method),
+    ("transaction_reference", Payment.transaction_reference),
+    ("reminder_count", Payment.reminder_count),
+    ("lease_id", Lease.id),
+    ("property_id", Property.id),
+    ("property_title", Property.title),
+    ("property_address", Property.address),
+    ("property_city", Property.city),
+    ("tenant_id", Tenant.id),
+    ("tenant_first_name", User.first_name),
+    ("tenant_last_name", User.last_name),
+    ("tenant_email", User.email),
+    ("created_at", Payment.created_at),
+]
+LEDGER_HEADER = [name for name, _ in LEDGER_COLUMNS]
+
+
+@dataclass(frozen=True)
+class LedgerFilters:
+    status: Optional[PaymentStatus] = None
+    due_from: Optional[date] = None
+    due_to: Optional[date] = None
+    paid_from: Optional[date] = None
+    paid_to: Optional[date] = None
+
+
+def ledger_stmt(owner_id: int, filters: LedgerFilters):
+    """Une seule requête jointe (paiement, bail, bien, locataire) : pas de chargement paresseux par ligne."""
+    stmt = (
+        select(*(column for _, column in LEDGER_COLUMNS))
+        .select_from(Payment)
+        .join(Lease, Payment.lease_id == Lease.id)
+        .join(Property, Lease.property_id == Property.id)
+        .join(Tenant, Lease.tenant_id == Tenant.id)
+        .join(User, Tenant.user_id == User.id)
+        .where(Property.owner_id == owner_id)
+    )
+    if filters.status:
+        stmt = stmt.where(Payment.status == filters.status)
+    if filters.due_from:
+        stmt = stmt.where(Payment.due_date >= filters.due_from)
+    if filters.due_to:
+        stmt = stmt.where(Payment.due_date <= filters.due_to)
+    if filters.paid_from:
+        stmt = stmt.where(Payment.payment_date >= filters.paid_from)
+    if filters.paid_to:
+        stmt = stmt.where(Payment.payment_date <= filters.paid_to)
+    return stmt.order_by(Payment.due_date.asc(), Payment.id.asc())
+
+
+def ledger_rows(db: Session, owner_id: int, filters: LedgerFilters) -> Iterator[Sequence[Any]]:
+    """
+    Lignes du grand livre via un curseur côté serveur (stream_results) lu par lots :
+    la mémoire reste constante quel que soit le nombre de paiements exportés.
+    """
+    stmt = ledger_stmt(owner_id, filters).execution_options(stream_results=True, yield_per=FETCH_BATCH_SIZE)
+    yield from db.execute(stmt)
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    # Neutralise les formules lorsqu'un texte saisi est ouvert dans un tableur
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        return "'" + value
+    return value
+
+
+def stream_csv(header: Sequence[str], rows: Iterable[Sequence[Any]], flush_rows: int = CSV_FLUSH_ROWS) -> Iterator[bytes]:
+    """CSV UTF-8 (avec BOM pour Excel), émis par morceaux de `flush_rows` lignes."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(header)
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        pending += 1
+        if pending >= flush_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def stream_ledger(db: Session, owner_id: int, filters: LedgerFilters, fmt: str) -> Iterator[bytes]:
+    rows = ledger_rows(db, owner_id, filters)
+    if fmt == "xlsx":
+        return stream_xlsx(LEDGER_HEADER, rows, sheet_name="Paiements")
+    return stream_csv(LEDGER_HEADER, rows)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy import case, event, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.models.notification import Notification
+from app.models.user import User
+from app.utils.pubsub import PubSub
+
+# Bus des notifications, un sujet par utilisateur (user_id)
+notification_bus = PubSub()
+
+_PENDING_KEY = "notifications_to_publish"
+
+
+def _payload(notification: Notification) -> Dict[str, Any]:
+    created_at = notification.__dict__.get("created_at") or datetime.now(timezone.utc)
+    return {
+        "id": notification.id,
+        "user_id": notification.user_id,
+        "type": getattr(notification.type, "value", notification.type),
+        "title": notification.title,
+        "message": notification.message,
+        "is_read": bool(notification.is_read),
+        "created_at": created_at.isoformat(),
+    }
+
+
+def unread_count(db: Session, user_id: int) -> int:
+    """Lecture du compteur maintenu sur users (pas de COUNT sur notifications)."""
+    return db.execute(select(User.unread_notification_count).where(User.id == user_id)).scalar() or 0
+
+
+def mark_all_read(db: Session, user_id: int) -> int:
+    """
+    Marque toutes les notifications non lues en un seul UPDATE et décrémente le compteur d'autant.
+    is_read NULL compte comme non lu (backfill du compteur, hooks de session) : inclus ici aussi.
+    Pas de remise à zéro : une notification commitée entre les deux UPDATE reste comptée.
+    """
+    result = db.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read.isnot(True))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    marked = result.rowcount
+    if marked:
+        db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                unread_notification_count=case(
+                    (User.unread_notification_count > marked, User.unread_notification_count - marked),
+                    else_=0,
+                )
+            )
+        )
+    db.commit()
+    return marked
+
+
+# --- Maintien du compteur et publication via les hooks de session ----------
+
+def _unread_deltas(session: Session) -> Counter:
+    deltas: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, Notification) and not obj.is_read:
+            deltas[obj.user_id] += 1
+    for obj in session.dirty:
+        if isinstance(obj, Notification):
+            history = inspect(obj).attrs.is_read.history
+            if history.has_changes():
+                was_read = bool(history.deleted[0]) if history.deleted else False
+                if was_read != bool(obj.is_read):
+                    deltas[obj.user_id] += -1 if obj.is_read else 1
+    for obj in session.deleted:
+        if isinstance(obj, Notification) and not obj.is_read:
+            deltas[obj.user_id] -= 1
+    return deltas
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_unread_counters(session, flush_context):
+    deltas = _unread_deltas(session)
+    connection = session.connection()
+    for user_id, delta in deltas.items():
+        if delta:
+            connection.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(unread_notification_count=User.unread_notification_count + delta)
+            )
+    created: List[Dict[str, Any]] = [
+        _payload(obj) for obj in session.new if isinstance(obj, Notification)
+    ]
+    if created:
+        session.info.setdefault(_PENDING_KEY, []).extend(created)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session):
+    for payload in session.info.pop(_PENDING_KEY, []):
+        notification_bus.publish(payload["user_id"], payload)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -5,12 +5,16 @@ from typing import Dict, Any, List, Optional
 from zoneinfo import ZoneInfo
 import calendar
 
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from app.models.lease import Lease, LeaseStatus
 from app.models.payment import Payment, PaymentStatus
+from app.utils.metrics import timed_job
 from app.models.property import Property, PropertyStatus
 from app.config import settings
+from app.services.dashboard_service import invalidate_dashboard
 
 
 def _tz_today() -> date:
@@ -41,6 +45,30 @@ def _first_due_date(start_date: date, payment_day: int) -> date:
     return first
 
 
+def _plan_next_due(
+    start_date: Optional[date],
+    end_date: Optional[date],
+    next_due_date: Optional[date],
+    payment_day: Optional[int],
+    current: date,
+    horizon: date,
+) -> Optional[date]:
+    """Calcule la prochaine échéance dans la fenêtre [current, horizon], ou None si hors fenêtre."""
+    if start_date and start_date > horizon:
+        return None
+    if end_date and end_date < current:
+        return None
+
+    next_due = next_due_date or _first_due_date(start_date, payment_day or 1)
+    # Avancer jusqu'à être dans la fenêtre
+    while next_due < current and (not end_date or next_due <= end_date):
+        next_due = _add_months(next_due, 1)
+
+    if next_due > horizon:
+        return None
+    return next_due
+
+
 def _ensure_payment(
     db: Session,
     lease: Lease,
@@ -69,6 +97,7 @@ def _ensure_payment(
     return True
 
 
+@timed_job("generate_monthly_payments")
 def generate_monthly_payments(
     db: Session,
     today: Optional[date] = None,
@@ -111,20 +140,16 @@ def generate_monthly_payments(
             )
             continue
 
-        # Vérifier dates de validité du bail
-        if lease.start_date and lease.start_date > horizon:
-            report["skipped"] += 1
-            continue
-        if lease.end_date and lease.end_date < current:
-            report["skipped"] += 1
-            continue
-
-        next_due = lease.next_due_date or _first_due_date(lease.start_date, lease.payment_day or 1)
-        # Avancer jusqu'à être dans la fenêtre
-        while next_due < current and (not lease.end_date or next_due <= lease.end_date):
-            next_due = _add_months(next_due, 1)
-
-        if next_due > horizon:
+        # Vérifier dates de validité du bail et calculer l'échéance
+        next_due = _plan_next_due(
+            lease.start_date,
+            lease.end_date,
+            lease.next_due_date,
+            lease.payment_day,
+            current,
+            horizon,
+        )
+        if next_due is None:
             report["skipped"] += 1
             continue
 
@@ -140,3 +165,136 @@ def generate_monthly_payments(
 
     db.commit()
     return report
+
+
+def _insert_ignore_duplicates(db: Session, rows: List[Dict[str, Any]]):
+    """INSERT multi-lignes ignorant les conflits sur (lease_id, due_date)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(Payment).on_conflict_do_nothing(index_elements=["lease_id", "due_date"])
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(Payment).on_conflict_do_nothing(index_elements=["lease_id", "due_date"])
+    else:
+        # Pas d'ON CONFLICT générique : la pré-lecture de la fenêtre évite déjà les doublons
+        stmt = insert(Payment)
+    return db.execute(stmt.values(rows).returning(Payment.lease_id, Payment.due_date))
+
+
+@timed_job("generate_monthly_payments_bulk")
+def generate_monthly_payments_bulk(
+    db: Session,
+    today: Optional[date] = None,
+    horizon_days: int = 40,
+    chunk_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Variante ensembliste de generate_monthly_payments pour les gros portefeuilles.
+
+    Les baux sont parcourus par paquets (pagination sur l'id) : pour chaque paquet,
+    une requête récupère les échéances déjà planifiées dans la fenêtre, puis un seul
+    INSERT multi-lignes (ON CONFLICT DO NOTHING) crée les échéances manquantes.
+    Le rapport retourné a la même structure que generate_monthly_payments.
+    """
+    current = today or _tz_today()
+    horizon = current + timedelta(days=horizon_days)
+    size = max(1, chunk_size or settings.PAYMENT_GENERATION_CHUNK_SIZE)
+
+    report = {"count": 0, "created": 0, "skipped": 0, "log": []}
+    last_id = 0
+
+    while True:
+        leases = db.execute(
+            select(
+                Lease.id,
+                Lease.start_date,
+                Lease.end_date,
+                Lease.next_due_date,
+                Lease.payment_day,
+                Lease.rent_amount,
+                Lease.charges,
+            )
+            .join(Property, Lease.property_id == Property.id)
+            .where(
+                Lease.status == LeaseStatus.ACTIVE,
+                Property.status != PropertyStatus.OFFLINE,
+                Lease.id > last_id,
+            )
+            .order_by(Lease.id.asc())
+            .limit(size)
+        ).all()
+        if not leases:
+            break
+        last_id = leases[-1].id
+        report["count"] += len(leases)
+
+        # Première échéance déjà planifiée dans la fenêtre, pour tout le paquet
+        existing_upcoming = dict(
+            db.execute(
+                select(Payment.lease_id, func.min(Payment.due_date))
+                .where(
+                    Payment.lease_id.in_([lease.id for lease in leases]),
+                    Payment.due_date >= current,
+                    Payment.due_date <= horizon,
+                )
+                .group_by(Payment.lease_id)
+            ).all()
+        )
+
+        rows: List[Dict[str, Any]] = []
+        pointers: List[Dict[str, Any]] = []
+        for lease in leases:
+            planned = existing_upcoming.get(lease.id)
+            if planned:
+                report["skipped"] += 1
+                report["log"].append(
+                    {"lease_id": lease.id, "due_date": planned.isoformat(), "status": "already_planned"}
+                )
+                continue
+
+            next_due = _plan_next_due(
+                lease.start_date,
+                lease.end_date,
+                lease.next_due_date,
+                lease.payment_day,
+                current,
+                horizon,
+            )
+            if next_due is None:
+                report["skipped"] += 1
+                continue
+
+            rows.append(
+                {
+                    "lease_id": lease.id,
+                    "amount": (lease.rent_amount or 0) + (lease.charges or 0),
+                    "due_date": next_due,
+                    "status": PaymentStatus.PENDING,
+                    "reminder_count": 0,
+                }
+            )
+            pointers.append({"id": lease.id, "next_due_date": _add_months(next_due, 1)})
+
+        if rows:
+            inserted = {(lease_id, due_date) for lease_id, due_date in _insert_ignore_duplicates(db, rows)}
+            for row in rows:
+                created = (row["lease_id"], row["due_date"]) in inserted
+                if created:
+                    report["created"] += 1
+                else:
+                    report["skipped"] += 1
+                report["log"].append(
+                    {
+                        "lease_id": row["lease_id"],
+                        "due_date": row["due_date"].isoformat(),
+                        "status": "created" if created else "exists",
+                    }
+                )
+            db.execute(update(Lease), pointers)
+
+        # Un commit par paquet : la transaction et la mémoire restent bornées
+        db.commit()
+
+    # Insertions en masse hors ORM : les hooks d'invalidation ne les voient pas
+    if report["created"]:
+        invalidate_dashboard()
+    return report
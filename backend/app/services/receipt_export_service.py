@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import zipfile
+from datetime import date
+from typing import Iterable, Iterator, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.lease import Lease
+from app.models.payment import Payment, PaymentStatus
+from app.models.property import Property
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.services.document_service import DocumentRenderer, DocumentSpec, receipt_spec
+from app.utils.zip_stream import ZipChunkSink
+
+FETCH_BATCH_SIZE = 500
+
+
+def month_bounds(month: str) -> Tuple[date, date]:
+    """'YYYY-MM' → (premier jour du mois, premier jour du mois suivant)."""
+    year, number = (int(part) for part in month.split("-"))
+    start = date(year, number, 1)
+    end = date(year + 1, 1, 1) if number == 12 else date(year, number + 1, 1)
+    return start, end
+
+
+def monthly_receipt_specs(db: Session, owner_id: int, month: str) -> Iterator[DocumentSpec]:
+    """
+    Quittances des loyers payés échus dans le mois, lues par lots (yield_per) :
+    aucune liste complète n'est construite en mémoire.
+    """
+    start, end = month_bounds(month)
+    stmt = (
+        select(
+            Payment.id, Payment.amount, Payment.payment_date, Payment.due_date,
+            Property.title, User.first_name, User.last_name,
+        )
+        .join(Lease, Payment.lease_id == Lease.id)
+        .join(Property, Lease.property_id == Property.id)
+        .join(Tenant, Lease.tenant_id == Tenant.id)
+        .join(User, Tenant.user_id == User.id)
+        .where(
+            Property.owner_id == owner_id,
+            Payment.status == PaymentStatus.PAID,
+            Payment.due_date >= start,
+            Payment.due_date < end,
+        )
+        .order_by(Payment.due_date.asc(), Payment.id.asc())
+        .execution_options(yield_per=FETCH_BATCH_SIZE)
+    )
+    for payment_id, amount, paid_on, due_date, title, first_name, last_name in db.execute(stmt):
+        # Mêmes champs que la quittance envoyée au paiement : le fichier existant est réutilisé.
+        # Paiements anciens sans date d'encaissement : l'échéance, stable d'un export à l'autre.
+        yield receipt_spec(payment_id, amount, f"{first_name} {last_name}", title or "", paid_on or due_date)
+
+
+def stream_receipts_zip(specs: Iterable[DocumentSpec], renderer: DocumentRenderer) -> Iterator[bytes]:
+    """
+    Construit l'archive à la volée : chaque quittance (rendue si besoin par le pool) est
+    ajoutée puis les octets produits sont émis aussitôt. La mémoire utilisée est bornée
+    par la fenêtre de rendu et la taille d'un document, pas par le nombre de documents.
+    """
+    sink = ZipChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for spec, path in renderer.ensure_many(specs):
+            archive.write(path, arcname=f"quittance-{spec.payment_id}.pdf")
+            data = sink.drain()
+            if data:
+                yield data
+    # Répertoire central, écrit à la fermeture de l'archive
+    tail = sink.drain()
+    if tail:
+        yield tail
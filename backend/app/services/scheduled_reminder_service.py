@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from datetime import date, datetime
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
+from sqlalchemy import case, exists, or_, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
@@ -16,7 +17,9 @@ from app.models.tenant import Tenant
 from app.models.property import Property, PropertyStatus
 from app.models.user import User
 from app.models.reminder_history import ReminderHistory
+from app.services.email_dispatch_service import DispatchOptions, OutgoingEmail, dispatch_emails
 from app.utils.email import send_email
+from app.utils.metrics import timed_job
 
 
 ReminderStep = str  # "J-2" | "J-1" | "J0" | "J+1"
@@ -49,56 +52,105 @@ def _get_timezone() -> ZoneInfo:
         return ZoneInfo("UTC")
 
 
-def get_due_for_today_step(today: date, db: Session) -> List[Tuple[PaymentReminderCandidate, ReminderStep]]:
+# Décalage (en jours) entre l'échéance et la date d'envoi pour chaque étape
+REMINDER_STEP_OFFSETS: Dict[ReminderStep, int] = {"J-2": 2, "J-1": 1, "J0": 0, "J+1": -1}
+CANDIDATE_BATCH_SIZE = 500
+
+
+def iter_due_for_today_step(
+    today: date,
+    db: Session,
+    batch_size: int = CANDIDATE_BATCH_SIZE,
+) -> Iterator[Tuple[PaymentReminderCandidate, ReminderStep]]:
     """
-    Retourne les paiements concernés par un envoi aujourd'hui (J-2/J-1/J0/J+1).
+    Parcourt en flux les paiements à relancer aujourd'hui (J-2/J-1/J0/J+1).
+
+    La fenêtre d'échéance, le filtre « non payé » et l'exclusion des relances déjà
+    envoyées (anti-jointure sur reminder_history) sont appliqués côté SQL : seules
+    les relances à envoyer sont lues.
     """
-    candidates: List[Tuple[PaymentReminderCandidate, ReminderStep]] = []
-    payments = (
-        db.query(Payment, Lease, Tenant, User, Property)
+    step = case(
+        *[
+            (Payment.due_date == today + timedelta(days=offset), name)
+            for name, offset in REMINDER_STEP_OFFSETS.items()
+        ],
+    )
+    already_sent_clause = exists().where(
+        ReminderHistory.tenant_id == Tenant.id,
+        ReminderHistory.due_date == Payment.due_date,
+        ReminderHistory.step == step,
+    )
+    stmt = (
+        select(
+            Payment.id,
+            Payment.due_date,
+            Payment.amount,
+            Payment.status,
+            Lease.id,
+            Tenant.id,
+            User.email,
+            User.first_name,
+            User.last_name,
+            Property.title,
+            Property.city,
+            Property.owner_id,
+            step,
+        )
         .join(Lease, Payment.lease_id == Lease.id)
         .join(Tenant, Lease.tenant_id == Tenant.id)
         .join(User, Tenant.user_id == User.id)
         .join(Property, Lease.property_id == Property.id)
-        .filter(Property.status != PropertyStatus.OFFLINE)
-        .all()
+        .where(
+            Property.status != PropertyStatus.OFFLINE,
+            Payment.due_date.between(today - timedelta(days=1), today + timedelta(days=2)),
+            or_(Payment.status.is_(None), Payment.status != PaymentStatus.PAID),
+            Payment.payment_date.is_(None),
+            ~already_sent_clause,
+        )
+        .order_by(Payment.due_date.asc(), Payment.id.asc())
+        .execution_options(yield_per=batch_size)
     )
 
-    for payment, lease, tenant, user, prop in payments:
-        if not payment.due_date:
-            continue
-        delta = (payment.due_date - today).days
-        step: Optional[ReminderStep] = None
-        if delta == 2:
-            step = "J-2"
-        elif delta == 1:
-            step = "J-1"
-        elif delta == 0:
-            step = "J0"
-        elif delta == -1:
-            step = "J+1"
-        else:
-            continue
-
-        candidates.append(
-            (
-                PaymentReminderCandidate(
-                    payment_id=payment.id,
-                    lease_id=lease.id,
-                    tenant_id=tenant.id,
-                    tenant_email=user.email or "",
-                    tenant_name=f"{user.first_name} {user.last_name}",
-                    property_title=prop.title,
-                    property_city=prop.city,
-                    due_date=payment.due_date,
-                    amount=payment.amount,
-                    owner_id=prop.owner_id,
-                    status=payment.status,
-                ),
-                step,
-            )
+    for row in db.execute(stmt):
+        (
+            payment_id,
+            due_date,
+            amount,
+            status,
+            lease_id,
+            tenant_id,
+            email,
+            first_name,
+            last_name,
+            property_title,
+            property_city,
+            owner_id,
+            row_step,
+        ) = row
+        yield (
+            PaymentReminderCandidate(
+                payment_id=payment_id,
+                lease_id=lease_id,
+                tenant_id=tenant_id,
+                tenant_email=email or "",
+                tenant_name=f"{first_name} {last_name}",
+                property_title=property_title,
+                property_city=property_city,
+                due_date=due_date,
+                amount=amount,
+                owner_id=owner_id,
+                status=status,
+            ),
+            row_step,
         )
-    return candidates
+
+
+def get_due_for_today_step(today: date, db: Session) -> List[Tuple[PaymentReminderCandidate, ReminderStep]]:
+    """
+    Retourne les paiements concernés par un envoi aujourd'hui (J-2/J-1/J0/J+1),
+    non payés et pas encore relancés pour l'étape.
+    """
+    return list(iter_due_for_today_step(today, db))
 
 
 def is_paid(candidate: PaymentReminderCandidate, db: Session) -> bool:
@@ -123,10 +175,13 @@ def already_sent(candidate: PaymentReminderCandidate, step: ReminderStep, db: Se
     return existing is not None
 
 
-def mark_sent(candidate: PaymentReminderCandidate, step: ReminderStep, db: Session, meta: Optional[Dict[str, Any]] = None) -> None:
-    key = build_reminder_key(candidate.tenant_id, candidate.due_date, step)
-    record = ReminderHistory(
-        key=key,
+def _history_record(
+    candidate: PaymentReminderCandidate,
+    step: ReminderStep,
+    meta: Optional[Dict[str, Any]] = None,
+) -> ReminderHistory:
+    return ReminderHistory(
+        key=build_reminder_key(candidate.tenant_id, candidate.due_date, step),
         tenant_id=candidate.tenant_id,
         payment_id=candidate.payment_id,
         lease_id=candidate.lease_id,
@@ -134,11 +189,33 @@ def mark_sent(candidate: PaymentReminderCandidate, step: ReminderStep, db: Sessi
         step=step,
         meta=meta or {},
     )
-    db.add(record)
+
+
+def mark_sent(candidate: PaymentReminderCandidate, step: ReminderStep, db: Session, meta: Optional[Dict[str, Any]] = None) -> None:
+    db.add(_history_record(candidate, step, meta))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+
+
+def mark_sent_batch(
+    entries: List[Tuple[PaymentReminderCandidate, ReminderStep, Dict[str, Any]]],
+    db: Session,
+) -> None:
+    """
+    Enregistre plusieurs relances en un seul commit. En cas de doublon (exécution
+    concurrente), on rejoue ligne à ligne pour ne perdre que les doublons.
+    """
+    if not entries:
+        return
+    db.add_all([_history_record(candidate, step, meta) for candidate, step, meta in entries])
     try:
         db.commit()
     except IntegrityError:
         db.rollback()
+        for candidate, step, meta in entries:
+            mark_sent(candidate, step, db, meta=meta)
 
 
 def _render_email(candidate: PaymentReminderCandidate, step: ReminderStep) -> Tuple[str, str, str]:
@@ -174,59 +251,74 @@ def send_one(candidate: PaymentReminderCandidate, step: ReminderStep) -> Tuple[b
     return success, reason, subject
 
 
-def run_scheduled(db: Session, today: Optional[date] = None) -> Dict[str, Any]:
+@timed_job("run_scheduled")
+def run_scheduled(
+    db: Session,
+    today: Optional[date] = None,
+    dispatch_options: Optional[DispatchOptions] = None,
+) -> Dict[str, Any]:
     tz = _get_timezone()
     current_date = today or datetime.now(tz).date()
+    batch_size = max(1, settings.REMINDER_HISTORY_BATCH_SIZE)
 
     report = {
         "date": current_date.isoformat(),
         "count": 0,
         "sent": 0,
-        "skipped_paid": 0,
         "skipped_duplicate": 0,
         "errors": [],
         "log": [],
     }
 
-    candidates = get_due_for_today_step(current_date, db)
-    report["count"] = len(candidates)
-
-    for candidate, step in candidates:
-        status_str = str(getattr(candidate.status, "value", candidate.status)).lower() if candidate.status else ""
-
-        if is_paid(candidate, db):
-            report["skipped_paid"] += 1
-            report["log"].append({"payment_id": candidate.payment_id, "step": step, "status": "paid"})
-            continue
-
-        if step == "J+1" and status_str == PaymentStatus.PAID.value:
-            report["skipped_paid"] += 1
-            report["log"].append({"payment_id": candidate.payment_id, "step": step, "status": "paid"})
-            continue
-
-        if already_sent(candidate, step, db):
+    # Les paiements réglés et les relances des exécutions précédentes sont exclus par la requête ;
+    # un locataire avec plusieurs baux (ou paiements) à la même échéance ne reçoit qu'une relance
+    # par (locataire, échéance, étape), comme le veut la clé de reminder_history.
+    # Tous les messages sont rendus avant l'envoi, puis expédiés par le pool de workers.
+    messages: List[OutgoingEmail] = []
+    seen_keys = set()
+    for candidate, step in iter_due_for_today_step(current_date, db):
+        key = build_reminder_key(candidate.tenant_id, candidate.due_date, step)
+        if key in seen_keys:
             report["skipped_duplicate"] += 1
-            report["log"].append({"payment_id": candidate.payment_id, "step": step, "status": "duplicate"})
             continue
-
-        success, reason, subject = send_one(candidate, step)
-        if success:
-            mark_sent(
-                candidate,
-                step,
-                db,
-                meta={
-                    "subject": subject,
-                    "payment_id": candidate.payment_id,
-                    "lease_id": candidate.lease_id,
-                    "step": step,
-                },
+        seen_keys.add(key)
+        subject, plain, html = _render_email(candidate, step)
+        messages.append(
+            OutgoingEmail(
+                to_email=candidate.tenant_email,
+                subject=subject,
+                content=plain,
+                html_content=html,
+                context=(candidate, step),
+            )
+        )
+    report["count"] = len(messages)
+
+    pending: List[Tuple[PaymentReminderCandidate, ReminderStep, Dict[str, Any]]] = []
+    for result in dispatch_emails(messages, dispatch_options):
+        candidate, step = result.message.context
+        if result.success:
+            pending.append(
+                (
+                    candidate,
+                    step,
+                    {
+                        "subject": result.message.subject,
+                        "payment_id": candidate.payment_id,
+                        "lease_id": candidate.lease_id,
+                        "step": step,
+                    },
+                )
             )
             report["sent"] += 1
             report["log"].append({"payment_id": candidate.payment_id, "step": step, "status": "sent"})
+            if len(pending) >= batch_size:
+                mark_sent_batch(pending, db)
+                pending = []
         else:
-            msg = reason or "unknown error"
+            msg = result.reason or "unknown error"
             logging.error(f"[reminders] send failed for payment {candidate.payment_id}: {msg}")
             report["errors"].append({"payment_id": candidate.payment_id, "step": step, "reason": msg})
 
+    mark_sent_batch(pending, db)
     return report
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import json
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Mapping, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.lease import Lease
+from app.models.notification import Notification, NotificationType
+from app.models.payment import Payment, PaymentMethod, PaymentStatus
+from app.models.property import Property
+from app.models.stripe_event import StripeEvent, StripeEventStatus
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.services.document_service import document_renderer, receipt_spec
+from app.services.email_outbox_service import enqueue_email
+from app.utils.eager_loading import PAYMENT_WITH_PARTIES
+
+# Seuls ces événements déclenchent un traitement ; les autres sont acquittés sans être stockés
+HANDLED_EVENT_TYPES = {"payment_intent.succeeded", "checkout.session.completed"}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _payment_refs(event: Mapping[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(payment_id, payment_intent_id, lease_id) portés par un événement géré."""
+    obj = event["data"]["object"]
+    metadata = obj.get("metadata") or {}
+    if event["type"] == "payment_intent.succeeded":
+        return metadata.get("payment_id"), obj.get("id"), metadata.get("lease_id")
+    payment_id = metadata.get("payment_id") or obj.get("client_reference_id")
+    return payment_id, obj.get("payment_intent"), metadata.get("lease_id")
+
+
+def _ordering_key(event: Mapping[str, Any]) -> Optional[str]:
+    payment_id, _, lease_id = _payment_refs(event)
+    if payment_id:
+        return f"payment:{payment_id}"
+    if lease_id:
+        return f"lease:{lease_id}"
+    return None
+
+
+def record_event(db: Session, event: Mapping[str, Any], raw_payload: str) -> bool:
+    """
+    Enregistre l'événement brut et commite. Retourne False si l'id est déjà connu
+    (renvoi Stripe après timeout) : rien n'est alors retraité.
+    """
+    if db.get(StripeEvent, event["id"]) is not None:
+        return False
+    db.add(
+        StripeEvent(
+            id=event["id"],
+            type=event["type"],
+            ordering_key=_ordering_key(event),
+            payload=raw_payload,
+            status=StripeEventStatus.PENDING,
+            stripe_created=int(event.get("created") or 0),
+            attempts=0,
+        )
+    )
+    try:
+        db.commit()
+    except IntegrityError:
+        # Même événement reçu en parallèle par un autre worker
+        db.rollback()
+        return False
+    return True
+
+
+def _mark_payment_paid(db: Session, payment: Payment, pi_id: str) -> None:
+    """Met à jour un paiement, notifie le propriétaire et met les emails en outbox (commit par l'appelant)."""
+    if payment.status == PaymentStatus.PAID:
+        return
+    payment.status = PaymentStatus.PAID
+    payment.payment_date = date.today()
+    payment.payment_method = PaymentMethod.STRIPE
+    payment.transaction_reference = pi_id
+
+    lease = payment.lease
+    prop = lease.property if lease else None
+    owner: User | None = prop.owner if prop else None
+    tenant: Tenant | None = lease.tenant if lease else None
+    tenant_name = ""
+    if tenant and tenant.user:
+        tenant_name = f"{tenant.user.first_name} {tenant.user.last_name}"
+
+    message = (
+        f"Paiement #{payment.id} confirmé pour {prop.title if prop else 'un bien'} "
+        f"({payment.amount:.0f} F CFA) par {tenant_name or 'locataire'}."
+    )
+    # Rendu en tâche de fond : l'URL est définitive, le fichier arrive dans la foulée
+    receipt_url = document_renderer.request(
+        receipt_spec(payment.id, payment.amount, tenant_name, prop.title if prop else "", payment.payment_date)
+    )
+    payment.receipt_url = receipt_url
+
+    # Mail propriétaire
+    if owner and owner.email:
+        enqueue_email(
+            db,
+            owner.email,
+            "Paiement locataire confirmé",
+            f"{message}\nReçu : {receipt_url}",
+            html_content=f"<p>{message}</p><p><a href='{receipt_url}'>Télécharger le reçu</a></p>",
+        )
+        notif = Notification(
+            user_id=owner.id,
+            type=NotificationType.PAYMENT_CONFIRMATION,
+            title="Paiement reçu",
+            message=message,
+        )
+        db.add(notif)
+
+    # Mail locataire (si email dispo)
+    if tenant and tenant.user and tenant.user.email:
+        tenant_email = tenant.user.email
+        enqueue_email(
+            db,
+            tenant_email,
+            "Votre reçu de paiement",
+            f"Bonjour {tenant_name},\nVotre paiement #{payment.id} pour {prop.title if prop else ''} est confirmé.\nReçu : {receipt_url}",
+            html_content=f"<p>Bonjour {tenant_name},</p><p>Votre paiement #{payment.id} pour <strong>{prop.title if prop else ''}</strong> est confirmé.</p><p><a href='{receipt_url}'>Télécharger votre reçu</a></p>",
+        )
+
+
+def apply_event(db: Session, event: Mapping[str, Any]) -> None:
+    """Effet métier d'un événement géré (sans commit)."""
+    if event["type"] not in HANDLED_EVENT_TYPES:
+        return
+    payment_id, pi_id, lease_id = _payment_refs(event)
+    if not pi_id or not (payment_id or lease_id):
+        return
+
+    payment = None
+    if payment_id:
+        payment = db.query(Payment).options(*PAYMENT_WITH_PARTIES).filter(Payment.id == int(payment_id)).first()
+    # Fallback : prendre le premier paiement en attente pour ce bail
+    if not payment and lease_id:
+        payment = (
+            db.query(Payment)
+            .join(Lease)
+            .join(Property)
+            .options(*PAYMENT_WITH_PARTIES)
+            .filter(
+                Payment.lease_id == int(lease_id),
+                Payment.status.in_([PaymentStatus.PENDING, PaymentStatus.LATE, PaymentStatus.PARTIAL]),
+            )
+            .order_by(Payment.due_date.asc())
+            .first()
+        )
+    if payment:
+        _mark_payment_paid(db, payment, pi_id)
+
+
+def process_stripe_events_batch(db: Session, batch_size: Optional[int] = None, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Traite un lot d'événements en attente, dans l'ordre de création Stripe, et commite
+    une seule fois. Chaque événement a son savepoint : un échec n'annule pas le reste du
+    lot, mais les événements suivants de la même clé (paiement ou bail) sont reportés au
+    lot suivant pour préserver l'ordre. Au-delà de STRIPE_EVENTS_MAX_ATTEMPTS l'événement
+    passe en "failed".
+    """
+    current = now or _utcnow()
+    size = batch_size or settings.STRIPE_EVENTS_BATCH_SIZE
+    events = (
+        db.query(StripeEvent)
+        .filter(StripeEvent.status == StripeEventStatus.PENDING)
+        .order_by(StripeEvent.stripe_created.asc(), StripeEvent.id.asc())
+        .limit(size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    stats = {"claimed": len(events), "processed": 0, "retried": 0, "failed": 0, "deferred": 0}
+    if not events:
+        db.rollback()
+        return stats
+
+    blocked: Set[str] = set()
+    for event in events:
+        if event.ordering_key in blocked:
+            stats["deferred"] += 1
+            continue
+        event.attempts = (event.attempts or 0) + 1
+        try:
+            with db.begin_nested():
+                apply_event(db, json.loads(event.payload))
+        except Exception as exc:
+            event.last_error = str(exc)[:500]
+            if event.attempts >= settings.STRIPE_EVENTS_MAX_ATTEMPTS:
+                event.status = StripeEventStatus.FAILED
+                stats["failed"] += 1
+                logging.error(f"[stripe] événement {event.id} abandonné après {event.attempts} tentatives: {exc}")
+            else:
+                stats["retried"] += 1
+                if event.ordering_key:
+                    blocked.add(event.ordering_key)
+            continue
+        event.status = StripeEventStatus.PROCESSED
+        event.processed_at = current
+        event.last_error = None
+        stats["processed"] += 1
+    db.commit()
+    return stats
+
+
+def drain_stripe_events(db: Session, max_batches: int = 50) -> Dict[str, int]:
+    """Enchaîne les lots tant qu'il reste des événements en attente (borné par max_batches)."""
+    totals = {"claimed": 0, "processed": 0, "retried": 0, "failed": 0, "deferred": 0}
+    for _ in range(max_batches):
+        stats = process_stripe_events_batch(db)
+        for key, value in stats.items():
+            totals[key] += value
+        if stats["claimed"] < settings.STRIPE_EVENTS_BATCH_SIZE or stats["processed"] == 0:
+            break
+    return totals
+
+
+def stripe_event_stats(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Backlog (événements en attente par statut) et retard du consommateur."""
+    current = now or _utcnow()
+    depth = {status.value: 0 for status in StripeEventStatus}
+    for status, count in db.query(StripeEvent.status, func.count(StripeEvent.id)).group_by(StripeEvent.status):
+        depth[getattr(status, "value", status)] = count
+
+    oldest_pending = (
+        db.query(func.min(StripeEvent.received_at))
+        .filter(StripeEvent.status == StripeEventStatus.PENDING)
+        .scalar()
+    )
+    lag_seconds = 0.0
+    if oldest_pending is not None:
+        # SQLite relit les DateTime(timezone=True) sans fuseau
+        received = oldest_pending if oldest_pending.tzinfo else oldest_pending.replace(tzinfo=timezone.utc)
+        lag_seconds = max(0.0, (current - received).total_seconds())
+    processed_last_minute = (
+        db.query(func.count(StripeEvent.id))
+        .filter(
+            StripeEvent.status == StripeEventStatus.PROCESSED,
+            StripeEvent.processed_at >= current - timedelta(minutes=1),
+        )
+        .scalar()
+        or 0
+    )
+    return {
+        "depth": depth,
+        "backlog": depth[StripeEventStatus.PENDING.value],
+        "oldest_pending_at": oldest_pending,
+        "lag_seconds": lag_seconds,
+        "processed_last_minute": processed_last_minute,
+    }
@@ -1,23 +1,29 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import Any, Dict, Generator, Optional
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.config import settings
 from app.models.user import User
+from app.utils.user_cache import CachedUser, get_user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+# Variante sans erreur automatique, pour les routes qui acceptent aussi le token en query
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_claims(token: str) -> Dict[str, Any]:
     try:
         payload = jwt.decode(
             token, 
@@ -26,28 +32,109 @@ def get_current_user(
         )
         email: str = payload.get("sub")
         if email is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
-        
-    user = db.query(User).filter(User.email == email).first()
+        raise _credentials_exception()
+    return payload
+
+
+def _cached_identity(claims: Dict[str, Any]) -> Optional[CachedUser]:
+    """Identité en cache pour ce `sub`, si elle correspond bien au `uid` du token."""
+    cached = get_user_cache().get(claims["sub"])
+    if cached is None:
+        return None
+    uid = claims.get("uid")
+    if uid is not None and uid != cached.id:
+        return None
+    return cached
+
+
+def _remember(claims: Dict[str, Any], user: Optional[User]) -> CachedUser:
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    identity = CachedUser.from_user(user)
+    get_user_cache().set(claims["sub"], identity)
+    return identity
+
+
+def _ensure_active(user: CachedUser) -> CachedUser:
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
     return user
 
+
+def _ensure_landlord(user: CachedUser) -> CachedUser:
+    if user.role != "landlord" and user.role != "admin":
+        raise HTTPException(
+            status_code=403, 
+            detail="The user doesn't have enough privileges"
+        )
+    return user
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> CachedUser:
+    """Identité de l'appelant ; la base n'est interrogée qu'en cas d'absence du cache."""
+    claims = _token_claims(token)
+    cached = _cached_identity(claims)
+    if cached is not None:
+        return cached
+    user = db.query(User).filter(User.email == claims["sub"]).first()
+    return _remember(claims, user)
+
 def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    if not current_user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
+    current_user: CachedUser = Depends(get_current_user)
+) -> CachedUser:
+    return _ensure_active(current_user)
 
 def get_current_landlord(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
-    if current_user.role != "landlord" and current_user.role != "admin":
+    current_user: CachedUser = Depends(get_current_active_user)
+) -> CachedUser:
+    return _ensure_landlord(current_user)
+
+def get_current_admin(
+    current_user: CachedUser = Depends(get_current_active_user)
+) -> CachedUser:
+    if current_user.role != "admin":
         raise HTTPException(
-            status_code=403, 
+            status_code=403,
             detail="The user doesn't have enough privileges"
         )
     return current_user
+
+def get_current_active_user_sse(
+    access_token: Optional[str] = Query(None),
+    bearer: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> CachedUser:
+    """Flux SSE : EventSource ne sait pas envoyer d'en-tête, le token peut venir de `?access_token=`."""
+    token = bearer or access_token
+    if not token:
+        raise _credentials_exception()
+    return _ensure_active(get_current_user(db=db, token=token))
+
+
+# Variantes async (routes servies par la pile AsyncSession)
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> CachedUser:
+    claims = _token_claims(token)
+    cached = _cached_identity(claims)
+    if cached is not None:
+        return cached
+    result = await db.execute(select(User).where(User.email == claims["sub"]))
+    return _remember(claims, result.scalars().first())
+
+async def get_current_active_user_async(
+    current_user: CachedUser = Depends(get_current_user_async)
+) -> CachedUser:
+    return _ensure_active(current_user)
+
+async def get_current_landlord_async(
+    current_user: CachedUser = Depends(get_current_active_user_async)
+) -> CachedUser:
+    return _ensure_landlord(current_user)
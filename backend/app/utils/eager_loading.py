@@ -0,0 +1,26 @@
+"""
+Plans de chargement des relations, alignés sur ce que lisent les schémas de réponse et les
+traitements (reçus, avis, notifications). Toutes les relations concernées sont des many-to-one
+à clé étrangère non nulle : joinedload en jointure interne, une seule requête quel que soit le
+nombre de lignes. Quand la requête joint déjà la table pour filtrer, contains_eager réutilise
+cette jointure (voir les routes).
+"""
+from sqlalchemy.orm import joinedload
+
+from app.models.lease import Lease
+from app.models.payment import Payment
+from app.models.property import Property
+from app.models.tenant import Tenant
+
+# TenantDetailResponse : profil locataire + UserResponse
+TENANT_WITH_USER = (joinedload(Tenant.user, innerjoin=True),)
+
+# Reçus, avis d'échéance, confirmation Stripe : bien, propriétaire, locataire et son compte
+PAYMENT_WITH_PARTIES = (
+    joinedload(Payment.lease, innerjoin=True)
+    .joinedload(Lease.property, innerjoin=True)
+    .joinedload(Property.owner, innerjoin=True),
+    joinedload(Payment.lease, innerjoin=True)
+    .joinedload(Lease.tenant, innerjoin=True)
+    .joinedload(Tenant.user, innerjoin=True),
+)
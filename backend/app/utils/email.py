@@ -1,11 +1,18 @@
 import logging
 import re
 import smtplib
+import threading
+import time
+from contextlib import contextmanager
 from email.message import EmailMessage
 from email.utils import formataddr
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, Email
 from app.config import settings
+from app.utils.metrics import email_send_duration, email_send_failures
+from app.utils.rate_limit import RateLimiter
 
 
 def _strip_html(html: str) -> str:
@@ -13,14 +20,7 @@ def _strip_html(html: str) -> str:
     return re.sub("<[^>]+>", " ", html or "").strip()
 
 
-def _send_via_smtp(to_email: str, subject: str, content: str, html_content: str | None) -> tuple[bool, str | None]:
-    if not settings.SMTP_HOST:
-        return False, "SMTP: hôte non configuré"
-    if not settings.FROM_EMAIL:
-        return False, "SMTP: FROM_EMAIL non défini"
-    if not to_email:
-        return False, "SMTP: destinataire vide"
-
+def _build_message(to_email: str, subject: str, content: str, html_content: str | None) -> EmailMessage:
     msg = EmailMessage()
     msg["Subject"] = subject
     msg["From"] = formataddr((settings.FROM_NAME or "", settings.FROM_EMAIL))
@@ -28,19 +28,305 @@ def _send_via_smtp(to_email: str, subject: str, content: str, html_content: str
     msg.set_content(content or _strip_html(html_content or ""))
     if html_content:
         msg.add_alternative(html_content, subtype="html")
+    return msg
+
+
+def _open_smtp() -> smtplib.SMTP:
+    """Ouvre une connexion SMTP authentifiée (STARTTLS + login si configurés)."""
+    server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=15)
+    try:
+        if settings.SMTP_USE_TLS:
+            server.starttls()
+        if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
+            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def _session_lost(exc: BaseException) -> bool:
+    """
+    Erreur qui rend la session inutilisable (coupure, socket, TLS). Les refus SMTP
+    (SMTPResponseException, SMTPRecipientsRefused…) héritent aussi d'OSError mais laissent
+    la session saine : RSET puis remise dans le pool.
+    """
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(exc, smtplib.SMTPException):
+        return False
+    # Niveau socket : ConnectionError, socket.timeout, ssl.SSLError et autres OSError réseau
+    return isinstance(exc, OSError)
+
+
+class _PooledConnection:
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class SMTPConnectionPool:
+    """
+    Pool thread-safe de connexions SMTP authentifiées.
+
+    - au plus `max_size` connexions ouvertes, `checkout` bloque au-delà ;
+    - une connexion plus vieille que `max_age` secondes est recyclée ;
+    - une connexion inactive depuis plus de `noop_after` secondes est vérifiée par NOOP ;
+    - un envoi interrompu par SMTPServerDisconnected est rejoué une fois sur une connexion neuve.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], smtplib.SMTP] = _open_smtp,
+        max_size: int = 4,
+        max_age: float = 300.0,
+        noop_after: float = 30.0,
+        checkout_timeout: float = 30.0,
+    ):
+        self._factory = factory
+        self.max_size = max(1, max_size)
+        self.max_age = max_age
+        self.noop_after = noop_after
+        self.checkout_timeout = checkout_timeout
+        self._idle: List[_PooledConnection] = []
+        self._open = 0
+        self._cond = threading.Condition()
+        self.connections_created = 0
+
+    @property
+    def size(self) -> int:
+        return self._open
+
+    def _create(self) -> _PooledConnection:
+        try:
+            conn = _PooledConnection(self._factory())
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.connections_created += 1
+        return conn
+
+    def _reconnect(self, conn: _PooledConnection) -> None:
+        """Remplace la session SMTP de `conn` ; l'emplacement dans le pool reste réservé."""
+        self._close_quietly(conn)
+        conn.server = self._factory()
+        conn.created_at = conn.last_used = time.monotonic()
+        with self._cond:
+            self.connections_created += 1
+
+    def _is_healthy(self, conn: _PooledConnection) -> bool:
+        now = time.monotonic()
+        if now - conn.created_at > self.max_age:
+            return False
+        if now - conn.last_used > self.noop_after:
+            try:
+                code, _ = conn.server.noop()
+            except Exception:
+                return False
+            return code == 250
+        return True
+
+    def checkout(self) -> _PooledConnection:
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("SMTP: aucune connexion disponible dans le pool")
+                self._cond.wait(remaining)
+        if conn is None:
+            return self._create()
+        if self._is_healthy(conn):
+            return conn
+        # Connexion trop vieille ou morte : on la remplace en gardant son emplacement
+        try:
+            self._reconnect(conn)
+        except Exception:
+            self.discard(conn)
+            raise
+        return conn
+
+    def checkin(self, conn: _PooledConnection) -> None:
+        conn.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @staticmethod
+    def _close_quietly(conn: _PooledConnection) -> None:
+        try:
+            conn.server.close()
+        except Exception:
+            pass
+
+    def discard(self, conn: _PooledConnection) -> None:
+        self._close_quietly(conn)
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        conn = self.checkout()
+        try:
+            yield conn.server
+        except BaseException as exc:
+            if _session_lost(exc):
+                self.discard(conn)
+            else:
+                self._release_after_error(conn)
+            raise
+        else:
+            self.checkin(conn)
+
+    def _release_after_error(self, conn: _PooledConnection) -> None:
+        """Après un refus SMTP (destinataire, etc.), la session reste utilisable après RSET."""
+        try:
+            conn.server.rset()
+        except Exception:
+            self.discard(conn)
+            return
+        self.checkin(conn)
+
+    def _send_on(self, conn: _PooledConnection, msg: EmailMessage) -> _PooledConnection:
+        """Envoie sur `conn`, reconnecte une fois si le serveur a coupé. Retourne la connexion utilisée."""
+        try:
+            conn.server.send_message(msg)
+            return conn
+        except smtplib.SMTPServerDisconnected:
+            self._reconnect(conn)
+            conn.server.send_message(msg)
+            return conn
+
+    def send_message(self, msg: EmailMessage) -> None:
+        conn = self.checkout()
+        try:
+            conn = self._send_on(conn, msg)
+        except BaseException as exc:
+            if _session_lost(exc):
+                self.discard(conn)
+            else:
+                self._release_after_error(conn)
+            raise
+        self.checkin(conn)
+
+    def send_many(self, messages: List[EmailMessage]) -> List[Tuple[bool, str | None]]:
+        """Envoie plusieurs messages à la suite sur une même session SMTP (latence et échecs par message)."""
+        results: List[Tuple[bool, str | None]] = []
+        conn: _PooledConnection | None = None
+        for msg in messages:
+            start = time.perf_counter()
+            try:
+                if conn is None:
+                    conn = self.checkout()
+                conn = self._send_on(conn, msg)
+                conn.last_used = time.monotonic()
+                results.append((True, None))
+            except Exception as exc:
+                if conn is not None and _session_lost(exc):
+                    self.discard(conn)
+                    conn = None
+                elif conn is not None:
+                    try:
+                        conn.server.rset()
+                    except Exception:
+                        self.discard(conn)
+                        conn = None
+                email_send_failures.inc(provider="smtp")
+                results.append((False, f"SMTP error: {exc}"))
+            finally:
+                email_send_duration.observe(time.perf_counter() - start, provider="smtp")
+        if conn is not None:
+            self.checkin(conn)
+        return results
 
+    def close(self) -> None:
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            try:
+                conn.server.quit()
+            except Exception:
+                pass
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+
+
+_smtp_pool: SMTPConnectionPool | None = None
+_smtp_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Pool SMTP partagé par le processus (créé à la première utilisation)."""
+    global _smtp_pool
+    if _smtp_pool is None:
+        with _smtp_pool_lock:
+            if _smtp_pool is None:
+                _smtp_pool = SMTPConnectionPool(
+                    max_size=settings.SMTP_POOL_SIZE,
+                    max_age=settings.SMTP_POOL_MAX_AGE_SECONDS,
+                    noop_after=settings.SMTP_POOL_NOOP_AFTER_SECONDS,
+                )
+    return _smtp_pool
+
+
+def reset_smtp_pool() -> None:
+    """Ferme les connexions du pool partagé (changement de configuration, arrêt)."""
+    global _smtp_pool
+    with _smtp_pool_lock:
+        pool, _smtp_pool = _smtp_pool, None
+    if pool is not None:
+        pool.close()
+
+
+@lru_cache(maxsize=1)
+def _sendgrid_client(api_key: str) -> SendGridAPIClient:
+    """Client SendGrid partagé (un seul par clé API)."""
+    return SendGridAPIClient(api_key)
+
+
+def _send_via_smtp(
+    to_email: str,
+    subject: str,
+    content: str,
+    html_content: str | None,
+    server: smtplib.SMTP | None = None,
+) -> tuple[bool, str | None]:
+    if not settings.SMTP_HOST:
+        return False, "SMTP: hôte non configuré"
+    if not settings.FROM_EMAIL:
+        return False, "SMTP: FROM_EMAIL non défini"
+    if not to_email:
+        return False, "SMTP: destinataire vide"
+
+    msg = _build_message(to_email, subject, content, html_content)
+
+    start = time.perf_counter()
     try:
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=15) as server:
-            if settings.SMTP_USE_TLS:
-                server.starttls()
-            if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-                server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+        if server is not None:
             server.send_message(msg)
+        else:
+            get_smtp_pool().send_message(msg)
         return True, None
     except Exception as exc:
+        email_send_failures.inc(provider="smtp")
         msg = f"SMTP error: {exc}"
         logging.error(msg)
         return False, msg
+    finally:
+        email_send_duration.observe(time.perf_counter() - start, provider="smtp")
 
 
 def _send_via_sendgrid(to_email: str, subject: str, content: str, html_content: str | None) -> tuple[bool, str | None]:
@@ -52,6 +338,7 @@ def _send_via_sendgrid(to_email: str, subject: str, content: str, html_content:
         return False, "SendGrid: destinataire vide"
 
     sender = Email(settings.FROM_EMAIL, settings.FROM_NAME or None)
+    start = time.perf_counter()
     try:
         message = Mail(
             from_email=sender,
@@ -60,19 +347,64 @@ def _send_via_sendgrid(to_email: str, subject: str, content: str, html_content:
             plain_text_content=content or _strip_html(html_content or ""),
             html_content=html_content,
         )
-        sg = SendGridAPIClient(settings.SENDGRID_API_KEY)
+        sg = _sendgrid_client(settings.SENDGRID_API_KEY)
         response = sg.send(message)
         status = getattr(response, "status_code", 500)
         if status >= 400:
             body = getattr(response, "body", b"")
+            email_send_failures.inc(provider="sendgrid")
             msg = f"SendGrid {status}: {body}"
             logging.error(msg)
             return False, msg
         return True, None
     except Exception as exc:
+        email_send_failures.inc(provider="sendgrid")
         msg = f"SendGrid error: {exc}"
         logging.error(msg)
         return False, msg
+    finally:
+        email_send_duration.observe(time.perf_counter() - start, provider="sendgrid")
+
+
+class EmailSender:
+    """
+    Session d'envoi pour un worker : les connexions SMTP viennent du pool partagé
+    et le client SendGrid est commun. Les limiteurs optionnels (clés "smtp" et
+    "sendgrid") bornent le débit par provider.
+    """
+
+    def __init__(self, rate_limiters: Optional[Dict[str, RateLimiter]] = None):
+        self._rate_limiters = rate_limiters or {}
+
+    def _throttle(self, provider: str) -> None:
+        limiter = self._rate_limiters.get(provider)
+        if limiter:
+            limiter.acquire()
+
+    def send(self, to_email: str, subject: str, content: str, html_content: str | None = None) -> tuple[bool, str | None]:
+        """Même contrat que send_email : SMTP d'abord, puis SendGrid. Retourne (success, reason)."""
+        if settings.SMTP_HOST:
+            self._throttle("smtp")
+        smtp_success, smtp_reason = _send_via_smtp(to_email, subject, content, html_content)
+        if smtp_success:
+            return True, None
+
+        if settings.SENDGRID_API_KEY:
+            self._throttle("sendgrid")
+        sg_success, sg_reason = _send_via_sendgrid(to_email, subject, content, html_content)
+        if sg_success:
+            return True, None
+        return False, smtp_reason or sg_reason or "Aucun provider email configuré"
+
+    def close(self) -> None:
+        # Les connexions appartiennent au pool partagé : rien à libérer ici
+        pass
+
+    def __enter__(self) -> "EmailSender":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
 
 def send_email(to_email: str, subject: str, content: str, html_content: str | None = None) -> tuple[bool, str | None]:
@@ -90,3 +422,39 @@ def send_email(to_email: str, subject: str, content: str, html_content: str | No
         return True, None
     # 3) Rien n'a marché
     return False, smtp_reason or sg_reason or "Aucun provider email configuré"
+
+
+def send_many(
+    messages: List[Tuple[str, str, str, str | None]],
+) -> List[tuple[bool, str | None]]:
+    """
+    Envoie une série de messages (to_email, subject, content, html_content) sur une
+    seule session SMTP du pool. Les messages refusés par SMTP basculent sur SendGrid.
+    Retourne un (success, reason) par message, dans l'ordre.
+    """
+    results: List[tuple[bool, str | None]] = [(False, None)] * len(messages)
+    smtp_batch: List[EmailMessage] = []
+    smtp_index: List[int] = []
+    for idx, (to_email, subject, content, html_content) in enumerate(messages):
+        if settings.SMTP_HOST and settings.FROM_EMAIL and to_email:
+            smtp_batch.append(_build_message(to_email, subject, content, html_content))
+            smtp_index.append(idx)
+        else:
+            results[idx] = (False, "SMTP: non configuré ou destinataire vide")
+
+    if smtp_batch:
+        try:
+            smtp_results = get_smtp_pool().send_many(smtp_batch)
+        except Exception as exc:
+            email_send_failures.inc(len(smtp_batch), provider="smtp")
+            smtp_results = [(False, f"SMTP error: {exc}")] * len(smtp_batch)
+        for idx, result in zip(smtp_index, smtp_results):
+            results[idx] = result
+
+    for idx, (success, reason) in enumerate(results):
+        if success:
+            continue
+        to_email, subject, content, html_content = messages[idx]
+        sg_success, sg_reason = _send_via_sendgrid(to_email, subject, content, html_content)
+        results[idx] = (True, None) if sg_success else (False, reason or sg_reason)
+    return results
@@ -0,0 +1,91 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.config import settings
+from app.utils.metrics import Gauge, registry
+
+T = TypeVar("T")
+
+
+class BlockingExecutor:
+    """
+    Pool de threads dédié aux appels bloquants (DB synchrone, SMTP, Stripe, Cloudinary,
+    ReportLab) lancés depuis du code async, pour ne jamais bloquer la boucle d'événements.
+    Séparé du threadpool de Starlette afin qu'un lot de relances ne prive pas les routes.
+    Les threads sont créés au premier appel et recréés après `shutdown` (arrêt puis
+    redémarrage du lifespan dans le même processus).
+    """
+
+    def __init__(self, max_workers: int, name: str = "blocking"):
+        self.max_workers = max(1, max_workers)
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._started = 0
+        self._completed = 0
+        self._failed = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    def _call(self, func: Callable[..., T], args: tuple, kwargs: Dict[str, Any]) -> T:
+        with self._lock:
+            self._started += 1
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._completed += 1
+        return result
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Exécute `func` dans le pool et attend son résultat sans bloquer la boucle."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._submitted += 1
+        # Propage les contextvars (instrumentation par requête) au thread du pool
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, self._call, func, args, kwargs)
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active": self._started - self._completed,
+                "queued": self._submitted - self._started,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+blocking_executor = BlockingExecutor(settings.BLOCKING_POOL_SIZE)
+registry.register(Gauge(
+    "locatus_blocking_executor_tasks", "Appels bloquants en cours (active) et en attente d'un thread (queued).", ("state",),
+    callback=lambda: {(state,): value for state, value in blocking_executor.stats().items() if state in ("active", "queued")},
+))
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Raccourci vers le pool bloquant partagé."""
+    return await blocking_executor.run(func, *args, **kwargs)
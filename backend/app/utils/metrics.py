@@ -0,0 +1,305 @@
+"""
+Métriques au format texte Prometheus (0.0.4), sans dépendance : compteurs, jauges et
+histogrammes en mémoire du processus, exposés par GET /metrics.
+Sur le chemin chaud, une observation coûte un verrou, une recherche dichotomique et deux
+additions ; les jauges coûteuses (pool SQL, pool bloquant) sont lues à la collecte.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Jauge mise à jour (inc/dec/set) ou lue par `callback` à la collecte ({valeurs de labels: valeur})."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        if self._callback is not None:
+            items = sorted(self._callback().items())
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Par jeu de labels : comptes par intervalle (dernier = au-delà du plus grand seuil), somme
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"métrique déjà enregistrée : {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(metric.render() for metric in metrics)
+
+
+registry = MetricsRegistry()
+
+# ===== API =====
+http_request_duration = registry.register(Histogram(
+    "locatus_http_request_duration_seconds", "Durée des requêtes HTTP par route.", ("method", "route", "status"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "locatus_http_requests_in_flight", "Requêtes HTTP en cours de traitement.",
+))
+
+# ===== Appels externes =====
+email_send_duration = registry.register(Histogram(
+    "locatus_email_send_duration_seconds", "Durée d'un envoi d'email par provider.", ("provider",),
+))
+email_send_failures = registry.register(Counter(
+    "locatus_email_send_failures_total", "Envois d'email en échec par provider.", ("provider",),
+))
+stripe_request_duration = registry.register(Histogram(
+    "locatus_stripe_request_duration_seconds", "Durée des appels à l'API Stripe.", ("operation", "outcome"),
+))
+
+# ===== Pools =====
+_pools: Dict[str, object] = {}
+
+
+def _pool_reader(method: str) -> Callable[[], Dict[LabelValues, float]]:
+    def read() -> Dict[LabelValues, float]:
+        # Les pools sans file (StaticPool, SingletonThreadPool des bases SQLite mémoire) n'exposent rien
+        readers = {name: getattr(pool, method, None) for name, pool in list(_pools.items())}
+        return {(name,): reader() for name, reader in readers.items() if callable(reader)}
+
+    return read
+
+
+db_pool_size = registry.register(Gauge(
+    "locatus_db_pool_size", "Taille nominale du pool de connexions SQLAlchemy.", ("pool",), callback=_pool_reader("size"),
+))
+db_pool_checked_out = registry.register(Gauge(
+    "locatus_db_pool_checked_out", "Connexions SQLAlchemy empruntées.", ("pool",), callback=_pool_reader("checkedout"),
+))
+db_pool_overflow = registry.register(Gauge(
+    "locatus_db_pool_overflow", "Connexions ouvertes au-delà de pool_size (négatif : places libres avant la taille nominale).",
+    ("pool",), callback=_pool_reader("overflow"),
+))
+
+
+def watch_pool(name: str, pool) -> None:
+    """Expose les jauges du pool de connexions `pool` sous le label pool=`name`."""
+    _pools[name] = pool
+
+
+# ===== Tâches de fond =====
+job_duration = registry.register(Histogram(
+    "locatus_job_duration_seconds", "Durée des tâches planifiées.", ("job", "outcome"), buckets=JOB_BUCKETS,
+))
+
+
+@contextmanager
+def track_job(job: str) -> Iterator[None]:
+    """Chronomètre une exécution de tâche ; outcome="error" si elle lève."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        job_duration.observe(time.perf_counter() - start, job=job, outcome=outcome)
+
+
+def timed_job(job: str):
+    """Décorateur : chaque appel est compté et chronométré dans locatus_job_duration_seconds."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_job(job):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def track_stripe(operation: str) -> Iterator[None]:
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        stripe_request_duration.observe(time.perf_counter() - start, operation=operation, outcome=outcome)
+
+
+def route_label(scope) -> str:
+    """Gabarit de la route (/api/payments/{payment_id}) : cardinalité bornée, pas l'URL brute."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Middleware ASGI : requêtes en cours et histogramme de durée par méthode, route et statut."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            http_request_duration.observe(
+                time.perf_counter() - start, method=scope["method"], route=route_label(scope), status=str(status),
+            )
@@ -0,0 +1,93 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import literal, tuple_
+
+T = TypeVar("T")
+
+MAX_PAGE_SIZE = 500
+
+
+class Page(BaseModel, Generic[T]):
+    """Page d'une liste paginée par curseur ; `next_cursor` est None sur la dernière page."""
+
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class KeysetOrder:
+    """
+    Ordre de tri stable (colonnes de tri + id en dernier) servant de clé de curseur.
+    Toutes les colonnes sont triées dans le même sens, ce qui permet une
+    comparaison de tuples (row value) exploitable par un index composite.
+    """
+
+    def __init__(self, *columns, descending: bool = False):
+        self.columns = columns
+        self.descending = descending
+
+    def order_by(self):
+        return [column.desc() if self.descending else column.asc() for column in self.columns]
+
+    def after(self, values: Sequence[Any]):
+        """Condition "strictement après `values`" dans l'ordre de tri."""
+        left = tuple_(*self.columns)
+        right = tuple_(*(literal(value, column.type) for column, value in zip(self.columns, values)))
+        return left < right if self.descending else left > right
+
+    def key(self, item) -> Tuple[Any, ...]:
+        return tuple(getattr(item, column.key) for column in self.columns)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = [_decode_value(v) for v in json.loads(raw)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def apply_keyset(stmt, order: KeysetOrder, cursor: str, limit: int):
+    """
+    Ajoute tri, condition de curseur et limite (+1 pour savoir s'il reste une page)
+    à un `select()` ou une `Query`. Un curseur vide demande la première page.
+    """
+    if cursor:
+        stmt = stmt.where(order.after(decode_cursor(cursor, len(order.columns))))
+    return stmt.order_by(*order.order_by()).limit(min(limit, MAX_PAGE_SIZE) + 1)
+
+
+def build_page(rows: Sequence[Any], order: KeysetOrder, limit: int) -> dict:
+    limit = min(limit, MAX_PAGE_SIZE)
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(order.key(items[-1])) if len(rows) > limit and items else None
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, DefaultDict, Hashable, List, Tuple
+
+
+class Subscription:
+    """File d'attente d'un abonné, consommée depuis sa boucle d'événements."""
+
+    def __init__(self, topic: Hashable, loop: asyncio.AbstractEventLoop, max_pending: int):
+        self.topic = topic
+        self.loop = loop
+        self.queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=max_pending)
+        self.dropped = 0
+
+    def _deliver(self, message: Any) -> None:
+        # Abonné trop lent : on écarte le plus ancien message plutôt que de bloquer l'éditeur
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self) -> Any:
+        return await self.queue.get()
+
+
+class PubSub:
+    """
+    Pub/sub en mémoire, propre au processus. `publish` peut être appelé depuis
+    n'importe quel thread (routes synchrones, pool bloquant) ; la livraison se fait
+    dans la boucle de chaque abonné. Plusieurs workers = plusieurs bus indépendants.
+    """
+
+    def __init__(self, max_pending: int = 100):
+        self.max_pending = max_pending
+        self._subscribers: DefaultDict[Hashable, List[Subscription]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: Hashable) -> Subscription:
+        subscription = Subscription(topic, asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscribers[topic].append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.topic, None)
+
+    def publish(self, topic: Hashable, message: Any) -> int:
+        with self._lock:
+            targets: Tuple[Subscription, ...] = tuple(self._subscribers.get(topic, ()))
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, message)
+            except RuntimeError:  # boucle fermée
+                self.unsubscribe(subscription)
+        return len(targets)
+
+    def subscriber_count(self, topic: Hashable = None) -> int:
+        with self._lock:
+            if topic is not None:
+                return len(self._subscribers.get(topic, ()))
+            return sum(len(subs) for subs in self._subscribers.values())
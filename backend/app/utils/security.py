@@ -1,10 +1,30 @@
+import asyncio
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
+from typing import List, Optional, Sequence, Tuple, Union, Any, Dict
 from jose import jwt
 from app.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache(maxsize=None)
+def _crypt_context(rounds: int) -> CryptContext:
+    # min/max = rounds : tout hash d'un autre coût est signalé "à mettre à jour"
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+pwd_context = _crypt_context(settings.BCRYPT_ROUNDS)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -12,9 +32,82 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+
+# Fonctions exécutées dans les processus du pool (doivent rester au niveau module)
+def _hash_in_worker(password: str, rounds: int) -> str:
+    return _crypt_context(rounds).hash(password)
+
+
+def _verify_in_worker(password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return _crypt_context(rounds).verify_and_update(password, hashed_password)
+
+
+_password_pool: Optional[ProcessPoolExecutor] = None
+_password_pool_lock = threading.Lock()
+
+
+def get_password_pool() -> ProcessPoolExecutor:
+    """
+    Pool de processus dédié à bcrypt : le calcul (~250 ms à coût 12) ne monopolise
+    ni la boucle d'événements ni les threads qui servent les autres routes.
+    """
+    global _password_pool
+    if _password_pool is None:
+        with _password_pool_lock:
+            if _password_pool is None:
+                workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+                _password_pool = ProcessPoolExecutor(max_workers=workers)
+    return _password_pool
+
+
+def shutdown_password_pool() -> None:
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is not None:
+            _password_pool.shutdown(wait=False, cancel_futures=True)
+            _password_pool = None
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_pool(), _hash_in_worker, password, settings.BCRYPT_ROUNDS)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Vérifie le mot de passe hors des threads de requête.
+    Retourne (valide, nouveau_hash) ; nouveau_hash est renseigné quand le coût
+    du hash stocké ne correspond plus à BCRYPT_ROUNDS (rehash transparent au login).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_password_pool(), _verify_in_worker, plain_password, hashed_password, settings.BCRYPT_ROUNDS
+    )
+
+def hash_passwords(passwords: Sequence[str]) -> List[str]:
+    """Hash d'un lot de mots de passe réparti sur le pool de processus (appel bloquant, imports en masse)."""
+    if not passwords:
+        return []
+    return list(get_password_pool().map(_hash_in_worker, passwords, repeat(settings.BCRYPT_ROUNDS)))
+
+
+_BCRYPT_ALPHABET = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+
+def unusable_password_hash() -> str:
+    """
+    Hash bcrypt valide mais tiré au hasard (sel et empreinte) : aucun mot de passe ne le vérifie.
+    Sert aux comptes créés sans mot de passe, sans payer le coût de bcrypt.
+    Le dernier caractère du sel et de l'empreinte n'utilise que des bits de bourrage nuls.
+    """
+    salt = "".join(secrets.choice(_BCRYPT_ALPHABET) for _ in range(21)) + secrets.choice(_BCRYPT_ALPHABET[::16])
+    digest = "".join(secrets.choice(_BCRYPT_ALPHABET) for _ in range(30)) + secrets.choice(_BCRYPT_ALPHABET[::4])
+    return f"$2b${settings.BCRYPT_ROUNDS:02d}${salt}{digest}"
+
 def create_access_token(
     subject: Union[str, Any], 
-    expires_delta: Optional[timedelta] = None
+    expires_delta: Optional[timedelta] = None,
+    claims: Optional[Dict[str, Any]] = None,
 ) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -23,7 +116,7 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(
         to_encode, 
         settings.SECRET_KEY, 
@@ -0,0 +1,158 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger("locatus.sql")
+
+_WHITESPACE = re.compile(r"\s+")
+# Listes IN (?, ?, ...) de longueur variable et littéraux : une même forme de requête
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+))*\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+
+
+class NPlusOneError(RuntimeError):
+    """Levée (SQL_N_PLUS_ONE_RAISE) quand une requête HTTP répète la même forme de SELECT."""
+
+
+def statement_shape(statement: str) -> str:
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("(?)", shape)
+    return _NUMBER.sub("?", shape)
+
+
+@dataclass
+class QueryStats:
+    """Statistiques SQL d'une unité de travail (une requête HTTP en général)."""
+
+    query_count: int = 0
+    db_time: float = 0.0
+    slow: List[Tuple[float, str]] = field(default_factory=list)
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.query_count += 1
+        self.db_time += elapsed
+        if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS and len(self.slow) < settings.SQL_SLOW_QUERY_LOG_LIMIT:
+            self.slow.append((elapsed, _WHITESPACE.sub(" ", statement)[:500]))
+        if statement.lstrip()[:6].upper() == "SELECT":
+            self.shapes[statement_shape(statement)] += 1
+
+    def n_plus_one(self) -> List[Tuple[str, int]]:
+        """Formes de SELECT répétées au moins SQL_N_PLUS_ONE_THRESHOLD fois."""
+        threshold = max(2, settings.SQL_N_PLUS_ONE_THRESHOLD)
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collecte les requêtes SQL exécutées dans ce contexte (et les threads qui en héritent)."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._sql_instrumentation_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    start = getattr(context, "_sql_instrumentation_start", None)
+    if stats is None or start is None:
+        return
+    stats.record(statement, time.perf_counter() - start)
+
+
+def install_sql_hooks() -> None:
+    """Écoute tous les moteurs (sync, async via leur moteur sync, moteurs de test) ; idempotent."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _server_timing(stats: QueryStats, elapsed: float) -> bytes:
+    return (
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.query_count} queries", app;dur={elapsed * 1000:.1f}'
+    ).encode("latin-1")
+
+
+def _log_request(method: str, path: str, status: Optional[int], stats: QueryStats, elapsed: float) -> None:
+    suspects = stats.n_plus_one()
+    payload = {
+        "event": "sql_request",
+        "method": method,
+        "path": path,
+        "status": status,
+        "queries": stats.query_count,
+        "db_ms": round(stats.db_time * 1000, 2),
+        "duration_ms": round(elapsed * 1000, 2),
+    }
+    if stats.slow:
+        payload["slow"] = [{"ms": round(ms * 1000, 2), "statement": sql} for ms, sql in stats.slow]
+    if suspects:
+        payload["n_plus_one"] = [{"count": count, "statement": shape[:500]} for shape, count in suspects]
+    level = logging.WARNING if stats.slow or suspects else logging.INFO
+    logger.log(level, json.dumps(payload, ensure_ascii=False))
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Middleware ASGI : nombre de requêtes SQL, temps DB et requêtes lentes par requête HTTP,
+    renvoyés dans l'en-tête Server-Timing et journalisés (JSON, logger "locatus.sql").
+    Les SELECT de même forme répétés (N+1) sont signalés ; avec SQL_N_PLUS_ONE_RAISE
+    la réponse est remplacée par une erreur (mode test).
+    L'en-tête part avec le début de la réponse : pour un flux, les requêtes du corps
+    ne figurent que dans le journal.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        install_sql_hooks()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = None
+        with track_queries() as stats:
+            async def send_with_timing(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    suspects = stats.n_plus_one()
+                    if suspects and settings.SQL_N_PLUS_ONE_RAISE:
+                        shape, count = suspects[0]
+                        raise NPlusOneError(f"{scope['method']} {scope['path']}: {count} x {shape}")
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(stats, time.perf_counter() - start)))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                _log_request(scope["method"], scope["path"], status, stats, time.perf_counter() - start)
@@ -1,6 +1,17 @@
+import hashlib
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, Callable
+
 import stripe
-from typing import Optional, Dict, Any
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
 from app.config import settings
+from app.models.checkout_session import CheckoutSession
+from app.utils.metrics import track_stripe
 
 # Configure Stripe globally if clé présente
 if settings.STRIPE_SECRET_KEY:
@@ -50,6 +61,205 @@ def to_stripe_amount(amount: float, currency: str) -> Optional[int]:
     return smallest
 
 
+class StripeCheckoutClient:
+    """Appels Stripe du helper, isolés pour pouvoir être remplacés (voir set_stripe_client)."""
+
+    def create_session(self, **params):
+        return stripe.checkout.Session.create(**params)
+
+    def create_payment_link(self, **params):
+        return stripe.PaymentLink.create(**params)
+
+
+_client = StripeCheckoutClient()
+
+
+def get_stripe_client() -> StripeCheckoutClient:
+    return _client
+
+
+def set_stripe_client(client) -> StripeCheckoutClient:
+    """Remplace le client Stripe (tests, benchmarks) et retourne le précédent."""
+    global _client
+    previous = _client
+    _client = client
+    return previous
+
+
+@dataclass
+class CreatedCheckout:
+    url: str
+    stripe_id: Optional[str]
+    expires_at: datetime
+
+
+class CheckoutSessionStats:
+    """
+    Compteurs de la réutilisation des sessions : `hits` = session existante servie,
+    `misses` = appel Stripe nécessaire (dont `refreshes` : session proche de l'expiration),
+    `failures` = Stripe n'a rien renvoyé.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.refreshes = 0
+            self.failures = 0
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "failures": self.failures,
+            }
+
+
+checkout_stats = CheckoutSessionStats()
+
+
+def _line_items(currency: str, stripe_amount: int, description: str) -> list:
+    return [
+        {
+            "price_data": {
+                "currency": currency,
+                "unit_amount": stripe_amount,
+                "product_data": {"name": description},
+            },
+            "quantity": 1,
+        }
+    ]
+
+
+def _create_checkout(
+    stripe_amount: int,
+    currency: str,
+    description: str,
+    success_url: str,
+    cancel_url: str,
+    metadata: Optional[Dict[str, Any]],
+) -> Optional[CreatedCheckout]:
+    client = get_stripe_client()
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.STRIPE_CHECKOUT_TTL_SECONDS)
+    try:
+        with track_stripe("checkout_session_create"):
+            session = client.create_session(
+                mode="payment",
+                line_items=_line_items(currency, stripe_amount, description),
+                success_url=success_url,
+                cancel_url=cancel_url,
+                client_reference_id=str(metadata.get("payment_id")) if metadata and metadata.get("payment_id") else None,
+                metadata=metadata or {},
+                automatic_tax={"enabled": False},
+                expires_at=int(expires_at.timestamp()),
+            )
+        return CreatedCheckout(url=session.url, stripe_id=session.id, expires_at=expires_at)
+    except Exception as exc:
+        print(f"[stripe] checkout session error: {exc}")
+        # Fallback : Payment Link (sans success/cancel)
+        try:
+            with track_stripe("payment_link_create"):
+                pl = client.create_payment_link(
+                    line_items=_line_items(currency, stripe_amount, description),
+                    metadata=metadata or {},
+                )
+            url = getattr(pl, "url", None)
+            return CreatedCheckout(url=url, stripe_id=getattr(pl, "id", None), expires_at=expires_at) if url else None
+        except Exception as sub_exc:
+            print(f"[stripe] payment link error: {sub_exc}")
+            return None
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite relit les DateTime(timezone=True) sans fuseau
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _checkout_reference(
+    metadata: Optional[Dict[str, Any]], description: str, success_url: str, cancel_url: str
+) -> Optional[str]:
+    """
+    payment:{id} ou lease:{id}, suivi d'une empreinte des URLs de retour et du libellé :
+    une session n'est réutilisée que par un appelant qui renvoie le locataire au même endroit.
+    """
+    if metadata and metadata.get("payment_id"):
+        base = f"payment:{metadata['payment_id']}"
+    elif metadata and metadata.get("lease_id"):
+        base = f"lease:{metadata['lease_id']}"
+    else:
+        return None
+    digest = hashlib.sha256("\n".join((success_url, cancel_url, description)).encode()).hexdigest()[:16]
+    return f"{base}:{digest}"
+
+
+def _reuse_or_create(
+    db: Session,
+    reference: str,
+    stripe_amount: int,
+    currency: str,
+    create: Callable[[], Optional[CreatedCheckout]],
+) -> Optional[str]:
+    """
+    Sert la session enregistrée pour (reference, montant, devise) tant qu'il lui reste plus
+    de STRIPE_CHECKOUT_REFRESH_MARGIN_SECONDS, sinon en crée une et met la ligne à jour.
+    La ligne est écrite dans la transaction de l'appelant (commit à sa charge).
+    """
+    now = datetime.now(timezone.utc)
+    row = db.execute(
+        select(CheckoutSession).where(
+            CheckoutSession.reference == reference,
+            CheckoutSession.amount == stripe_amount,
+            CheckoutSession.currency == currency,
+        )
+    ).scalar_one_or_none()
+    margin = timedelta(seconds=settings.STRIPE_CHECKOUT_REFRESH_MARGIN_SECONDS)
+    if row is not None and _as_utc(row.expires_at) - now > margin:
+        checkout_stats.record("hits")
+        return row.url
+
+    checkout_stats.record("misses")
+    created = create()
+    if created is None:
+        checkout_stats.record("failures")
+        # Stripe indisponible : une session bientôt expirée vaut mieux que pas de lien
+        return row.url if row is not None and _as_utc(row.expires_at) > now else None
+
+    if row is not None:
+        checkout_stats.record("refreshes")
+        row.url = created.url
+        row.stripe_id = created.stripe_id
+        row.expires_at = created.expires_at
+        db.flush()
+        return created.url
+
+    try:
+        with db.begin_nested():
+            db.add(
+                CheckoutSession(
+                    reference=reference,
+                    amount=stripe_amount,
+                    currency=currency,
+                    stripe_id=created.stripe_id,
+                    url=created.url,
+                    expires_at=created.expires_at,
+                )
+            )
+    except IntegrityError:
+        # Une requête concurrente a enregistré sa session la première : la nôtre reste valable
+        pass
+    return created.url
+
+
 def create_checkout_session(
     amount: float,
     currency: str,
@@ -57,9 +267,12 @@ def create_checkout_session(
     success_url: str,
     cancel_url: str,
     metadata: Optional[Dict[str, Any]] = None,
+    db: Optional[Session] = None,
 ) -> Optional[str]:
     """
     Crée une session Stripe Checkout et retourne l'URL.
+    Avec `db`, une session encore valide pour le même paiement (ou bail), le même
+    montant et les mêmes URLs de retour est réutilisée (table checkout_sessions) au lieu d'en créer une nouvelle.
     Retourne None si Stripe n'est pas configuré ou en cas d'erreur.
     """
     if not settings.STRIPE_SECRET_KEY:
@@ -71,44 +284,13 @@ def create_checkout_session(
         print(f"[stripe] montant invalide pour checkout ({amount} {currency})")
         return None
 
-    try:
-        session = stripe.checkout.Session.create(
-            mode="payment",
-            line_items=[
-                {
-                    "price_data": {
-                        "currency": currency,
-                        "unit_amount": stripe_amount,
-                        "product_data": {"name": description},
-                    },
-                    "quantity": 1,
-                }
-            ],
-            success_url=success_url,
-            cancel_url=cancel_url,
-            client_reference_id=str(metadata.get("payment_id")) if metadata and metadata.get("payment_id") else None,
-            metadata=metadata or {},
-            automatic_tax={"enabled": False},
-        )
-        return session.url
-    except Exception as exc:
-        print(f"[stripe] checkout session error: {exc}")
-        # Fallback : Payment Link (sans success/cancel)
-        try:
-            pl = stripe.PaymentLink.create(
-                line_items=[
-                    {
-                        "price_data": {
-                            "currency": currency,
-                            "unit_amount": stripe_amount,
-                            "product_data": {"name": description},
-                        },
-                        "quantity": 1,
-                    }
-                ],
-                metadata=metadata or {},
-            )
-            return getattr(pl, "url", None)
-        except Exception as sub_exc:
-            print(f"[stripe] payment link error: {sub_exc}")
-            return None
+    currency = currency.lower()
+
+    def create() -> Optional[CreatedCheckout]:
+        return _create_checkout(stripe_amount, currency, description, success_url, cancel_url, metadata)
+
+    reference = _checkout_reference(metadata, description, success_url, cancel_url)
+    if db is None or reference is None:
+        created = create()
+        return created.url if created else None
+    return _reuse_or_create(db, reference, stripe_amount, currency, create)
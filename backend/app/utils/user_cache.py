@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from app.config import settings
+from app.models.user import User, UserRole
+
+try:  # dépendance optionnelle (USER_CACHE_BACKEND=redis)
+    import redis
+except ImportError:  # pragma: no cover
+    redis = None
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """
+    Identité minimale de l'utilisateur authentifié, suffisante pour les routes et /auth/me.
+    C'est le seul objet que les routes reçoivent des dépendances get_current_* (jamais le
+    modèle User) : une colonne ou relation absente (created_at, properties, tenant_profile…)
+    se recharge explicitement depuis la session.
+    """
+
+    id: int
+    email: str
+    first_name: str
+    last_name: str
+    phone: Optional[str]
+    role: UserRole
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            phone=user.phone,
+            role=UserRole(user.role),
+            is_active=bool(user.is_active),
+        )
+
+
+class InMemoryUserCache:
+    """LRU borné avec expiration (TTL), thread-safe, propre au processus."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl_seconds
+        self._items: "OrderedDict[str, tuple[float, CachedUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedUser]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, user = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return user
+
+    def set(self, key: str, user: CachedUser) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, user)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class RedisUserCache:
+    """Même interface, partagée entre processus via un serveur compatible Redis."""
+
+    prefix = "locatus:user:"
+
+    def __init__(self, url: str, ttl_seconds: float):
+        if redis is None:
+            raise RuntimeError("USER_CACHE_BACKEND=redis requiert le paquet `redis`")
+        self._client = redis.Redis.from_url(url)
+        self.ttl = max(1, int(ttl_seconds))
+
+    def get(self, key: str) -> Optional[CachedUser]:
+        raw = self._client.get(self.prefix + key)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        data["role"] = UserRole(data["role"])
+        return CachedUser(**data)
+
+    def set(self, key: str, user: CachedUser) -> None:
+        data = asdict(user)
+        data["role"] = user.role.value
+        self._client.setex(self.prefix + key, self.ttl, json.dumps(data))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(f"{self.prefix}*"):
+            self._client.delete(key)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_user_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if settings.USER_CACHE_BACKEND == "redis" and settings.USER_CACHE_REDIS_URL:
+                    _cache = RedisUserCache(settings.USER_CACHE_REDIS_URL, settings.USER_CACHE_TTL_SECONDS)
+                else:
+                    _cache = InMemoryUserCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+    return _cache
+
+
+def invalidate_user(*emails: Optional[str]) -> None:
+    """À appeler après toute modification d'un utilisateur (email, rôle, activation, suppression)."""
+    cache = get_user_cache()
+    for email in emails:
+        if email:
+            cache.delete(email)
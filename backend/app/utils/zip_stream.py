@@ -0,0 +1,21 @@
+class ZipChunkSink:
+    """
+    Flux non positionnable pour zipfile : accumule les octets écrits jusqu'au prochain drain().
+    zipfile bascule alors sur les descripteurs de données, ce qui permet d'émettre
+    une archive au fil de l'eau sans fichier temporaire.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
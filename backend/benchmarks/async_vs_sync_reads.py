@@ -0,0 +1,134 @@
+"""
+Compare le débit (requêtes/s) des lectures chaudes en mode sync (threadpool) et async (AsyncSession).
+
+Usage :
+    cd backend && python benchmarks/async_vs_sync_reads.py --payments 5000 --concurrency 64 --requests 2000
+Les deux modes tournent in-process (ASGI) sur la même base SQLite temporaire,
+ou sur --database-url (ex: postgresql://...) si fourni.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.api import notifications, payments, properties, reminders  # noqa: E402
+from app.database import Base, get_async_db, get_db, to_async_url  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.notification import Notification, NotificationType  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+
+PATHS = ["/api/payments/?limit=50", "/api/reminders/", "/api/notifications/", "/api/properties/?limit=50"]
+
+
+def seed(url: str, n_payments: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    owner = User(email="bench@example.com", hashed_password="x", first_name="B", last_name="O", role=UserRole.LANDLORD)
+    db.add(owner)
+    db.flush()
+    n_leases = max(1, n_payments // 12)
+    for i in range(n_leases):
+        user = User(email=f"t{i}@example.com", hashed_password="x", first_name="T", last_name=str(i))
+        prop = Property(
+            owner_id=owner.id, title=f"Bien {i}", address="rue", city="Paris",
+            property_type=PropertyType.APARTMENT, rent_amount=500, status=PropertyStatus.OCCUPIED,
+        )
+        db.add_all([user, prop])
+        db.flush()
+        tenant = Tenant(user_id=user.id)
+        db.add(tenant)
+        db.flush()
+        lease = Lease(property_id=prop.id, tenant_id=tenant.id, start_date=date(2024, 1, 1), rent_amount=500, status=LeaseStatus.ACTIVE)
+        db.add(lease)
+        db.flush()
+        db.add_all(
+            Payment(lease_id=lease.id, amount=500, due_date=date.today() + timedelta(days=30 * (m - 6)), status=PaymentStatus.PENDING)
+            for m in range(12)
+        )
+    db.add_all(Notification(user_id=owner.id, type=NotificationType.GENERAL, title="n", message="m") for _ in range(50))
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+def build_app(url: str, use_async: bool) -> FastAPI:
+    app = FastAPI()
+    for module in (payments, reminders, notifications):
+        app.include_router(module.async_router if use_async else module.router)
+    app.include_router(properties.async_router if use_async else properties.router, prefix="/api")
+    if use_async:
+        Session = async_sessionmaker(create_async_engine(to_async_url(url)), expire_on_commit=False)
+
+        async def override():
+            async with Session() as session:
+                yield session
+
+        app.dependency_overrides[get_async_db] = override
+    else:
+        kwargs = {"connect_args": {"check_same_thread": False}} if url.startswith("sqlite") else {"pool_size": 10, "max_overflow": 20}
+        Session = sessionmaker(bind=create_engine(url, **kwargs))
+
+        def override():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override
+    return app
+
+
+async def run(app: FastAPI, total: int, concurrency: int) -> float:
+    headers = {"Authorization": f"Bearer {create_access_token('bench@example.com')}"}
+    transport = httpx.ASGITransport(app=app)
+    counter = iter(range(total))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for i in counter:
+                response = await client.get(PATHS[i % len(PATHS)], headers=headers)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    parser.add_argument("--payments", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        if not args.database_url:
+            seed(url, args.payments)
+        for label, use_async in (("sync", False), ("async", True)):
+            rps = asyncio.run(run(build_app(url, use_async), args.requests, args.concurrency))
+            print(f"{label:>5}: {rps:8.1f} req/s ({args.requests} requêtes, concurrence {args.concurrency})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Latence de GET /api/dashboard/summary pour un bailleur avec beaucoup de biens.
+
+Usage :
+    cd backend && python benchmarks/dashboard_summary.py --properties 5000 --months 24 --requests 200
+Mesure p50/p95 sans cache (agrégats recalculés à chaque appel) puis avec le cache par bailleur.
+Objectif : p95 < 50 ms pour 5k biens. --database-url permet de viser PostgreSQL (tables recréées).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.api import dashboard  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.dashboard_service import summary_cache  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+
+
+def seed(url: str, n_properties: int, months: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    today = date.today()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"email": "bench@example.com", "hashed_password": "x", "first_name": "B",
+                                     "last_name": "O", "role": UserRole.LANDLORD}])
+        conn.execute(insert(User), [
+            {"email": f"t{i}@example.com", "hashed_password": "x", "first_name": "T", "last_name": str(i), "role": UserRole.TENANT}
+            for i in range(n_properties)
+        ])
+        conn.execute(insert(Tenant), [{"user_id": 2 + i} for i in range(n_properties)])
+        conn.execute(insert(Property), [
+            {"owner_id": 1, "title": f"Bien {i}", "address": "rue", "city": "Paris", "property_type": PropertyType.APARTMENT,
+             "rent_amount": 500, "status": PropertyStatus.OCCUPIED if i % 10 else PropertyStatus.AVAILABLE}
+            for i in range(n_properties)
+        ])
+        conn.execute(insert(Lease), [
+            {"property_id": 1 + i, "tenant_id": 1 + i, "start_date": today - timedelta(days=30 * months),
+             "rent_amount": 500, "status": LeaseStatus.ACTIVE}
+            for i in range(n_properties) if i % 10
+        ])
+        batch = []
+        for lease_id in range(1, n_properties - n_properties // 10 + 1):
+            for m in range(months):
+                due = today + timedelta(days=30 * (m - months + 2))
+                batch.append({"lease_id": lease_id, "amount": 500, "due_date": due,
+                              "status": PaymentStatus.PAID if due < today - timedelta(days=30) else PaymentStatus.PENDING})
+            if len(batch) >= 20000:
+                conn.execute(insert(Payment), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Payment), batch)
+    engine.dispose()
+
+
+def build_app(url: str) -> FastAPI:
+    app = FastAPI()
+    app.include_router(dashboard.router)
+    kwargs = {"connect_args": {"check_same_thread": False}} if url.startswith("sqlite") else {}
+    Session = sessionmaker(bind=create_engine(url, **kwargs))
+
+    def override():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override
+    return app
+
+
+async def measure(app: FastAPI, total: int, cached: bool) -> list:
+    headers = {"Authorization": f"Bearer {create_access_token('bench@example.com')}"}
+    samples = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(total):
+            if not cached:
+                summary_cache.invalidate()
+            start = time.perf_counter()
+            (await client.get("/api/dashboard/summary", headers=headers)).raise_for_status()
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _pct(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    parser.add_argument("--properties", type=int, default=5000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        seed(url, args.properties, args.months)
+        app = build_app(url)
+        for label, cached in (("sans cache", False), ("avec cache", True)):
+            samples = asyncio.run(measure(app, args.requests, cached))
+            print(f"{label:>10}: p50 {_pct(samples, 0.5):7.1f} ms  p95 {_pct(samples, 0.95):7.1f} ms  ({args.properties} biens)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Export du grand livre des paiements : débit et mémoire de pointe, CSV et XLSX.
+
+Usage :
+    cd backend && python benchmarks/ledger_export.py --leases 20000 --months 50
+Les paiements (leases x months lignes) sont insérés dans une base SQLite temporaire,
+puis chaque format est exporté en consommant le flux comme le ferait StreamingResponse.
+La mémoire de pointe (tracemalloc, passe séparée) doit rester stable quand --months augmente.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.ledger_export_service import LedgerFilters, stream_ledger  # noqa: E402
+
+
+def seed(engine, n_leases: int, months: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    start = date(2020, 1, 5)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"email": "bench@example.com", "hashed_password": "x", "first_name": "B",
+                                     "last_name": "O", "role": UserRole.LANDLORD}])
+        conn.execute(insert(User), [
+            {"email": f"t{i}@example.com", "hashed_password": "x", "first_name": "T", "last_name": str(i)}
+            for i in range(n_leases)
+        ])
+        conn.execute(insert(Tenant), [{"user_id": 2 + i} for i in range(n_leases)])
+        conn.execute(insert(Property), [
+            {"owner_id": 1, "title": f"Bien {i}", "address": f"{i} rue de la Paix", "city": "Paris",
+             "property_type": PropertyType.APARTMENT, "rent_amount": 500, "status": PropertyStatus.OCCUPIED}
+            for i in range(n_leases)
+        ])
+        conn.execute(insert(Lease), [
+            {"property_id": 1 + i, "tenant_id": 1 + i, "start_date": start, "rent_amount": 500,
+             "status": LeaseStatus.ACTIVE}
+            for i in range(n_leases)
+        ])
+        for m in range(months):
+            conn.execute(insert(Payment), [
+                {"lease_id": 1 + i, "amount": 500 + i % 100, "due_date": start + timedelta(days=31 * m),
+                 "status": PaymentStatus.PAID, "payment_date": start + timedelta(days=31 * m)}
+                for i in range(n_leases)
+            ])
+
+
+def consume(engine, fmt: str) -> int:
+    size = 0
+    with Session(bind=engine) as db:
+        for chunk in stream_ledger(db, 1, LedgerFilters(), fmt):
+            size += len(chunk)
+    return size
+
+
+def export(engine, fmt: str, rows: int) -> None:
+    started = time.perf_counter()
+    size = consume(engine, fmt)
+    elapsed = time.perf_counter() - started
+    # Seconde passe sous tracemalloc (qui ralentit fortement) pour la seule mémoire de pointe
+    tracemalloc.start()
+    consume(engine, fmt)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{fmt:>4} : {rows} lignes en {elapsed:6.1f} s ({rows / elapsed:8.0f} lignes/s), "
+          f"{size / 1e6:7.1f} Mo émis, pic mémoire {peak / 1e6:6.1f} Mo")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leases", type=int, default=20000)
+    parser.add_argument("--months", type=int, default=50)
+    parser.add_argument("--formats", default="csv,xlsx")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        seed(engine, args.leases, args.months)
+        for fmt in args.formats.split(","):
+            export(engine, fmt, args.leases * args.months)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Rafale de logins : débit de /api/auth/login et latence des autres routes pendant la rafale.
+
+Usage :
+    cd backend && python benchmarks/login_storm.py --logins 200 --concurrency 32 --rounds 12
+Mesure la latence (p50/p95) de GET /api/properties/ au repos puis pendant la rafale.
+--inline reproduit l'ancien comportement (bcrypt sur les threads de requête) pour comparaison.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from starlette.concurrency import run_in_threadpool  # noqa: E402
+
+from app.api import auth, properties  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.utils import security  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+
+PASSWORD = "motdepasse123"
+
+
+def seed(url: str, n_users: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    hashed = security.get_password_hash(PASSWORD)
+    db.add_all(
+        User(email=f"u{i}@example.com", hashed_password=hashed, first_name="U", last_name=str(i), role=UserRole.LANDLORD)
+        for i in range(n_users)
+    )
+    db.flush()
+    db.add_all(
+        Property(
+            owner_id=1, title=f"Bien {i}", address="rue", city="Paris",
+            property_type=PropertyType.APARTMENT, rent_amount=500, status=PropertyStatus.AVAILABLE,
+        )
+        for i in range(50)
+    )
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+def build_app(url: str) -> FastAPI:
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.include_router(properties.router, prefix="/api")
+    Session = sessionmaker(bind=create_engine(url, connect_args={"check_same_thread": False}))
+
+    def override():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override
+    return app
+
+
+def _percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list:
+    headers = {"Authorization": f"Bearer {create_access_token('u0@example.com')}"}
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        (await client.get("/api/properties/?limit=20", headers=headers)).raise_for_status()
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def run(app: FastAPI, n_users: int, logins: int, concurrency: int, duration: float) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        stop = asyncio.Event()
+        idle_task = asyncio.create_task(probe(client, stop, 0.01))
+        await asyncio.sleep(duration)
+        stop.set()
+        idle = await idle_task
+
+        counter = iter(range(logins))
+
+        async def login_worker():
+            for i in counter:
+                response = await client.post(
+                    "/api/auth/login", data={"username": f"u{i % n_users}@example.com", "password": PASSWORD}
+                )
+                response.raise_for_status()
+
+        stop = asyncio.Event()
+        storm_task = asyncio.create_task(probe(client, stop, 0.01))
+        start = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        storm = await storm_task
+
+    print(f"logins : {logins / elapsed:8.1f} /s ({logins} logins, concurrence {concurrency}, coût {settings.BCRYPT_ROUNDS})")
+    for label, samples in (("repos", idle), ("rafale", storm)):
+        print(
+            f"GET /api/properties/ {label:>6}: p50 {_percentile(samples, 0.5):7.1f} ms  "
+            f"p95 {_percentile(samples, 0.95):7.1f} ms  moyenne {statistics.mean(samples) * 1000:7.1f} ms  (n={len(samples)})"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=settings.BCRYPT_ROUNDS)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    parser.add_argument("--inline", action="store_true", help="bcrypt sur les threads de requête (ancien comportement)")
+    args = parser.parse_args()
+
+    settings.BCRYPT_ROUNDS = args.rounds
+    security.pwd_context = security._crypt_context(args.rounds)
+    if args.inline:
+        async def verify_inline(plain, hashed):
+            return await run_in_threadpool(security.pwd_context.verify_and_update, plain, hashed)
+
+        auth.verify_password_async = verify_inline
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        seed(url, args.users)
+        try:
+            asyncio.run(run(build_app(url), args.users, args.logins, args.concurrency, args.idle_seconds))
+        finally:
+            security.shutdown_password_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Latence d'une page profonde : pagination par offset vs par curseur.
+
+Usage :
+    cd backend && python benchmarks/pagination_depth.py --properties 60000 --leases 5000 --limit 50 --pages 1,10,100,1000
+Pour chaque page demandée, le curseur correspondant est calculé directement en base
+(dernière ligne de la page précédente), puis on mesure la médiane de --repeat appels
+en mode offset (?skip=) et en mode curseur (?cursor=).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.api import payments, properties  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.utils.pagination import encode_cursor  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+
+MONTHS = 12
+
+
+def seed(url: str, n_properties: int, n_leases: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    today = date.today()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"email": "bench@example.com", "hashed_password": "x", "first_name": "B",
+                                     "last_name": "O", "role": UserRole.LANDLORD}])
+        conn.execute(insert(User), [
+            {"email": f"t{i}@example.com", "hashed_password": "x", "first_name": "T", "last_name": str(i)}
+            for i in range(n_leases)
+        ])
+        conn.execute(insert(Tenant), [{"user_id": 2 + i} for i in range(n_leases)])
+        conn.execute(insert(Property), [
+            {"owner_id": 1, "title": f"Bien {i}", "address": "rue", "city": "Paris",
+             "property_type": PropertyType.APARTMENT, "rent_amount": 500, "status": PropertyStatus.OCCUPIED}
+            for i in range(max(n_properties, n_leases))
+        ])
+        conn.execute(insert(Lease), [
+            {"property_id": 1 + i, "tenant_id": 1 + i, "start_date": today, "rent_amount": 500,
+             "status": LeaseStatus.ACTIVE}
+            for i in range(n_leases)
+        ])
+        conn.execute(insert(Payment), [
+            {"lease_id": 1 + i, "amount": 500, "due_date": today + timedelta(days=30 * m),
+             "status": PaymentStatus.PENDING}
+            for i in range(n_leases)
+            for m in range(MONTHS)
+        ])
+    engine.dispose()
+
+
+def cursor_for(url: str, order, stmt, offset: int) -> str:
+    """Curseur équivalent à ?skip=offset : clé de la ligne qui précède la page."""
+    if offset == 0:
+        return ""
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        row = conn.execute(stmt.order_by(*order.order_by()).offset(offset - 1).limit(1)).one()
+    engine.dispose()
+    return encode_cursor(tuple(row))
+
+
+def build_app(url: str) -> FastAPI:
+    app = FastAPI()
+    app.include_router(payments.router)
+    app.include_router(properties.router, prefix="/api")
+    Session = sessionmaker(bind=create_engine(url, connect_args={"check_same_thread": False}))
+
+    def override():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override
+    return app
+
+
+async def timed(client, path: str, params: dict, repeat: int) -> float:
+    headers = {"Authorization": f"Bearer {create_access_token('bench@example.com')}"}
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        (await client.get(path, params=params, headers=headers)).raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+async def run(url: str, pages, limit: int, repeat: int) -> None:
+    targets = [
+        (
+            "/api/properties/",
+            properties.PROPERTIES_ORDER,
+            select(Property.id).where(Property.status != PropertyStatus.OFFLINE),
+        ),
+        (
+            "/api/payments/",
+            payments.PAYMENTS_ORDER,
+            select(Payment.due_date, Payment.id).join(Lease).join(Property).where(Property.owner_id == 1),
+        ),
+    ]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=build_app(url)), base_url="http://bench") as client:
+        for path, order, stmt in targets:
+            print(path)
+            for page in pages:
+                offset = (page - 1) * limit
+                by_offset = await timed(client, path, {"skip": offset, "limit": limit}, repeat)
+                cursor = cursor_for(url, order, stmt, offset)
+                by_cursor = await timed(client, path, {"cursor": cursor, "limit": limit}, repeat)
+                print(f"  page {page:>5}: offset {by_offset:7.1f} ms   curseur {by_cursor:7.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=60000)
+    parser.add_argument("--leases", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--pages", default="1,10,100,1000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    pages = [int(p) for p in args.pages.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        seed(url, args.properties, args.leases)
+        asyncio.run(run(url, pages, args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
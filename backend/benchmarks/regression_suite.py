@@ -0,0 +1,291 @@
+"""
+Suite de non-régression des performances : routes chaudes et tâches planifiées sur un gros jeu synthétique.
+
+Usage :
+    cd backend && python benchmarks/regression_suite.py                    # compare à benchmarks/baselines.json
+    cd backend && python benchmarks/regression_suite.py --update-baseline  # enregistre la référence
+Le jeu de données (synthetic_data, graine fixe) est écrit une fois dans une base SQLite temporaire.
+Les routes passent par l'application complète (app.main, in-process via ASGI) : p50/p95/p99 et
+nombre de requêtes SQL par appel. Chaque tâche (génération des échéances, relances planifiées,
+relances Stripe) tourne sur une copie fraîche de la base, emails et Stripe remplacés par des
+doublures. Code de sortie 1 si un p50/p95 (p99 avec --gate-p99) dépasse la référence de plus de
+--tolerance (et de plus de --min-delta-ms), ou si un nombre de requêtes augmente.
+"""
+import argparse
+import asyncio
+import functools
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import synthetic_data  # noqa: E402
+from app import main as app_main  # noqa: E402
+from app.database import get_db  # noqa: E402
+from app.services import scheduled_reminder_service  # noqa: E402
+from app.services.email_dispatch_service import dispatch_emails  # noqa: E402
+from app.services.payment_generation_service import generate_monthly_payments  # noqa: E402
+from app.services.scheduled_reminder_service import run_scheduled  # noqa: E402
+from app.utils.security import create_access_token, shutdown_password_pool  # noqa: E402
+from app.utils.user_cache import get_user_cache  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+LANDLORD_EMAIL = "landlord1@synthetic.locatus.com"
+
+ENDPOINTS = {
+    "list_payments": "/api/payments/",
+    "get_payment_reminders": "/api/reminders/",
+    "get_lease_expiration_reminders": "/api/reminders/leases",
+    "get_tenants": "/api/tenants/",
+    "get_properties": "/api/properties/",
+    "list_notifications": "/api/notifications/",
+}
+JOBS = ("generate_monthly_payments", "run_scheduled", "send_pending_reminders")
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+# p99 sur quelques centaines d'appels dépend d'un ou deux échantillons : mesuré, contrôlé sur demande
+GATED_METRICS = ("p50_ms", "p95_ms")
+
+
+class QueryCounter:
+    """Compte les instructions SQL envoyées par un moteur."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_):
+        self.count += 1
+
+
+class _NullSender:
+    """EmailSender sans réseau : chaque envoi réussit."""
+
+    def send(self, to_email, subject, content, html_content=None):
+        return True, None
+
+    def close(self):
+        pass
+
+
+def _engine(path: Path):
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+
+def _pct(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+def _summary(samples, queries) -> dict:
+    return {
+        "p50_ms": round(_pct(samples, 0.5), 2),
+        "p95_ms": round(_pct(samples, 0.95), 2),
+        "p99_ms": round(_pct(samples, 0.99), 2),
+        "queries": max(queries),
+    }
+
+
+def seed(path: Path, config: synthetic_data.SyntheticConfig) -> None:
+    engine = _engine(path)
+    start = time.perf_counter()
+    counts = synthetic_data.generate(engine, config)
+    print(f"jeu de données : {synthetic_data.describe(counts, time.perf_counter() - start)}")
+    engine.dispose()
+
+
+async def _measure_endpoints(requests: int, warmup: int, counter: QueryCounter) -> dict:
+    headers = {"Authorization": f"Bearer {create_access_token(LANDLORD_EMAIL)}"}
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app_main.app), base_url="http://bench") as client:
+        for name, path in ENDPOINTS.items():
+            for _ in range(warmup):
+                (await client.get(path, headers=headers)).raise_for_status()
+            gc.collect()
+            samples, queries = [], []
+            for _ in range(requests):
+                counter.count = 0
+                start = time.perf_counter()
+                (await client.get(path, headers=headers)).raise_for_status()
+                samples.append(time.perf_counter() - start)
+                queries.append(counter.count)
+            results[name] = _summary(samples, queries)
+    return results
+
+
+def measure_endpoints(path: Path, requests: int, warmup: int) -> dict:
+    engine = _engine(path)
+    counter = QueryCounter(engine)
+    Session = sessionmaker(bind=engine)
+
+    def override():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app_main.app.dependency_overrides[get_db] = override
+    get_user_cache().clear()
+    try:
+        return asyncio.run(_measure_endpoints(requests, warmup, counter))
+    finally:
+        app_main.app.dependency_overrides.pop(get_db, None)
+        get_user_cache().clear()
+        engine.dispose()
+
+
+@contextmanager
+def _offline_jobs():
+    # Ni SMTP/SendGrid ni Stripe : seul le travail applicatif et SQL est mesuré
+    null_dispatch = functools.partial(dispatch_emails, sender_factory=lambda limiters: _NullSender())
+    with mock.patch.object(scheduled_reminder_service, "dispatch_emails", null_dispatch), \
+            mock.patch.object(app_main, "send_email", lambda *a, **kw: (True, None)), \
+            mock.patch.object(app_main, "create_checkout_session", lambda **kw: "https://checkout.invalid/bench"):
+        yield
+
+
+def _run_job(name: str, Session, today: date) -> None:
+    if name == "send_pending_reminders":
+        with mock.patch.object(app_main, "SessionLocal", Session):
+            app_main.send_pending_reminders()
+        return
+    db = Session()
+    try:
+        if name == "generate_monthly_payments":
+            generate_monthly_payments(db, today=today)
+        else:
+            run_scheduled(db, today=today)
+        db.commit()
+    finally:
+        db.close()
+
+
+def measure_jobs(template: Path, workdir: Path, runs: int, today: date) -> dict:
+    # Jour d'exécution fixe pour les tâches datées : le 1er du mois suivant (échéances du 1er à J0,
+    # déjà présentes dans le jeu mais ni relancées ni réglées) quel que soit le jour du lancement
+    job_day = (today.replace(day=28) + timedelta(days=4)).replace(day=1)
+    results = {}
+    with _offline_jobs():
+        for name in JOBS:
+            gc.collect()
+            samples, queries = [], []
+            for _ in range(runs):
+                # Copie fraîche : chaque exécution part du même état (rien n'est encore généré ni relancé)
+                path = workdir / f"{name}.db"
+                shutil.copyfile(template, path)
+                engine = _engine(path)
+                counter = QueryCounter(engine)
+                start = time.perf_counter()
+                _run_job(name, sessionmaker(bind=engine), job_day)
+                samples.append(time.perf_counter() - start)
+                queries.append(counter.count)
+                engine.dispose()
+            results[name] = _summary(samples, queries)
+    return results
+
+
+def compare(baseline: dict, current: dict, tolerance: float, min_delta_ms: float, metrics=GATED_METRICS) -> list:
+    """Retourne les régressions (lignes lisibles) de `current` par rapport à `baseline`."""
+    regressions = []
+    for section in ("endpoints", "jobs"):
+        for name, reference in baseline.get(section, {}).items():
+            measured = current[section].get(name)
+            if measured is None:
+                continue
+            for metric in metrics:
+                limit = max(reference[metric] * (1 + tolerance), reference[metric] + min_delta_ms)
+                if measured[metric] > limit:
+                    regressions.append(f"{name} {metric} : {measured[metric]:.1f} ms > {limit:.1f} ms "
+                                       f"(référence {reference[metric]:.1f} ms)")
+            if measured["queries"] > reference["queries"]:
+                regressions.append(f"{name} requêtes : {measured['queries']} > {reference['queries']}")
+    return regressions
+
+
+def _print_results(current: dict, baseline: dict) -> None:
+    for section in ("endpoints", "jobs"):
+        for name, values in current[section].items():
+            reference = baseline.get(section, {}).get(name, {})
+            ref = f"  (réf. p95 {reference['p95_ms']:.1f} ms, {reference['queries']} req.)" if reference else ""
+            print(f"{name:>32}: p50 {values['p50_ms']:8.1f} ms  p95 {values['p95_ms']:8.1f} ms  "
+                  f"p99 {values['p99_ms']:8.1f} ms  {values['queries']:5d} requêtes{ref}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--landlords", type=int, default=10)
+    parser.add_argument("--properties-per-landlord", type=int, default=200)
+    parser.add_argument("--history-depth", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="appels mesurés par route")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--job-runs", type=int, default=5, help="exécutions mesurées par tâche")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="dérive de latence admise (0.5 = +50 %%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="écart absolu ignoré (bruit de mesure)")
+    parser.add_argument("--gate-p99", action="store_true", help="contrôle aussi le p99")
+    args = parser.parse_args()
+
+    # Jeu relatif à aujourd'hui : send_pending_reminders raisonne sur l'horloge réelle
+    today = date.today()
+    config = synthetic_data.SyntheticConfig(
+        landlords=args.landlords, properties_per_landlord=args.properties_per_landlord,
+        history_depth=args.history_depth, seed=args.seed, today=today,
+    )
+    dataset = {"landlords": args.landlords, "properties_per_landlord": args.properties_per_landlord,
+               "history_depth": args.history_depth, "seed": args.seed}
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    elif not args.update_baseline:
+        sys.exit(f"Référence absente ({args.baseline}) : lancer d'abord avec --update-baseline")
+    if baseline and not args.update_baseline and baseline.get("dataset") != dataset:
+        sys.exit(f"Référence mesurée sur un autre jeu de données : {baseline.get('dataset')}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = Path(tmp) / "template.db"
+        seed(template, config)
+        endpoints_db = Path(tmp) / "endpoints.db"
+        shutil.copyfile(template, endpoints_db)
+        current = {
+            "dataset": dataset,
+            "endpoints": measure_endpoints(endpoints_db, args.requests, args.warmup),
+            "jobs": measure_jobs(template, Path(tmp), args.job_runs, today),
+        }
+    shutdown_password_pool()
+
+    _print_results(current, {} if args.update_baseline else baseline)
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"référence enregistrée dans {args.baseline}")
+        return
+
+    metrics = LATENCY_METRICS if args.gate_p99 else GATED_METRICS
+    regressions = compare(baseline, current, args.tolerance, args.min_delta_ms, metrics)
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) :")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\naucune régression")
+
+
+if __name__ == "__main__":
+    main()
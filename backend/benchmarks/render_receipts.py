@@ -0,0 +1,72 @@
+"""
+Rendu de quittances en masse : pool de processus (tous les cœurs) vs rendu séquentiel.
+
+Usage :
+    cd backend && python benchmarks/render_receipts.py --receipts 10000 --sequential-sample 500
+Mesure le débit du rendu à froid via DocumentRenderer.ensure_many (un processus par cœur,
+documents envoyés par lots), puis une seconde passe sur les mêmes documents (cache par
+contenu : simple test d'existence).
+Le rendu séquentiel (ancien comportement, dans le thread de requête) est mesuré sur un
+échantillon et extrapolé.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.services.document_service import DocumentRenderer, receipt_spec  # noqa: E402
+from app.utils.receipt import generate_payment_receipt  # noqa: E402
+
+
+def specs(n: int):
+    issued = date.today()
+    return [receipt_spec(i, 500 + i % 300, f"Locataire {i}", f"Bien {i % 97}", issued) for i in range(1, n + 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--receipts", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--sequential-sample", type=int, default=500)
+    args = parser.parse_args()
+    documents = specs(args.receipts)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for spec in documents[: args.sequential_sample]:
+            generate_payment_receipt(spec.payment_id, spec.amount, spec.tenant_name, spec.property_title,
+                                     output_dir=os.path.join(tmp, "seq"), issued_on=spec.issued_on)
+        per_doc = (time.perf_counter() - start) / max(args.sequential_sample, 1)
+        print(f"séquentiel       : {per_doc * 1000:6.2f} ms/doc -> ~{per_doc * args.receipts:6.1f} s pour {args.receipts}")
+
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            renderer = DocumentRenderer(os.path.join(tmp, "pool"), executor=pool)
+            start = time.perf_counter()
+            wait([renderer.submit(spec) for spec in documents[: args.sequential_sample]])
+            unit = (time.perf_counter() - start) / max(args.sequential_sample, 1)
+            print(f"pool, 1 tâche/doc: {unit * 1000:6.2f} ms/doc (rendu à la demande, coût IPC compris)")
+
+            start = time.perf_counter()
+            for _ in renderer.ensure_many(documents):
+                pass
+            cold = time.perf_counter() - start
+            print(f"pool ({args.workers:>2} proc.)  : {cold:6.1f} s pour {args.receipts}  ({args.receipts / cold:7.0f} docs/s, par lots)")
+
+            start = time.perf_counter()
+            for _ in renderer.ensure_many(documents):
+                pass
+            warm = time.perf_counter() - start
+            print(f"seconde passe    : {warm:6.2f} s pour {args.receipts}  (cache par contenu)")
+            print(f"stats            : {renderer.stats()}")
+
+
+if __name__ == "__main__":
+    main()
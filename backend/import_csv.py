@@ -0,0 +1,51 @@
+"""
+Import CSV en masse de biens, locataires et baux pour un bailleur (même traitement que POST /api/imports).
+Usage :
+    cd backend && python import_csv.py --owner bailleur@locatus.com agence.csv
+Relancer la même commande sur le même fichier reprend un import interrompu.
+Colonnes : title, property_type, address, city, rent_amount (requises), postal_code, description,
+surface_area, rooms, bedrooms, bathrooms, charges, deposit, tenant_email, tenant_first_name,
+tenant_last_name, tenant_phone, tenant_password, lease_start_date, lease_end_date,
+lease_rent_amount, lease_charges, lease_deposit_paid, lease_payment_day.
+"""
+import argparse
+import os
+import sys
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.user import User, UserRole
+from app.services.import_service import ImportFormatError, run_import
+from app.utils.security import shutdown_password_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--owner", required=True, help="email du bailleur propriétaire des biens importés")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        owner = db.execute(select(User).where(User.email == args.owner)).scalar_one_or_none()
+        if owner is None or owner.role not in (UserRole.LANDLORD, UserRole.ADMIN):
+            sys.exit(f"Bailleur introuvable : {args.owner}")
+        with open(args.path, "rb") as stream:
+            job = run_import(db, owner.id, stream, filename=os.path.basename(args.path), batch_size=args.batch_size)
+        print(f"Import {job.id} ({job.status.value}) : {job.rows_processed} lignes lues, "
+              f"{job.rows_imported} importées, {job.rows_failed} en erreur")
+        for error in job.errors or []:
+            print(f"  ligne {error['row']} : {error['error']}")
+        if job.rows_failed > len(job.errors or []):
+            print(f"  ... {job.rows_failed - len(job.errors or [])} autres erreurs non détaillées")
+    except ImportFormatError as exc:
+        sys.exit(str(exc))
+    finally:
+        db.close()
+        shutdown_password_pool()
+
+
+if __name__ == "__main__":
+    main()
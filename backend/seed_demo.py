@@ -3,7 +3,15 @@ Script de seed de données démo.
 Usage :
     cd backend && python seed_demo.py
 Le script ne fait rien si des utilisateurs existent déjà (pour éviter les doublons).
+
+Jeu de données synthétique à l'échelle de la production (insertion en masse, déterministe) :
+    cd backend && python seed_demo.py --synthetic --landlords 100 --properties-per-landlord 500 \
+        --history-depth 3 --status-mix paid=0.9,late=0.05,partial=0.02,pending=0.03 --seed 42 --today 2026-10-01
+Comptes : landlord{n}@synthetic.locatus.com / motdepasse123, tenant{n}@synthetic.locatus.com / locatus123.
+--reset supprime et recrée toutes les tables avant la génération.
 """
+import argparse
+import time
 from datetime import date, timedelta
 
 from app.database import SessionLocal, Base, engine
@@ -20,9 +28,10 @@ from app.models.maintenance import (
 )
 from app.models.notification import Notification, NotificationType
 from app.utils.security import get_password_hash
+import synthetic_data
 
 
-def main():
+def seed_demo():
     # S'assure que les tables existent (utile pour SQLite en démo)
     Base.metadata.create_all(bind=engine)
     db = SessionLocal()
@@ -197,5 +206,64 @@ def main():
         db.close()
 
 
+def seed_synthetic(args):
+    defaults = synthetic_data.SyntheticConfig()
+    config = synthetic_data.SyntheticConfig(
+        landlords=args.landlords,
+        properties_per_landlord=args.properties_per_landlord,
+        tenants=args.tenants,
+        occupancy=args.occupancy,
+        history_depth=args.history_depth,
+        lease_months=args.lease_months,
+        status_mix=synthetic_data.parse_status_mix(args.status_mix) if args.status_mix else defaults.status_mix,
+        notifications_per_landlord=args.notifications_per_landlord,
+        notifications_per_tenant=args.notifications_per_tenant,
+        maintenance_per_property=args.maintenance_per_property,
+        reminder_days=args.reminder_days,
+        seed=args.seed,
+        today=date.fromisoformat(args.today) if args.today else defaults.today,
+        batch_size=args.batch_size,
+    )
+    if args.reset:
+        synthetic_data.reset(engine)
+    start = time.perf_counter()
+
+    def progress(counts):
+        print(f"  {sum(counts.values())} lignes écrites ({time.perf_counter() - start:.1f} s)", end="\r", flush=True)
+
+    try:
+        counts = synthetic_data.generate(engine, config, progress=progress)
+    except ValueError as exc:
+        print(f"Seed ignoré : {exc}.")
+        return
+    print()
+    print(f"Seed synthétique terminé : {synthetic_data.describe(counts, time.perf_counter() - start)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", action="store_true", help="jeu de données synthétique paramétrable")
+    parser.add_argument("--reset", action="store_true", help="supprime et recrée les tables avant la génération")
+    parser.add_argument("--landlords", type=int, default=10)
+    parser.add_argument("--properties-per-landlord", type=int, default=100)
+    parser.add_argument("--tenants", type=int, default=None, help="par défaut : un locataire par bail")
+    parser.add_argument("--occupancy", type=float, default=0.85)
+    parser.add_argument("--history-depth", type=int, default=2, help="baux terminés par bien")
+    parser.add_argument("--lease-months", type=int, default=12)
+    parser.add_argument("--status-mix", default=None, help="ex. paid=0.9,late=0.05,partial=0.02,pending=0.03")
+    parser.add_argument("--notifications-per-landlord", type=int, default=50)
+    parser.add_argument("--notifications-per-tenant", type=int, default=5)
+    parser.add_argument("--maintenance-per-property", type=float, default=0.5)
+    parser.add_argument("--reminder-days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--today", default=None, help="date de référence YYYY-MM-DD (fixe le jeu produit)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    if args.synthetic:
+        seed_synthetic(args)
+    else:
+        seed_demo()
+
+
 if __name__ == "__main__":
     main()
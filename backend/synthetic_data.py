@@ -0,0 +1,435 @@
+"""
+Générateur de jeux de données synthétiques à l'échelle de la production (voir seed_demo.py --synthetic).
+
+Toutes les lignes sont produites en Python avec des ids explicites (les clés étrangères sont
+calculées sans aller-retour), puis écrites par INSERT multi-lignes en lots, tables parentes
+d'abord. Le résultat ne dépend que de la configuration (graine et date de référence comprises).
+Les hash de mots de passe sont calculés une seule fois et partagés par tous les comptes.
+"""
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.engine import Engine
+
+from app.database import Base
+from app.models.lease import Lease, LeaseStatus
+from app.models.maintenance import MaintenancePriority, MaintenanceRequest, MaintenanceStatus, MaintenanceType
+from app.models.notification import Notification, NotificationType
+from app.models.payment import Payment, PaymentMethod, PaymentStatus
+from app.models.property import Property, PropertyStatus, PropertyType
+from app.models.reminder_history import ReminderHistory
+from app.models.tenant import Tenant
+from app.models.user import User, UserRole
+from app.utils.security import get_password_hash
+
+LANDLORD_PASSWORD = "motdepasse123"
+TENANT_PASSWORD = "locatus123"
+EMAIL_DOMAIN = "synthetic.locatus.com"
+
+# Ordre d'écriture : une table n'est vidée qu'après celles qu'elle référence
+TABLES = [User, Tenant, Property, Lease, Payment, MaintenanceRequest, ReminderHistory, Notification]
+
+CITIES = ["Paris", "Lyon", "Marseille", "Toulouse", "Nice", "Nantes", "Lille", "Bordeaux", "Rennes", "Dakar", "Abidjan"]
+FIRST_NAMES = ["Marie", "Pierre", "Sophie", "Jean", "Awa", "Moussa", "Fatou", "Luc", "Claire", "Ibrahima", "Léa", "Hugo"]
+LAST_NAMES = ["Martin", "Bernard", "Dupont", "Diop", "Ndiaye", "Petit", "Durand", "Leroy", "Moreau", "Traoré", "Fall"]
+NOTIFICATION_TITLES = {
+    NotificationType.PAYMENT_CONFIRMATION: "Paiement reçu",
+    NotificationType.PAYMENT_REMINDER: "Rappel de paiement",
+    NotificationType.PAYMENT_LATE: "Paiement en retard",
+    NotificationType.LEASE_EXPIRING: "Bail bientôt échu",
+    NotificationType.MAINTENANCE_UPDATE: "Demande de maintenance",
+    NotificationType.GENERAL: "Information",
+}
+# Étapes de relance et leur décalage (jours avant l'échéance), comme scheduled_reminder_service
+REMINDER_STEPS = {"J-2": 2, "J-1": 1, "J0": 0, "J+1": -1}
+# Membres des énumérations, listés une fois (tirés au sort pour chaque ligne)
+PAYMENT_METHODS = list(PaymentMethod)
+PROPERTY_TYPES = list(PropertyType)
+MAINTENANCE_TYPES = list(MaintenanceType)
+MAINTENANCE_STATUSES = list(MaintenanceStatus)
+MAINTENANCE_PRIORITIES = list(MaintenancePriority)
+NOTIFICATION_TYPES = list(NotificationType)
+
+
+def _default_status_mix() -> Dict[PaymentStatus, float]:
+    return {PaymentStatus.PAID: 0.9, PaymentStatus.LATE: 0.05, PaymentStatus.PARTIAL: 0.02, PaymentStatus.PENDING: 0.03}
+
+
+@dataclass
+class SyntheticConfig:
+    landlords: int = 10
+    properties_per_landlord: int = 100
+    tenants: Optional[int] = None  # par défaut : un locataire par bail généré
+    occupancy: float = 0.85  # part des biens avec un bail actif
+    history_depth: int = 2  # baux terminés par bien, avant le bail en cours
+    lease_months: int = 12  # durée des baux terminés
+    status_mix: Dict[PaymentStatus, float] = field(default_factory=_default_status_mix)  # échéances passées
+    notifications_per_landlord: int = 50
+    notifications_per_tenant: int = 5
+    read_ratio: float = 0.7
+    maintenance_per_property: float = 0.5
+    reminder_days: int = 90  # historique de relances sur les échéances des N derniers jours
+    seed: int = 42
+    today: date = field(default_factory=date.today)
+    batch_size: int = 5000
+
+    @property
+    def properties(self) -> int:
+        return self.landlords * self.properties_per_landlord
+
+    @property
+    def tenant_count(self) -> int:
+        if self.tenants:
+            return self.tenants
+        return max(1, math.ceil(self.properties * (self.history_depth + self.occupancy)))
+
+
+def parse_status_mix(value: str) -> Dict[PaymentStatus, float]:
+    """'paid=0.9,late=0.05,partial=0.02,pending=0.03' → poids par statut."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[PaymentStatus(name.strip())] = float(weight)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("status mix vide")
+    return mix
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    year = day.year + month // 12
+    return date(year, month % 12 + 1, min(day.day, 28))
+
+
+def _at(day: date, rng: random.Random) -> datetime:
+    return datetime.combine(day, dt_time(rng.randrange(8, 20), rng.randrange(60)), tzinfo=timezone.utc)
+
+
+class _BatchWriter:
+    """Tampons par table ; à chaque dépassement tout est écrit dans l'ordre des dépendances."""
+
+    def __init__(self, engine: Engine, batch_size: int, progress: Optional[Callable[[Dict[str, int]], None]]):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.progress = progress
+        self.buffers: Dict[Any, List[Dict[str, Any]]] = {model: [] for model in TABLES}
+        self.counts: Dict[str, int] = {model.__tablename__: 0 for model in TABLES}
+        self.pending = 0
+
+    def add(self, model, row: Dict[str, Any]) -> None:
+        self.buffers[model].append(row)
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        with self.engine.begin() as conn:
+            for model in TABLES:
+                rows = self.buffers[model]
+                if rows:
+                    conn.execute(insert(model.__table__), rows)
+                    self.counts[model.__tablename__] += len(rows)
+                    self.buffers[model] = []
+        self.pending = 0
+        if self.progress:
+            self.progress(dict(self.counts))
+
+
+class SyntheticDataset:
+    def __init__(self, engine: Engine, config: SyntheticConfig, progress=None):
+        self.engine = engine
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.writer = _BatchWriter(engine, max(1, config.batch_size), progress)
+        self.ids = {model: 0 for model in TABLES}
+        self.lease_counter = 0
+        self.reminder_keys = set()
+
+    def _next_id(self, model) -> int:
+        self.ids[model] += 1
+        return self.ids[model]
+
+    # --- utilisateurs -------------------------------------------------------------------------
+
+    def _users(self) -> None:
+        cfg, rng = self.config, self.rng
+        landlord_hash = get_password_hash(LANDLORD_PASSWORD)
+        tenant_hash = get_password_hash(TENANT_PASSWORD)
+        for i in range(1, cfg.landlords + 1):
+            self.writer.add(User, {
+                "id": self._next_id(User),
+                "email": f"landlord{i}@{EMAIL_DOMAIN}",
+                "hashed_password": landlord_hash,
+                "first_name": rng.choice(FIRST_NAMES),
+                "last_name": rng.choice(LAST_NAMES),
+                "phone": f"06{rng.randrange(10 ** 8):08d}",
+                "role": UserRole.LANDLORD,
+                "is_active": True,
+                "unread_notification_count": 0,
+            })
+        for i in range(1, cfg.tenant_count + 1):
+            user_id = self._next_id(User)
+            self.writer.add(User, {
+                "id": user_id,
+                "email": f"tenant{i}@{EMAIL_DOMAIN}",
+                "hashed_password": tenant_hash,
+                "first_name": rng.choice(FIRST_NAMES),
+                "last_name": rng.choice(LAST_NAMES),
+                "phone": f"07{rng.randrange(10 ** 8):08d}",
+                "role": UserRole.TENANT,
+                "is_active": True,
+                "unread_notification_count": 0,
+            })
+            self.writer.add(Tenant, {
+                "id": self._next_id(Tenant),
+                "user_id": user_id,
+                "employment_info": rng.choice(["CDI", "CDD", "Indépendant", "Étudiant"]),
+                "identity_documents": [],
+                "income_proof": [],
+                "references": [],
+            })
+
+    def _tenant_user_id(self, tenant_id: int) -> int:
+        return self.config.landlords + tenant_id
+
+    # --- biens, baux, échéances ---------------------------------------------------------------
+
+    def _properties(self) -> None:
+        cfg, rng = self.config, self.rng
+        for owner_id in range(1, cfg.landlords + 1):
+            for _ in range(cfg.properties_per_landlord):
+                occupied = rng.random() < cfg.occupancy
+                property_id = self._next_id(Property)
+                rent = float(rng.randrange(300, 2500, 10))
+                charges = float(rng.randrange(0, 200, 10))
+                if occupied:
+                    status = PropertyStatus.OCCUPIED
+                else:
+                    status = rng.choices(
+                        [PropertyStatus.AVAILABLE, PropertyStatus.MAINTENANCE, PropertyStatus.OFFLINE], [0.8, 0.1, 0.1]
+                    )[0]
+                city = rng.choice(CITIES)
+                self.writer.add(Property, {
+                    "id": property_id,
+                    "owner_id": owner_id,
+                    "title": f"{rng.choice(['T1', 'T2', 'T3', 'Studio', 'Villa', 'Local'])} {city} #{property_id}",
+                    "description": "Bien généré",
+                    "property_type": rng.choice(PROPERTY_TYPES),
+                    "address": f"{rng.randrange(1, 200)} rue {rng.choice(LAST_NAMES)}",
+                    "city": city,
+                    "postal_code": f"{rng.randrange(1000, 96000):05d}",
+                    "surface_area": float(rng.randrange(15, 180)),
+                    "rooms": rng.randrange(1, 7),
+                    "bedrooms": rng.randrange(0, 5),
+                    "bathrooms": rng.randrange(1, 3),
+                    "rent_amount": rent,
+                    "charges": charges,
+                    "deposit": rent * 2,
+                    "application_fee": 0.0,
+                    "status": status,
+                    "images": [],
+                    "amenities": [],
+                })
+                tenants = self._leases(property_id, rent, charges, occupied)
+                self._maintenance(property_id, tenants)
+
+    def _leases(self, property_id: int, rent: float, charges: float, occupied: bool) -> List[int]:
+        """Historique de baux d'un bien (du plus ancien au plus récent) ; retourne les locataires."""
+        cfg, rng = self.config, self.rng
+        current_start = _add_months(cfg.today.replace(day=1), -rng.randrange(1, 24))
+        periods = []
+        end = current_start
+        for _ in range(cfg.history_depth):
+            end = _add_months(end, -rng.randrange(0, 3))  # vacance entre deux baux
+            start = _add_months(end, -cfg.lease_months)
+            periods.append((start, end, LeaseStatus.TERMINATED))
+            end = start
+        periods.reverse()
+        if occupied:
+            periods.append((current_start, None, LeaseStatus.ACTIVE))
+
+        tenants = []
+        for start, end, status in periods:
+            tenant_id = self.lease_counter % cfg.tenant_count + 1
+            self.lease_counter += 1
+            lease_id = self._next_id(Lease)
+            payment_day = rng.choice([1, 1, 1, 5, 5, 10, 15])
+            dues = self._due_dates(start, end, payment_day)
+            # Le bail précède ses échéances dans les tampons (clés étrangères vérifiées à l'écriture)
+            self.writer.add(Lease, {
+                "id": lease_id,
+                "property_id": property_id,
+                "tenant_id": tenant_id,
+                "start_date": start,
+                "end_date": end if end else _add_months(start, 36),
+                "actual_end_date": end,
+                "rent_amount": rent,
+                "charges": charges,
+                "deposit_paid": rent * 2,
+                "payment_day": payment_day,
+                "status": status,
+                "next_due_date": _add_months(dues[-1], 1) if status == LeaseStatus.ACTIVE and dues else None,
+            })
+            self._payments(lease_id, tenant_id, dues, rent + charges)
+            tenants.append(tenant_id)
+        return tenants
+
+    def _due_dates(self, start: date, end: Optional[date], payment_day: int) -> List[date]:
+        """Échéances mensuelles du bail ; pour un bail en cours, jusqu'au mois prochain inclus."""
+        stop = end or _add_months(self.config.today.replace(day=1), 2)
+        dues = []
+        due = start.replace(day=min(payment_day, 28))
+        while due < stop:
+            dues.append(due)
+            due = _add_months(due, 1)
+        return dues
+
+    def _payments(self, lease_id: int, tenant_id: int, dues: List[date], amount: float) -> None:
+        cfg, rng = self.config, self.rng
+        statuses, weights = zip(*cfg.status_mix.items())
+        for due in dues:
+            payment_id = self._next_id(Payment)
+            status = PaymentStatus.PENDING if due > cfg.today else rng.choices(statuses, weights)[0]
+            paid_on = None
+            method = None
+            if status in (PaymentStatus.PAID, PaymentStatus.PARTIAL):
+                paid_on = min(due + timedelta(days=rng.randrange(-5, 10)), cfg.today)
+                method = rng.choice(PAYMENT_METHODS)
+            self.writer.add(Payment, {
+                "id": payment_id,
+                "lease_id": lease_id,
+                "amount": amount,
+                "due_date": due,
+                "payment_date": paid_on,
+                "status": status,
+                "payment_method": method,
+                "transaction_reference": f"syn-{payment_id}" if method == PaymentMethod.STRIPE else None,
+                "reminder_count": 0,
+            })
+            self._reminders(payment_id, lease_id, tenant_id, due, paid_on)
+
+    def _reminders(self, payment_id: int, lease_id: int, tenant_id: int, due: date, paid_on: Optional[date]) -> None:
+        cfg = self.config
+        if not cfg.reminder_days or due < cfg.today - timedelta(days=cfg.reminder_days):
+            return
+        for step, offset in REMINDER_STEPS.items():
+            sent = due - timedelta(days=offset)
+            if sent > cfg.today or (paid_on and paid_on < sent):
+                continue
+            key = f"reminder:{tenant_id}:{due.isoformat()}:{step}"
+            if key in self.reminder_keys:
+                continue
+            self.reminder_keys.add(key)
+            self.writer.add(ReminderHistory, {
+                "id": self._next_id(ReminderHistory),
+                "key": key,
+                "tenant_id": tenant_id,
+                "payment_id": payment_id,
+                "lease_id": lease_id,
+                "due_date": due,
+                "step": step,
+                "meta": {"channel": "email"},
+                "sent_at": _at(sent, self.rng),
+            })
+
+    def _maintenance(self, property_id: int, tenants: List[int]) -> None:
+        cfg, rng = self.config, self.rng
+        if not tenants:
+            return
+        count = int(cfg.maintenance_per_property) + (rng.random() < cfg.maintenance_per_property % 1)
+        for _ in range(count):
+            created = _at(cfg.today - timedelta(days=rng.randrange(0, 365)), rng)
+            status = rng.choices(MAINTENANCE_STATUSES, [0.2, 0.2, 0.5, 0.1])[0]
+            self.writer.add(MaintenanceRequest, {
+                "id": self._next_id(MaintenanceRequest),
+                "property_id": property_id,
+                "tenant_id": rng.choice(tenants),
+                "type": rng.choice(MAINTENANCE_TYPES),
+                "description": "Demande générée",
+                "status": status,
+                "priority": rng.choice(MAINTENANCE_PRIORITIES),
+                "images": [],
+                "created_at": created,
+                "resolved_at": created + timedelta(days=rng.randrange(1, 30)) if status == MaintenanceStatus.RESOLVED else None,
+            })
+
+    # --- notifications ------------------------------------------------------------------------
+
+    def _notifications(self) -> None:
+        cfg, rng = self.config, self.rng
+        users = [(user_id, cfg.notifications_per_landlord) for user_id in range(1, cfg.landlords + 1)]
+        users += [(self._tenant_user_id(t), cfg.notifications_per_tenant) for t in range(1, cfg.tenant_count + 1)]
+        for user_id, count in users:
+            for _ in range(count):
+                kind = rng.choice(NOTIFICATION_TYPES)
+                self.writer.add(Notification, {
+                    "id": self._next_id(Notification),
+                    "user_id": user_id,
+                    "type": kind,
+                    "title": NOTIFICATION_TITLES[kind],
+                    "message": "Notification générée",
+                    "is_read": rng.random() < cfg.read_ratio,
+                    "created_at": _at(cfg.today - timedelta(days=rng.randrange(0, 365)), rng),
+                })
+
+    # --- finalisation -------------------------------------------------------------------------
+
+    def _finalize(self) -> None:
+        users = User.__table__
+        notifications = Notification.__table__
+        unread = (
+            select(func.count())
+            .where(notifications.c.user_id == users.c.id, notifications.c.is_read.is_(False))
+            .scalar_subquery()
+        )
+        with self.engine.begin() as conn:
+            # Compteur normalement tenu par les hooks de session, contournés par les INSERT en masse
+            conn.execute(update(users).values(unread_notification_count=unread))
+            if conn.dialect.name == "postgresql":
+                # Ids explicites : réaligne les séquences pour les insertions suivantes de l'application
+                for model in TABLES:
+                    table = model.__tablename__
+                    conn.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+                    ))
+
+    def run(self) -> Dict[str, int]:
+        self._users()
+        self._properties()
+        self._notifications()
+        self.writer.flush()
+        self._finalize()
+        return dict(self.writer.counts)
+
+
+def generate(engine: Engine, config: SyntheticConfig, progress=None) -> Dict[str, int]:
+    """
+    Écrit le jeu de données dans une base vide (les ids sont attribués à partir de 1).
+    Retourne le nombre de lignes par table.
+    """
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(User.__table__)).scalar():
+            raise ValueError("La base contient déjà des utilisateurs : utiliser --reset ou une base vide")
+    return SyntheticDataset(engine, config, progress).run()
+
+
+def reset(engine: Engine) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def describe(counts: Dict[str, int], elapsed: float) -> str:
+    total = sum(counts.values())
+    details = ", ".join(f"{table} {count}" for table, count in counts.items())
+    return f"{total} lignes en {elapsed:.1f} s ({total / max(elapsed, 1e-9):.0f} lignes/s) : {details}"
+
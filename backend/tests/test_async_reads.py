@@ -0,0 +1,120 @@
+import asyncio
+import os
+from datetime import date, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.api import notifications, payments, properties, reminders  # noqa: E402
+from app.database import Base, get_async_db, get_db, to_async_url  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.notification import Notification, NotificationType  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+
+
+def test_to_async_url():
+    assert to_async_url("postgresql://u:p@h:5433/db") == "postgresql+asyncpg://u:p@h:5433/db"
+    assert to_async_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+
+
+@pytest.fixture()
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'reads.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    owner = User(email="owner@example.com", hashed_password="x", first_name="O", last_name="W", role=UserRole.LANDLORD)
+    tenant_user = User(email="t@example.com", hashed_password="x", first_name="T", last_name="U", role=UserRole.TENANT)
+    db.add_all([owner, tenant_user])
+    db.flush()
+    prop = Property(
+        owner_id=owner.id,
+        title="Appartement A",
+        address="1 rue",
+        city="Paris",
+        property_type=PropertyType.APARTMENT,
+        rent_amount=500,
+        status=PropertyStatus.OCCUPIED,
+    )
+    tenant = Tenant(user_id=tenant_user.id)
+    db.add_all([prop, tenant])
+    db.flush()
+    lease = Lease(
+        property_id=prop.id,
+        tenant_id=tenant.id,
+        start_date=date.today() - timedelta(days=60),
+        rent_amount=500,
+        status=LeaseStatus.ACTIVE,
+    )
+    db.add(lease)
+    db.flush()
+    for offset in (-10, 5, 40):
+        db.add(Payment(lease_id=lease.id, amount=500, due_date=date.today() + timedelta(days=offset), status=PaymentStatus.PENDING))
+    db.add(Notification(user_id=owner.id, type=NotificationType.GENERAL, title="Bonjour", message="m"))
+    db.commit()
+    db.close()
+    engine.dispose()
+    return url
+
+
+def _build_app(url: str, use_async: bool) -> FastAPI:
+    app = FastAPI()
+    modules = (payments, reminders, notifications)
+    for module in modules:
+        app.include_router(module.async_router if use_async else module.router)
+    app.include_router(properties.async_router if use_async else properties.router, prefix="/api")
+
+    if use_async:
+        engine = create_async_engine(to_async_url(url))
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def override():
+            async with Session() as session:
+                yield session
+
+        app.dependency_overrides[get_async_db] = override
+    else:
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        Session = sessionmaker(bind=engine)
+
+        def override():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override
+    return app
+
+
+def test_async_reads_match_sync_reads(db_url):
+    headers = {"Authorization": f"Bearer {create_access_token('owner@example.com')}"}
+    paths = ["/api/payments/", "/api/reminders/", "/api/notifications/", "/api/properties/"]
+
+    async def fetch(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            out = {}
+            for path in paths:
+                response = await client.get(path, headers=headers)
+                assert response.status_code == 200, (path, response.text)
+                out[path] = response.json()
+            return out
+
+    sync_results = asyncio.run(fetch(_build_app(db_url, use_async=False)))
+    async_results = asyncio.run(fetch(_build_app(db_url, use_async=True)))
+    assert async_results == sync_results
+    assert len(async_results["/api/payments/"]) == 3
+    assert len(async_results["/api/reminders/"]) == 2
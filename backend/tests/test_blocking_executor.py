@@ -0,0 +1,64 @@
+import asyncio
+import os
+import time
+
+import httpx
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import app.main as main  # noqa: E402
+from app.utils.executor import BlockingExecutor  # noqa: E402
+
+
+def test_event_loop_stays_responsive_during_reminder_run(monkeypatch):
+    # Lot de relances lent et entièrement synchrone (DB + SMTP simulés)
+    monkeypatch.setattr(main, "send_pending_reminders", lambda: time.sleep(0.5))
+    monkeypatch.setattr(main, "send_monthly_first_day_reminders", lambda: time.sleep(0.5))
+
+    async def scenario():
+        cycle = asyncio.create_task(main.run_reminder_cycle())
+        latencies = []
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await asyncio.sleep(0)
+            while not cycle.done():
+                start = time.perf_counter()
+                response = await client.get("/health")
+                assert response.status_code == 200
+                latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.02)
+        await cycle
+        return latencies
+
+    latencies = asyncio.run(scenario())
+    assert len(latencies) >= 5
+    assert max(latencies) < 0.2
+
+
+def test_executor_reports_queue_metrics():
+    executor = BlockingExecutor(max_workers=1, name="test-blocking")
+
+    async def scenario():
+        jobs = [asyncio.create_task(executor.run(time.sleep, 0.05)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        during = executor.stats()
+        await asyncio.gather(*jobs)
+        return during
+
+    during = asyncio.run(scenario())
+    assert during["active"] == 1
+    assert during["queued"] == 2
+    after = executor.stats()
+    assert after["completed"] == 3 and after["active"] == 0 and after["queued"] == 0
+    executor.shutdown()
+
+
+def test_executor_restarts_after_shutdown():
+    executor = BlockingExecutor(max_workers=1, name="test-restart")
+    assert asyncio.run(executor.run(lambda: 1)) == 1
+    executor.shutdown()
+    # Lifespan relancé dans le même processus : les appels bloquants repartent
+    assert asyncio.run(executor.run(lambda: 2)) == 2
+    executor.shutdown()
+    executor.shutdown()
@@ -0,0 +1,145 @@
+import io
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.api import imports  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.import_job import ImportStatus  # noqa: E402
+from app.models.lease import Lease  # noqa: E402
+from app.models.property import Property, PropertyStatus  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services import import_service  # noqa: E402
+from app.utils.security import _crypt_context, create_access_token  # noqa: E402
+from app.utils.user_cache import get_user_cache  # noqa: E402
+
+HEADERS = {"Authorization": f"Bearer {create_access_token('owner@example.com')}"}
+COLUMNS = "title,property_type,address,city,rent_amount,tenant_email,tenant_first_name,tenant_last_name,tenant_password,lease_start_date"
+CSV = "\n".join([
+    COLUMNS,
+    "T2 Bastille,appartement,1 rue A,Paris,900,alice@example.com,Alice,Martin,secret123,2026-01-01",
+    "Studio vide,studio,2 rue B,Paris,500,,,,,",
+    "Hangar,entrepot,3 rue C,Lyon,1200,,,,,",
+    "Parking,commercial,4 rue D,Paris,80,alice@example.com,Alice,Martin,,2026-02-01",
+    "Villa,villa,5 rue E,Nice,2000,owner@example.com,O,W,,2026-01-01",
+    "Loft,appartement,6 rue F,Paris,1500,,,,,2026-01-01",
+    "Maison,villa,7 rue G,Lille,1100,bob@example.com,Bob,Durand,,2026-03-01",
+]) + "\n"
+
+
+@pytest.fixture()
+def env(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    owner = User(email="owner@example.com", hashed_password="x", first_name="O", last_name="W", role=UserRole.LANDLORD)
+    db.add(owner)
+    db.commit()
+    owner_id = owner.id
+    db.close()
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(imports.router)
+    app.dependency_overrides[get_db] = override
+    get_user_cache().clear()
+    yield TestClient(app), Session, owner_id
+    get_user_cache().clear()
+    engine.dispose()
+
+
+def _upload(http, content: str):
+    return http.post("/api/imports/", files={"file": ("agence.csv", content.encode("utf-8"), "text/csv")}, headers=HEADERS)
+
+
+def test_import_writes_rows_in_batches_and_reports_row_errors(env):
+    http, Session, _ = env
+    response = _upload(http, CSV)
+    assert response.status_code == 200, response.text
+    job = response.json()
+    assert job["status"] == "completed"
+    assert (job["rows_processed"], job["rows_imported"], job["rows_failed"]) == (7, 4, 3)
+    errors = {error["row"]: error["error"] for error in job["errors"]}
+    assert sorted(errors) == [4, 6, 7]
+    assert "property_type" in errors[4]
+    assert errors[6] == "Email already registered"
+    assert "un bail nécessite un locataire" in errors[7]
+
+    db = Session()
+    try:
+        assert db.scalar(select(func.count()).select_from(Property)) == 4
+        statuses = dict(db.execute(select(Property.title, Property.status)).all())
+        assert statuses["Studio vide"] == PropertyStatus.AVAILABLE and statuses["T2 Bastille"] == PropertyStatus.OCCUPIED
+        # Alice, présente dans deux lots, n'est créée qu'une fois et porte deux baux
+        alice = db.execute(select(User).where(User.email == "alice@example.com")).scalar_one()
+        assert alice.role == UserRole.TENANT
+        assert _crypt_context(5).verify("secret123", alice.hashed_password)
+        assert db.scalar(select(func.count()).select_from(Lease).join(Tenant).where(Tenant.user_id == alice.id)) == 2
+        # Sans mot de passe : hash valide mais qu'aucun mot de passe ne vérifie
+        bob = db.execute(select(User).where(User.email == "bob@example.com")).scalar_one()
+        assert bob.hashed_password.startswith("$2b$05$") and not _crypt_context(5).verify("", bob.hashed_password)
+        assert db.scalar(select(func.count()).select_from(Tenant)) == 2
+    finally:
+        db.close()
+
+    assert http.get(f"/api/imports/{job['id']}", headers=HEADERS).json()["rows_imported"] == 4
+    assert [j["id"] for j in http.get("/api/imports/", headers=HEADERS).json()] == [job["id"]]
+
+
+def test_interrupted_import_resumes_after_last_committed_batch(env, monkeypatch):
+    _, Session, owner_id = env
+    original = import_service._insert_rows
+    calls = {"n": 0}
+
+    def failing_on_third_batch(db, owner, rows):
+        calls["n"] += 1
+        if calls["n"] == 3:
+            raise RuntimeError("connexion perdue")
+        return original(db, owner, rows)
+
+    monkeypatch.setattr(import_service, "_insert_rows", failing_on_third_batch)
+    db = Session()
+    try:
+        with pytest.raises(RuntimeError):
+            import_service.run_import(db, owner_id, io.BytesIO(CSV.encode()), "agence.csv")
+        job = db.execute(select(import_service.ImportJob)).scalar_one()
+        assert (job.status, job.rows_processed, job.last_error) == (ImportStatus.FAILED, 4, "connexion perdue")
+        assert db.scalar(select(func.count()).select_from(Property)) == 3
+
+        monkeypatch.setattr(import_service, "_insert_rows", original)
+        job = import_service.run_import(db, owner_id, io.BytesIO(CSV.encode()), "agence.csv")
+        assert (job.status, job.rows_processed, job.rows_imported, job.rows_failed) == (ImportStatus.COMPLETED, 7, 4, 3)
+        assert db.scalar(select(func.count()).select_from(Property)) == 4
+
+        # Fichier déjà importé : rien n'est rejoué
+        again = import_service.run_import(db, owner_id, io.BytesIO(CSV.encode()), "agence.csv")
+        assert again.id == job.id
+        assert db.scalar(select(func.count()).select_from(Property)) == 4
+    finally:
+        db.close()
+
+
+def test_missing_required_columns_are_rejected(env):
+    http, _, _ = env
+    response = _upload(http, "title,city\nStudio,Paris\n")
+    assert response.status_code == 400
+    assert "property_type" in response.json()["detail"]
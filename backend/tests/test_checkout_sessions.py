@@ -0,0 +1,135 @@
+import os
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.database import Base  # noqa: E402
+from app.models.checkout_session import CheckoutSession  # noqa: E402
+from app.utils import stripe_helper  # noqa: E402
+from app.utils.stripe_helper import checkout_stats, create_checkout_session, set_stripe_client  # noqa: E402
+
+
+class FakeStripeClient:
+    """Client Stripe en mémoire : enregistre les créations, peut simuler une panne."""
+
+    def __init__(self):
+        self.sessions = []
+        self.payment_links = []
+        self.fail_sessions = False
+        self.fail_links = False
+
+    def create_session(self, **params):
+        if self.fail_sessions:
+            raise RuntimeError("stripe down")
+        self.sessions.append(params)
+        n = len(self.sessions)
+        return SimpleNamespace(id=f"cs_test_{n}", url=f"https://checkout.test/cs_test_{n}", expires_at=params["expires_at"])
+
+    def create_payment_link(self, **params):
+        if self.fail_links:
+            raise RuntimeError("stripe down")
+        self.payment_links.append(params)
+        n = len(self.payment_links)
+        return SimpleNamespace(id=f"plink_{n}", url=f"https://buy.test/plink_{n}")
+
+
+@pytest.fixture()
+def stripe_env(monkeypatch):
+    monkeypatch.setattr(stripe_helper.settings, "STRIPE_SECRET_KEY", "sk_test")
+    fake = FakeStripeClient()
+    previous = set_stripe_client(fake)
+    checkout_stats.reset()
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    yield db, fake
+    db.close()
+    engine.dispose()
+    set_stripe_client(previous)
+    checkout_stats.reset()
+
+
+def _checkout(db, amount=500, payment_id=1, success_url="https://app.test/ok"):
+    return create_checkout_session(
+        amount=amount,
+        currency="xaf",
+        description="Loyer",
+        success_url=success_url,
+        cancel_url="https://app.test/ko",
+        metadata={"payment_id": payment_id, "lease_id": 3},
+        db=db,
+    )
+
+
+def test_session_is_reused_for_same_payment_and_amount(stripe_env):
+    db, fake = stripe_env
+    first = _checkout(db)
+    db.commit()
+    assert _checkout(db) == first
+    assert _checkout(db) == first
+    assert len(fake.sessions) == 1
+    assert fake.sessions[0]["client_reference_id"] == "1"
+
+    # Autre montant ou autre paiement : nouvelle session
+    assert _checkout(db, amount=600) != first
+    assert _checkout(db, payment_id=2) != first
+    assert len(fake.sessions) == 3
+    assert checkout_stats.snapshot() == {"hits": 2, "misses": 3, "refreshes": 0, "failures": 0}
+    assert db.query(CheckoutSession).count() == 3
+
+
+def test_session_is_not_shared_across_return_urls(stripe_env):
+    db, fake = stripe_env
+    first = _checkout(db)
+    # Avis d'échéance : retour vers /payments, pas vers la page de confirmation
+    other = _checkout(db, success_url="https://app.test/payments?status=success")
+    assert other != first
+    assert [session["success_url"] for session in fake.sessions] == [
+        "https://app.test/ok", "https://app.test/payments?status=success",
+    ]
+    assert _checkout(db) == first and len(fake.sessions) == 2
+
+
+def test_session_is_refreshed_before_expiry(stripe_env, monkeypatch):
+    db, fake = stripe_env
+    first = _checkout(db)
+    row = db.execute(select(CheckoutSession)).scalar_one()
+    row.expires_at = datetime.now(timezone.utc) + timedelta(minutes=10)
+    db.commit()
+
+    second = _checkout(db)
+    assert second != first
+    db.commit()
+    row = db.execute(select(CheckoutSession)).scalar_one()
+    assert row.url == second and row.stripe_id == "cs_test_2"
+    assert checkout_stats.refreshes == 1
+
+    # Stripe en panne : la session bientôt expirée reste servie plutôt que rien
+    row.expires_at = datetime.now(timezone.utc) + timedelta(minutes=10)
+    db.commit()
+    fake.fail_sessions = fake.fail_links = True
+    assert _checkout(db) == second
+    assert checkout_stats.failures == 1
+
+
+def test_payment_link_fallback_is_cached_too(stripe_env):
+    db, fake = stripe_env
+    fake.fail_sessions = True
+    url = _checkout(db)
+    assert url == "https://buy.test/plink_1"
+    assert _checkout(db) == url
+    assert len(fake.payment_links) == 1
+
+
+def test_without_session_every_call_creates(stripe_env):
+    _, fake = stripe_env
+    for _ in range(2):
+        create_checkout_session(500, "xaf", "Loyer", "https://ok", "https://ko", {"payment_id": 1})
+    assert len(fake.sessions) == 2
+    assert checkout_stats.snapshot()["hits"] == 0
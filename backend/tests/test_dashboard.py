@@ -0,0 +1,152 @@
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.database import Base  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.maintenance import MaintenanceRequest, MaintenanceStatus, MaintenanceType  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.dashboard_service import compute_owner_summary, get_owner_summary, summary_cache  # noqa: E402
+
+TODAY = date(2026, 3, 15)
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    owner = User(email="owner@example.com", hashed_password="x", first_name="O", last_name="W", role=UserRole.LANDLORD)
+    other = User(email="other@example.com", hashed_password="x", first_name="A", last_name="B", role=UserRole.LANDLORD)
+    tenant_user = User(email="t@example.com", hashed_password="x", first_name="T", last_name="U", role=UserRole.TENANT)
+    db.add_all([owner, other, tenant_user])
+    db.flush()
+    tenant = Tenant(user_id=tenant_user.id)
+    props = [
+        Property(owner_id=owner.id, title="A", address="r", city="Paris", property_type=PropertyType.APARTMENT,
+                 rent_amount=500, status=PropertyStatus.OCCUPIED),
+        Property(owner_id=owner.id, title="B", address="r", city="Paris", property_type=PropertyType.STUDIO,
+                 rent_amount=300, status=PropertyStatus.OCCUPIED),
+        Property(owner_id=owner.id, title="C", address="r", city="Paris", property_type=PropertyType.APARTMENT,
+                 rent_amount=400, status=PropertyStatus.AVAILABLE),
+        Property(owner_id=other.id, title="D", address="r", city="Lyon", property_type=PropertyType.HOUSE,
+                 rent_amount=900, status=PropertyStatus.OCCUPIED),
+    ]
+    db.add(tenant)
+    db.add_all(props)
+    db.flush()
+    leases = [
+        Lease(property_id=props[0].id, tenant_id=tenant.id, start_date=date(2025, 1, 1), rent_amount=500, charges=50,
+              status=LeaseStatus.ACTIVE),
+        Lease(property_id=props[1].id, tenant_id=tenant.id, start_date=date(2025, 1, 1), rent_amount=300,
+              status=LeaseStatus.ACTIVE),
+        Lease(property_id=props[3].id, tenant_id=tenant.id, start_date=date(2025, 1, 1), rent_amount=900,
+              status=LeaseStatus.ACTIVE),
+    ]
+    db.add_all(leases)
+    db.flush()
+    db.add_all([
+        Payment(lease_id=leases[0].id, amount=550, due_date=date(2026, 3, 5), status=PaymentStatus.PAID),
+        Payment(lease_id=leases[1].id, amount=300, due_date=date(2026, 3, 5), status=PaymentStatus.PENDING),
+        Payment(lease_id=leases[1].id, amount=300, due_date=date(2026, 2, 5), status=PaymentStatus.LATE),
+        Payment(lease_id=leases[0].id, amount=550, due_date=date(2026, 4, 5), status=PaymentStatus.PENDING),
+        Payment(lease_id=leases[2].id, amount=900, due_date=date(2026, 3, 5), status=PaymentStatus.PENDING),
+    ])
+    db.add_all([
+        MaintenanceRequest(property_id=props[0].id, tenant_id=tenant.id, type=MaintenanceType.PLUMBING,
+                           description="fuite", status=MaintenanceStatus.PENDING),
+        MaintenanceRequest(property_id=props[1].id, tenant_id=tenant.id, type=MaintenanceType.OTHER,
+                           description="porte", status=MaintenanceStatus.RESOLVED),
+    ])
+    db.commit()
+    summary_cache.invalidate()
+    yield db, engine, owner.id, other.id
+    summary_cache.invalidate()
+    db.close()
+
+
+def test_summary_aggregates(session):
+    db, _, owner_id, _ = session
+    summary = compute_owner_summary(db, owner_id, today=TODAY)
+
+    assert summary.month == "2026-03"
+    assert summary.properties_total == 3
+    assert summary.properties_by_status == {"occupé": 2, "disponible": 1}
+    assert summary.properties_by_type == {"appartement": 2, "studio": 1}
+    assert summary.occupancy_rate == pytest.approx(2 / 3, rel=1e-3)
+    assert (summary.active_leases, summary.active_tenants, summary.monthly_rent_roll) == (2, 1, 850)
+    assert (summary.expected_this_month, summary.collected_this_month) == (850, 550)
+    # mars (échéance passée, non payée) + février (late)
+    assert (summary.late_count, summary.late_amount) == (2, 600)
+    assert (summary.upcoming_count, summary.upcoming_amount) == (1, 550)
+    assert summary.open_maintenance == {"pending": 1, "in_progress": 0}
+    assert [(m.month, m.collected) for m in summary.revenue_trend] == [
+        ("2025-10", 0), ("2025-11", 0), ("2025-12", 0), ("2026-01", 0), ("2026-02", 0), ("2026-03", 550),
+    ]
+    assert [(p.due_date, p.status, p.property_title) for p in summary.upcoming_payments] == [
+        (date(2026, 4, 5), "pending", "A"),
+    ]
+    assert [(p.due_date, p.amount, p.property_city) for p in summary.recent_payments] == [(date(2026, 3, 5), 550, "Paris")]
+
+
+def test_upcoming_payments_merge_statuses_in_due_order(session):
+    db, _, owner_id, _ = session
+    lease_a, lease_b = db.query(Lease).order_by(Lease.id).limit(2).all()
+    db.add_all([
+        Payment(lease_id=lease_b.id, amount=300, due_date=date(2026, 4, 5), status=PaymentStatus.LATE),
+        Payment(lease_id=lease_b.id, amount=100, due_date=date(2026, 5, 5), status=PaymentStatus.PARTIAL),
+        Payment(lease_id=lease_a.id, amount=550, due_date=date(2026, 5, 5), status=PaymentStatus.PENDING),
+        Payment(lease_id=lease_a.id, amount=550, due_date=date(2026, 6, 5), status=PaymentStatus.PENDING),
+    ])
+    db.commit()
+
+    summary = compute_owner_summary(db, owner_id, today=TODAY)
+    assert [(p.due_date, p.lease_id, p.status) for p in summary.upcoming_payments] == [
+        (date(2026, 4, 5), lease_a.id, "pending"),
+        (date(2026, 4, 5), lease_b.id, "late"),
+        (date(2026, 5, 5), lease_a.id, "pending"),
+        (date(2026, 5, 5), lease_b.id, "partial"),
+    ]
+    # Le retard saisi sur une échéance future compte comme impayé en retard
+    assert (summary.late_count, summary.upcoming_count) == (3, 1)
+
+
+def test_summary_is_cached_and_invalidated_on_write(session):
+    db, engine, owner_id, other_id = session
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    first = get_owner_summary(db, owner_id)
+    get_owner_summary(db, other_id)
+    statements.clear()
+    assert get_owner_summary(db, owner_id) is first
+    assert statements == []
+
+    payment = db.query(Payment).filter(Payment.status == PaymentStatus.LATE).one()
+    payment.status = PaymentStatus.PAID
+    db.commit()
+
+    statements.clear()
+    assert get_owner_summary(db, other_id) is not None
+    assert statements == []  # l'autre bailleur n'est pas concerné
+    assert get_owner_summary(db, owner_id) is not first
+    assert statements
+
+
+def test_rolled_back_write_keeps_cache(session):
+    db, _, owner_id, _ = session
+    first = get_owner_summary(db, owner_id)
+    prop = db.query(Property).filter(Property.owner_id == owner_id).first()
+    prop.title = "Renommé"
+    db.flush()
+    db.rollback()
+    assert get_owner_summary(db, owner_id) is first
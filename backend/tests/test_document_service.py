@@ -0,0 +1,60 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import pytest
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.services.document_service import DocumentRenderer, notice_spec, receipt_spec  # noqa: E402
+
+ISSUED = date(2026, 3, 10)
+
+
+@pytest.fixture()
+def renderer(tmp_path):
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        yield DocumentRenderer(str(tmp_path), executor=pool)
+
+
+def test_spec_digest_tracks_printed_fields():
+    spec = receipt_spec(1, 500, "Jean Dupont", "Studio", ISSUED)
+    assert spec.digest == receipt_spec(1, 500.0, "Jean Dupont", "Studio", ISSUED).digest
+    assert spec.digest != receipt_spec(1, 550, "Jean Dupont", "Studio", ISSUED).digest
+    assert spec.digest != receipt_spec(1, 500, "Jean Dupont", "Studio", date(2026, 3, 11)).digest
+    assert spec.digest != notice_spec(1, 500, ISSUED, "Jean Dupont", "Studio", ISSUED).digest
+    assert spec.url == f"/receipts/{spec.filename}" and spec.filename.startswith("receipt-1-")
+
+
+def test_documents_are_rendered_once_then_served_from_disk(renderer, tmp_path):
+    spec = receipt_spec(7, 500, "Jean Dupont", "Studio", ISSUED)
+    futures = [renderer.submit(spec) for _ in range(3)]
+    assert len({id(f) for f in futures}) == 1  # rendu en cours partagé
+
+    path = renderer.ensure(spec, timeout=30)
+    assert path == str(tmp_path / spec.filename)
+    with open(path, "rb") as fh:
+        assert fh.read(4) == b"%PDF"
+    assert renderer.request(spec) == spec.url
+    stats = renderer.stats()
+    assert (stats["hits"], stats["renders"], stats["failures"]) == (4, 1, 0)
+    assert [p.name for p in tmp_path.iterdir()] == [spec.filename]
+
+
+def test_request_returns_url_before_rendering_completes(renderer):
+    spec = notice_spec(9, 300, date(2026, 4, 5), "Jean Dupont", "Studio", ISSUED)
+    assert renderer.request(spec) == spec.url
+    renderer.ensure(spec, timeout=30)
+    assert renderer.is_ready(spec)
+
+
+def test_ensure_many_keeps_order_and_reuses_files(renderer, tmp_path):
+    specs = [receipt_spec(i, 100 + i, "Jean Dupont", "Studio", ISSUED) for i in range(1, 12)]
+    renderer.ensure(specs[3], timeout=30)
+    results = list(renderer.ensure_many(specs, chunk_size=4, window=2))
+    assert [spec for spec, _ in results] == specs
+    paths = [path for _, path in results]
+    assert paths == [str(tmp_path / spec.filename) for spec in specs]
+    assert all(os.path.exists(p) for p in paths)
+    assert renderer.stats()["renders"] == len(specs)
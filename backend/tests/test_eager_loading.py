@@ -0,0 +1,158 @@
+import os
+import subprocess
+import sys
+import textwrap
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.api import tenants  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.utils.eager_loading import PAYMENT_WITH_PARTIES  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+from app.utils.sql_instrumentation import SQLInstrumentationMiddleware, track_queries  # noqa: E402
+from app.utils.user_cache import get_user_cache  # noqa: E402
+
+HEADERS = {"Authorization": f"Bearer {create_access_token('owner@example.com')}"}
+
+
+def _tenants_app(count: int):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"email": "owner@example.com", "hashed_password": "x", "first_name": "O", "last_name": "W",
+             "role": UserRole.LANDLORD},
+        ] + [
+            {"email": f"t{i}@example.com", "hashed_password": "x", "first_name": "Awa", "last_name": str(i),
+             "role": UserRole.TENANT}
+            for i in range(count)
+        ])
+        user_ids = conn.execute(select(User.id).where(User.role == UserRole.TENANT).order_by(User.id)).scalars().all()
+        conn.execute(insert(Tenant), [{"user_id": user_id} for user_id in user_ids])
+    SessionLocal = sessionmaker(bind=engine)
+
+    def override():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(tenants.router)
+    app.add_middleware(SQLInstrumentationMiddleware)
+    app.dependency_overrides[get_db] = override
+    return TestClient(app), engine
+
+
+def _query_count(http, path, **params) -> int:
+    # Cache utilisateur vidé : chaque appel compte aussi le chargement du bailleur authentifié
+    get_user_cache().clear()
+    response = http.get(path, params=params, headers=HEADERS)
+    assert response.status_code == 200, response.text
+    timing = dict(part.strip().split(";", 1) for part in response.headers["server-timing"].split(","))
+    return int(timing["db"].split('desc="', 1)[1].split(" ", 1)[0])
+
+
+@pytest.fixture()
+def small_and_large():
+    small, small_engine = _tenants_app(10)
+    large, large_engine = _tenants_app(1000)
+    yield small, large
+    get_user_cache().clear()
+    small_engine.dispose()
+    large_engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/tenants/", {}),
+        ("/tenants/", {"search": "awa"}),
+        ("/tenants/", {"cursor": ""}),
+        ("/tenants/1", {}),
+    ],
+)
+def test_tenant_endpoints_run_constant_queries(small_and_large, path, params):
+    small, large = small_and_large
+    small_count = _query_count(small, path, limit=10, **params)
+    large_count = _query_count(large, path, limit=1000, **params)
+    assert small_count == large_count
+    assert len(large.get(path, params={"limit": 1000, **params}, headers=HEADERS).json()) > 0
+
+
+def test_payment_plan_loads_every_party_in_one_query():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(bind=engine) as db:
+        owner = User(email="owner@example.com", hashed_password="x", first_name="O", last_name="W", role=UserRole.LANDLORD)
+        user = User(email="t@example.com", hashed_password="x", first_name="Awa", last_name="Diop")
+        db.add_all([owner, user])
+        db.flush()
+        prop = Property(owner_id=owner.id, title="Bien", address="r", city="Dakar",
+                        property_type=PropertyType.APARTMENT, rent_amount=500, status=PropertyStatus.OCCUPIED)
+        tenant = Tenant(user_id=user.id)
+        db.add_all([prop, tenant])
+        db.flush()
+        lease = Lease(property_id=prop.id, tenant_id=tenant.id, start_date=date(2026, 1, 1), rent_amount=500,
+                      status=LeaseStatus.ACTIVE)
+        db.add(lease)
+        db.flush()
+        db.add_all(Payment(lease_id=lease.id, amount=500, due_date=date(2026, m, 5), status=PaymentStatus.PENDING)
+                   for m in range(1, 13))
+        db.commit()
+
+    with Session(bind=engine) as db, track_queries() as stats:
+        payments = db.query(Payment).options(*PAYMENT_WITH_PARTIES).all()
+        seen = {(p.lease.property.title, p.lease.property.owner.email, p.lease.tenant.user.email) for p in payments}
+    assert len(payments) == 12 and seen == {("Bien", "owner@example.com", "t@example.com")}
+    assert stats.query_count == 1
+    engine.dispose()
+
+
+def test_raise_on_lazy_load_rejects_unplanned_access():
+    # Le réglage agit à la définition des modèles : vérifié dans un interpréteur neuf
+    script = textwrap.dedent("""
+        from sqlalchemy import create_engine, insert
+        from sqlalchemy.exc import InvalidRequestError
+        from sqlalchemy.orm import Session
+        from app.database import Base
+        from app.models.tenant import Tenant
+        from app.models.user import User
+        from app.utils.eager_loading import TENANT_WITH_USER
+
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(User), [{"email": "t@example.com", "hashed_password": "x", "first_name": "A", "last_name": "B"}])
+            conn.execute(insert(Tenant), [{"user_id": 1}])
+        with Session(bind=engine) as db:
+            assert db.query(Tenant).options(*TENANT_WITH_USER).one().user.email == "t@example.com"
+        with Session(bind=engine) as db:
+            try:
+                db.query(Tenant).one().user
+            except InvalidRequestError:
+                print("raised")
+    """)
+    env = {**os.environ, "DATABASE_URL": "sqlite://", "ORM_RAISE_ON_LAZY_LOAD": "true"}
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=Path(__file__).resolve().parents[1], env=env,
+        capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "raised"
@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.services.email_dispatch_service import DispatchOptions, OutgoingEmail, dispatch_emails  # noqa: E402
+from app.utils.rate_limit import RateLimiter  # noqa: E402
+
+
+class RecordingSender:
+    instances = []
+
+    def __init__(self, rate_limiters=None):
+        self.rate_limiters = rate_limiters
+        self.sent = []
+        self.closed = False
+        RecordingSender.instances.append(self)
+
+    def send(self, to_email, subject, content, html_content=None):
+        time.sleep(0.01)
+        if to_email == "fail@example.com":
+            return False, "boom"
+        self.sent.append((threading.get_ident(), to_email))
+        return True, None
+
+    def close(self):
+        self.closed = True
+
+
+def test_dispatch_reuses_one_sender_per_worker_and_keeps_order():
+    RecordingSender.instances = []
+    messages = [OutgoingEmail(f"t{i}@example.com", "s", "c", context=i) for i in range(20)]
+    messages.append(OutgoingEmail("fail@example.com", "s", "c", context="fail"))
+
+    results = list(
+        dispatch_emails(
+            messages,
+            DispatchOptions(concurrency=4, smtp_rate_per_second=0, sendgrid_rate_per_second=0),
+            sender_factory=RecordingSender,
+        )
+    )
+
+    assert [r.message.context for r in results] == list(range(20)) + ["fail"]
+    assert sum(r.success for r in results) == 20
+    assert results[-1].reason == "boom"
+    # Une connexion par worker au plus, toutes fermées en fin d'envoi
+    assert 1 <= len(RecordingSender.instances) <= 4
+    assert all(s.closed for s in RecordingSender.instances)
+    assert sum(len(s.sent) for s in RecordingSender.instances) == 20
+
+
+def test_rate_limiter_spaces_out_acquisitions():
+    limiter = RateLimiter(rate_per_second=50, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    # 1 jeton immédiat puis 5 à 20ms d'intervalle
+    assert time.monotonic() - start >= 0.09
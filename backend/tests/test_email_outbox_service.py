@@ -0,0 +1,112 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.config import settings  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.models.email_outbox import EmailOutbox, OutboxStatus  # noqa: E402
+from app.services.email_outbox_service import (  # noqa: E402
+    enqueue_email,
+    outbox_stats,
+    process_outbox_batch,
+)
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    TestingSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = TestingSession()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_enqueue_is_transactional(db_session):
+    enqueue_email(db_session, "a@example.com", "Sujet", "Bonjour")
+    db_session.rollback()
+    assert db_session.query(EmailOutbox).count() == 0
+
+    enqueue_email(db_session, "a@example.com", "Sujet", "Bonjour")
+    enqueue_email(db_session, "", "Sujet", "ignoré sans destinataire")
+    db_session.commit()
+    assert db_session.query(EmailOutbox).count() == 1
+
+
+def test_batch_sends_retries_with_backoff_and_dead_letters(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "OUTBOX_BACKOFF_BASE_SECONDS", 60)
+    enqueue_email(db_session, "ok@example.com", "Sujet", "Bonjour")
+    enqueue_email(db_session, "ko@example.com", "Sujet", "Bonjour")
+    db_session.commit()
+
+    calls = []
+
+    def fake_send_many(messages):
+        calls.append([m[0] for m in messages])
+        return [(m[0] == "ok@example.com", None if m[0] == "ok@example.com" else "refusé") for m in messages]
+
+    monkeypatch.setattr("app.services.email_outbox_service.send_many", fake_send_many)
+    now = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+    stats = process_outbox_batch(db_session, now=now)
+    assert stats == {"claimed": 2, "sent": 1, "retried": 1, "dead": 0}
+    failed = db_session.query(EmailOutbox).filter(EmailOutbox.to_email == "ko@example.com").one()
+    assert failed.status == OutboxStatus.PENDING
+    assert failed.last_error == "refusé"
+
+    # Pas encore dû : le backoff de 60s n'est pas écoulé
+    assert process_outbox_batch(db_session, now=now + timedelta(seconds=30))["claimed"] == 0
+
+    stats = process_outbox_batch(db_session, now=now + timedelta(seconds=61))
+    assert stats == {"claimed": 1, "sent": 0, "retried": 0, "dead": 1}
+    assert calls == [["ok@example.com", "ko@example.com"], ["ko@example.com"]]
+
+    depth = outbox_stats(db_session)["depth"]
+    assert depth == {"pending": 0, "sent": 1, "dead": 1}
+
+
+def test_sends_happen_outside_the_claim_transaction(db_session, monkeypatch):
+    enqueue_email(db_session, "a@example.com", "Sujet", "Bonjour")
+    db_session.commit()
+    now = datetime.now(timezone.utc) + timedelta(seconds=1)
+    seen = {}
+
+    def fake_send_many(messages):
+        seen["in_transaction"] = db_session.in_transaction()
+        # Lot réclamé et commité : un second worker ne le reprend pas pendant l'envoi
+        seen["reclaimed"] = process_outbox_batch(db_session, now=now)["claimed"]
+        return [(True, None) for _ in messages]
+
+    monkeypatch.setattr("app.services.email_outbox_service.send_many", fake_send_many)
+    assert process_outbox_batch(db_session, now=now)["sent"] == 1
+    assert seen == {"in_transaction": False, "reclaimed": 0}
+    entry = db_session.query(EmailOutbox).one()
+    assert entry.status == OutboxStatus.SENT and entry.attempts == 1
+
+
+def test_expired_claim_makes_emails_due_again(db_session, monkeypatch):
+    enqueue_email(db_session, "a@example.com", "Sujet", "Bonjour")
+    db_session.commit()
+    now = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+    def crash(messages):
+        raise RuntimeError("worker arrêté")
+
+    monkeypatch.setattr("app.services.email_outbox_service.send_many", crash)
+    with pytest.raises(RuntimeError):
+        process_outbox_batch(db_session, now=now)
+    db_session.rollback()
+    assert process_outbox_batch(db_session, now=now + timedelta(seconds=60))["claimed"] == 0
+
+    monkeypatch.setattr("app.services.email_outbox_service.send_many", lambda messages: [(True, None)] * len(messages))
+    later = now + timedelta(seconds=settings.OUTBOX_CLAIM_SECONDS + 1)
+    assert process_outbox_batch(db_session, now=later) == {"claimed": 1, "sent": 1, "retried": 0, "dead": 0}
+    assert db_session.query(EmailOutbox).one().attempts == 2
@@ -0,0 +1,160 @@
+import os
+import socketserver
+import threading
+
+import pytest
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.config import settings  # noqa: E402
+from app.utils import email as email_utils  # noqa: E402
+from app.utils import metrics  # noqa: E402
+from app.utils.email import SMTPConnectionPool, reset_smtp_pool, send_email, send_many  # noqa: E402
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Serveur SMTP minimal (EHLO/MAIL/RCPT/DATA/NOOP/RSET/QUIT) pour les tests."""
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        stub = self.server
+        with stub.lock:
+            stub.connections += 1
+        sent_here = 0
+        self._reply("220 stub ESMTP")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            verb = raw.decode(errors="ignore").strip().split(" ")[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 stub")
+            elif verb == "NOOP":
+                with stub.lock:
+                    stub.noops += 1
+                self._reply("250 OK")
+            elif verb == "RCPT" and any(addr in raw.decode(errors="ignore") for addr in stub.reject_rcpt):
+                self._reply("550 no such user")
+            elif verb == "RSET":
+                with stub.lock:
+                    stub.rsets += 1
+                self._reply("250 OK")
+            elif verb in ("MAIL", "RCPT"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 go ahead")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if data_line in (b".\r\n", b""):
+                        break
+                    lines.append(data_line)
+                with stub.lock:
+                    stub.messages.append(b"".join(lines))
+                self._reply("250 queued")
+                sent_here += 1
+                if stub.drop_after and sent_here >= stub.drop_after:
+                    return  # coupe la connexion sans prévenir
+            elif verb == "QUIT":
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("502 unknown")
+
+
+class _StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.noops = 0
+        self.messages = []
+        self.drop_after = 0
+        self.rsets = 0
+        self.reject_rcpt = ()
+
+
+@pytest.fixture()
+def smtp_server(monkeypatch):
+    server = _StubSMTPServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", server.server_address[1])
+    monkeypatch.setattr(settings, "SMTP_USE_TLS", False)
+    monkeypatch.setattr(settings, "SMTP_USERNAME", None)
+    monkeypatch.setattr(settings, "SMTP_PASSWORD", None)
+    monkeypatch.setattr(settings, "SENDGRID_API_KEY", None)
+    reset_smtp_pool()
+    yield server
+    reset_smtp_pool()
+    server.shutdown()
+    server.server_close()
+
+
+def test_send_email_reuses_pooled_connection(smtp_server):
+    for i in range(5):
+        assert send_email(f"t{i}@example.com", "Sujet", "Bonjour") == (True, None)
+    assert len(smtp_server.messages) == 5
+    assert smtp_server.connections == 1
+
+
+def test_send_many_pipelines_over_one_session(smtp_server):
+    sends_before = metrics.email_send_duration.count(provider="smtp")
+    results = send_many([(f"t{i}@example.com", "Sujet", "Bonjour", "<p>Bonjour</p>") for i in range(10)])
+    assert results == [(True, None)] * 10
+    # Chemin de l'outbox : chaque message compte dans /metrics
+    assert metrics.email_send_duration.count(provider="smtp") == sends_before + 10
+    assert len(smtp_server.messages) == 10
+    assert smtp_server.connections == 1
+
+
+def test_pool_reconnects_after_server_disconnect(smtp_server):
+    smtp_server.drop_after = 1
+    pool = SMTPConnectionPool(factory=email_utils._open_smtp, max_size=1, noop_after=3600)
+    messages = [email_utils._build_message(f"t{i}@example.com", "Sujet", "Bonjour", None) for i in range(3)]
+    for msg in messages:
+        pool.send_message(msg)
+    pool.close()
+    assert len(smtp_server.messages) == 3
+    assert smtp_server.connections == 3
+    assert pool.size == 0
+
+
+def test_pool_health_checks_and_recycles(smtp_server):
+    pool = SMTPConnectionPool(factory=email_utils._open_smtp, max_size=2, noop_after=0)
+    msg = email_utils._build_message("t@example.com", "Sujet", "Bonjour", None)
+    pool.send_message(msg)
+    pool.send_message(msg)
+    assert smtp_server.noops >= 1
+    assert smtp_server.connections == 1
+
+    pool.max_age = 0
+    pool.send_message(msg)
+    assert smtp_server.connections == 2
+    assert pool.size == 1
+    pool.close()
+
+
+def test_refused_recipient_keeps_the_session(smtp_server):
+    smtp_server.reject_rcpt = ("bad@example.com",)
+    pool = SMTPConnectionPool(factory=email_utils._open_smtp, max_size=1, noop_after=3600)
+    build = email_utils._build_message
+    with pytest.raises(email_utils.smtplib.SMTPRecipientsRefused):
+        pool.send_message(build("bad@example.com", "Sujet", "Bonjour", None))
+    pool.send_message(build("ok@example.com", "Sujet", "Bonjour", None))
+
+    failures_before = metrics.email_send_failures.value(provider="smtp")
+    results = pool.send_many([build(to, "Sujet", "Bonjour", None) for to in ("a@example.com", "bad@example.com", "b@example.com")])
+    assert [ok for ok, _ in results] == [True, False, True]
+    assert metrics.email_send_failures.value(provider="smtp") == failures_before + 1
+    # Refus SMTP : RSET et même session, pas de nouvelle poignée de main
+    assert smtp_server.connections == 1 and smtp_server.rsets >= 2
+    assert len(smtp_server.messages) == 3
+    pool.close()
@@ -0,0 +1,143 @@
+import csv
+import io
+import os
+import re
+import zipfile
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.api import payments  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.payment import Payment, PaymentMethod, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.ledger_export_service import LEDGER_HEADER, stream_csv  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+from app.utils.user_cache import get_user_cache  # noqa: E402
+from app.utils.xlsx_stream import column_letter, stream_xlsx  # noqa: E402
+
+HEADERS = {"Authorization": f"Bearer {create_access_token('owner@example.com')}"}
+
+
+@pytest.fixture()
+def env():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    owner = User(email="owner@example.com", hashed_password="x", first_name="O", last_name="W", role=UserRole.LANDLORD)
+    other = User(email="other@example.com", hashed_password="x", first_name="A", last_name="B", role=UserRole.LANDLORD)
+    tenant_user = User(email="t@example.com", hashed_password="x", first_name="Jean", last_name="=Dupont")
+    db.add_all([owner, other, tenant_user])
+    db.flush()
+    tenant = Tenant(user_id=tenant_user.id)
+    mine = Property(owner_id=owner.id, title="Studio", address="1 rue A", city="Paris",
+                    property_type=PropertyType.STUDIO, rent_amount=500, status=PropertyStatus.OCCUPIED)
+    theirs = Property(owner_id=other.id, title="Maison", address="2 rue B", city="Lyon",
+                      property_type=PropertyType.HOUSE, rent_amount=900, status=PropertyStatus.OCCUPIED)
+    db.add_all([tenant, mine, theirs])
+    db.flush()
+    lease = Lease(property_id=mine.id, tenant_id=tenant.id, start_date=date(2025, 1, 1), rent_amount=500,
+                  status=LeaseStatus.ACTIVE)
+    foreign = Lease(property_id=theirs.id, tenant_id=tenant.id, start_date=date(2025, 1, 1), rent_amount=900,
+                    status=LeaseStatus.ACTIVE)
+    db.add_all([lease, foreign])
+    db.flush()
+    db.add_all([
+        Payment(lease_id=lease.id, amount=500, due_date=date(2026, 1, 5), status=PaymentStatus.PAID,
+                payment_date=date(2026, 1, 4), payment_method=PaymentMethod.STRIPE),
+        Payment(lease_id=lease.id, amount=500, due_date=date(2026, 2, 5), status=PaymentStatus.LATE),
+        Payment(lease_id=lease.id, amount=500, due_date=date(2026, 3, 5), status=PaymentStatus.PENDING),
+        Payment(lease_id=foreign.id, amount=900, due_date=date(2026, 1, 5), status=PaymentStatus.PAID),
+    ])
+    db.commit()
+    db.close()
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(payments.router)
+    app.dependency_overrides[get_db] = override
+    get_user_cache().clear()
+    yield TestClient(app), engine
+    get_user_cache().clear()
+    engine.dispose()
+
+
+def _csv(response):
+    return list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+
+
+def test_csv_export_lists_owner_payments_in_one_query(env):
+    http, engine = env
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    response = http.get("/api/payments/export", headers=HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.content.startswith(b"\xef\xbb\xbf")
+    rows = _csv(response)
+    assert rows[0] == LEDGER_HEADER
+    assert [(r[1], r[3]) for r in rows[1:]] == [("2026-01-05", "paid"), ("2026-02-05", "late"), ("2026-03-05", "pending")]
+    first = dict(zip(rows[0], rows[1]))
+    assert (first["payment_method"], first["property_city"], first["tenant_email"]) == ("stripe", "Paris", "t@example.com")
+    assert first["tenant_last_name"] == "'=Dupont"  # formule neutralisée
+    assert len([s for s in statements if "FROM payments" in s]) == 1
+
+
+def test_export_filters(env):
+    http, _ = env
+    rows = _csv(http.get("/api/payments/export", params={"status": "late"}, headers=HEADERS))
+    assert [r[1] for r in rows[1:]] == ["2026-02-05"]
+    rows = _csv(http.get("/api/payments/export", params={"due_from": "2026-02-01", "due_to": "2026-03-31"}, headers=HEADERS))
+    assert [r[1] for r in rows[1:]] == ["2026-02-05", "2026-03-05"]
+    rows = _csv(http.get("/api/payments/export", params={"paid_from": "2026-01-01"}, headers=HEADERS))
+    assert [r[1] for r in rows[1:]] == ["2026-01-05"]
+    assert http.get("/api/payments/export", params={"format": "pdf"}, headers=HEADERS).status_code == 422
+
+
+def test_xlsx_export_is_a_valid_workbook(env):
+    http, _ = env
+    response = http.get("/api/payments/export", params={"format": "xlsx"}, headers=HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    workbook = zipfile.ZipFile(io.BytesIO(response.content))
+    assert workbook.testzip() is None
+    assert {"[Content_Types].xml", "xl/workbook.xml", "xl/styles.xml", "xl/worksheets/sheet1.xml"} <= set(workbook.namelist())
+    sheet = workbook.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert sheet.count("<row ") == 4
+    # Dates en numéros de série Excel (2026-01-05 → 46027) au format date
+    assert '<c r="B2" s="1"><v>46027</v></c>' in sheet
+    assert "<t xml:space=\"preserve\">=Dupont</t>" in sheet
+
+
+def test_writers_emit_bounded_chunks():
+    rows = ([i, f"ligne {i}", date(2026, 1, 1)] for i in range(5000))
+    chunks = list(stream_csv(["id", "label", "day"], rows, flush_rows=1000))
+    assert len(chunks) == 5
+    assert all(len(chunk) < 40_000 for chunk in chunks)
+
+    rows = ([i, f"ligne <{i}>\x01", None] for i in range(5000))
+    chunks = list(stream_xlsx(["id", "label", "vide"], rows, flush_rows=500))
+    assert len(chunks) > 2
+    sheet = zipfile.ZipFile(io.BytesIO(b"".join(chunks))).read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert len(re.findall(r"<row ", sheet)) == 5001
+    assert "ligne &lt;4999&gt;</t>" in sheet
+    assert [column_letter(i) for i in (0, 25, 26, 701, 702)] == ["A", "Z", "AA", "ZZ", "AAA"]
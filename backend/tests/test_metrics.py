@@ -0,0 +1,87 @@
+import os
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import app.main as main  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.services.payment_generation_service import generate_monthly_payments  # noqa: E402
+from app.utils import metrics  # noqa: E402
+from app.utils.metrics import Histogram, MetricsMiddleware, MetricsRegistry, track_job  # noqa: E402
+
+
+def _sample(text: str, prefix: str) -> float:
+    return float(next(line for line in text.splitlines() if line.startswith(prefix)).rsplit(" ", 1)[1])
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("demo_seconds", "Démo.", ("route",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, route='/a"b')
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{route="/a\\"b",le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{route="/a\\"b",le="1"} 3' in text
+    assert 'demo_seconds_bucket{route="/a\\"b",le="+Inf"} 4' in text
+    assert 'demo_seconds_count{route="/a\\"b"} 4' in text
+    assert _sample(text, 'demo_seconds_sum{route="/a\\"b"}') == pytest.approx(3.65)
+    with pytest.raises(ValueError):
+        registry.register(Histogram("demo_seconds", "Doublon."))
+
+
+def test_requests_are_labelled_by_route_template():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {"id": item_id, "in_flight": metrics.http_requests_in_flight.value()}
+
+    app.add_middleware(MetricsMiddleware)
+    http = TestClient(app)
+    before = metrics.http_request_duration.count(method="GET", route="/items/{item_id}", status="200")
+    assert http.get("/items/1").json()["in_flight"] >= 1
+    http.get("/items/2")
+    http.get("/nowhere")
+    assert metrics.http_request_duration.count(method="GET", route="/items/{item_id}", status="200") == before + 2
+    assert metrics.http_request_duration.count(method="GET", route="unmatched", status="404") >= 1
+    assert metrics.http_requests_in_flight.value() == 0
+
+
+def test_jobs_and_pool_are_exposed_on_metrics_endpoint(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    Base.metadata.create_all(bind=engine)
+    metrics.watch_pool("test", engine.pool)
+    db = sessionmaker(bind=engine)()
+    before = metrics.job_duration.count(job="generate_monthly_payments", outcome="success")
+    try:
+        generate_monthly_payments(db, today=date(2026, 1, 1))
+    finally:
+        db.close()
+    assert metrics.job_duration.count(job="generate_monthly_payments", outcome="success") == before + 1
+
+    with pytest.raises(RuntimeError):
+        with track_job("reminder_loop"):
+            raise RuntimeError("smtp indisponible")
+
+    connection = engine.connect()
+    try:
+        response = TestClient(main.app).get("/metrics")
+    finally:
+        connection.close()
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert _sample(text, 'locatus_db_pool_checked_out{pool="test"}') == 1
+    assert 'locatus_job_duration_seconds_count{job="reminder_loop",outcome="error"}' in text
+    assert "# TYPE locatus_http_request_duration_seconds histogram" in text
+    assert "# TYPE locatus_email_send_failures_total counter" in text
+    assert 'locatus_blocking_executor_tasks{state="queued"}' in text
+    metrics._pools.pop("test")
+    engine.dispose()
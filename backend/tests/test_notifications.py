@@ -0,0 +1,181 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.api import notifications  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.notification import Notification, NotificationType  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.notification_service import notification_bus, unread_count  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+from app.utils.user_cache import get_user_cache  # noqa: E402
+
+
+@pytest.fixture()
+def env():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add_all([
+        User(email="owner@example.com", hashed_password="x", first_name="O", last_name="W", role=UserRole.LANDLORD),
+        User(email="other@example.com", hashed_password="x", first_name="A", last_name="B", role=UserRole.LANDLORD),
+    ])
+    db.commit()
+    db.close()
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(notifications.router)
+    app.dependency_overrides[get_db] = override
+    get_user_cache().clear()
+    yield TestClient(app), Session, engine
+    get_user_cache().clear()
+    engine.dispose()
+
+
+HEADERS = {"Authorization": f"Bearer {create_access_token('owner@example.com')}"}
+
+
+def _notify(Session, user_id=1, count=1):
+    db = Session()
+    db.add_all(Notification(user_id=user_id, type=NotificationType.GENERAL, title=f"n{i}", message="m") for i in range(count))
+    db.commit()
+    db.close()
+
+
+def test_unread_counter_is_maintained(env):
+    http, Session, engine = env
+    _notify(Session, count=3)
+    _notify(Session, user_id=2)
+    assert http.get("/api/notifications/unread-count", headers=HEADERS).json() == {"unread": 3}
+
+    first = http.get("/api/notifications/", headers=HEADERS).json()[0]
+    assert http.put(f"/api/notifications/{first['id']}/read", headers=HEADERS).status_code == 200
+    http.put(f"/api/notifications/{first['id']}/read", headers=HEADERS)  # idempotent
+    assert http.get("/api/notifications/unread-count", headers=HEADERS).json() == {"unread": 2}
+
+    updates = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda *args: updates.append(args[2]) if args[2].startswith("UPDATE notifications") else None)
+    assert http.put("/api/notifications/read-all", headers=HEADERS).json() == {"updated": 2, "unread": 0}
+    assert len(updates) == 1
+    assert http.get("/api/notifications/unread-count", headers=HEADERS).json() == {"unread": 0}
+
+    db = Session()
+    assert unread_count(db, 2) == 1
+    db.close()
+
+
+def test_read_all_covers_legacy_null_rows(env):
+    http, Session, engine = env
+    # Lignes antérieures à la colonne par défaut : is_read NULL, comptées non lues par le backfill
+    with engine.begin() as conn:
+        conn.execute(insert(Notification.__table__), [
+            {"user_id": 1, "type": NotificationType.GENERAL.value, "title": "ancienne", "message": "m", "is_read": None},
+        ])
+        conn.execute(update(User.__table__).where(User.id == 1).values(unread_notification_count=1))
+    assert http.put("/api/notifications/read-all", headers=HEADERS).json() == {"updated": 1, "unread": 0}
+    db = Session()
+    assert db.query(Notification).filter(Notification.is_read.isnot(True)).count() == 0
+    db.close()
+
+
+def test_read_all_keeps_notifications_committed_meanwhile(env):
+    http, Session, engine = env
+    _notify(Session, count=2)
+    # Incrément d'une notification commitée entre l'UPDATE des notifications et celui du compteur
+    with engine.begin() as conn:
+        conn.execute(update(User.__table__).where(User.id == 1).values(unread_notification_count=3))
+    assert http.put("/api/notifications/read-all", headers=HEADERS).json() == {"updated": 2, "unread": 1}
+
+
+def test_notifications_cursor_pagination(env):
+    http, Session, _ = env
+    # Dates explicites : CURRENT_TIMESTAMP de SQLite n'a ni la précision ni le format
+    # des datetimes liés par SQLAlchemy, ce qui fausserait la comparaison des ex aequo
+    base = datetime(2024, 1, 1, 12, 0)
+    db = Session()
+    db.add_all(
+        Notification(user_id=1, type=NotificationType.GENERAL, title=f"n{i}", message="m",
+                     created_at=base + timedelta(minutes=i // 2))
+        for i in range(7)
+    )
+    db.commit()
+    db.close()
+    ids, cursor = [], ""
+    for _ in range(10):
+        if cursor is None:
+            break
+        body = http.get("/api/notifications/", params={"cursor": cursor, "limit": 3}, headers=HEADERS).json()
+        ids.extend(n["id"] for n in body["items"])
+        cursor = body["next_cursor"]
+    assert sorted(ids, reverse=True) == ids and len(ids) == 7
+
+
+def test_committed_notifications_are_published(env):
+    _, Session, _ = env
+
+    async def scenario():
+        subscription = notification_bus.subscribe(1)
+        loop = asyncio.get_running_loop()
+        try:
+            def rolled_back():
+                db = Session()
+                db.add(Notification(user_id=1, type=NotificationType.GENERAL, title="annulée", message="m"))
+                db.flush()
+                db.rollback()
+                db.close()
+
+            await loop.run_in_executor(None, rolled_back)
+            await loop.run_in_executor(None, _notify, Session)
+            return await asyncio.wait_for(subscription.get(), timeout=2)
+        finally:
+            notification_bus.unsubscribe(subscription)
+
+    payload = asyncio.run(scenario())
+    assert payload["title"] == "n0" and payload["user_id"] == 1 and payload["is_read"] is False
+    assert notification_bus.subscriber_count() == 0
+
+
+def test_stream_pushes_new_notifications(env):
+    _, Session, _ = env
+    _notify(Session, count=2)
+
+    class FakeRequest:
+        async def is_disconnected(self):
+            return False
+
+    async def scenario():
+        db = Session()
+        user = db.query(User).filter(User.id == 1).one()
+        response = await notifications.stream_notifications(FakeRequest(), db=db, current_user=user)
+        chunks = response.body_iterator
+        first = await chunks.__anext__()
+        await asyncio.get_running_loop().run_in_executor(None, _notify, Session)
+        second = await asyncio.wait_for(chunks.__anext__(), timeout=2)
+        await chunks.aclose()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.startswith("event: unread_count") and json.loads(first.split("data: ")[1]) == {"unread": 2}
+    assert second.startswith("event: notification")
+    assert json.loads(second.split("data: ")[1])["title"] == "n0"
+    assert notification_bus.subscriber_count() == 0
@@ -0,0 +1,134 @@
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.api import leases, maintenance, payments, properties, tenants  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.maintenance import MaintenanceRequest, MaintenanceType  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.utils.pagination import decode_cursor, encode_cursor  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+from app.utils.user_cache import get_user_cache  # noqa: E402
+
+
+def test_cursor_round_trip():
+    values = [date(2026, 1, 5), datetime(2026, 1, 5, 10, 30), 42, "x"]
+    assert decode_cursor(encode_cursor(values), 4) == values
+
+
+@pytest.fixture()
+def client():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    owner = User(email="owner@example.com", hashed_password="x", first_name="O", last_name="W", role=UserRole.LANDLORD)
+    db.add(owner)
+    db.flush()
+    base = datetime(2026, 1, 1, 12, 0)
+    for i in range(6):
+        user = User(email=f"t{i}@example.com", hashed_password="x", first_name="T", last_name=str(i))
+        prop = Property(owner_id=owner.id, title=f"Bien {i}", address="r", city="Paris",
+                        property_type=PropertyType.APARTMENT, rent_amount=500, status=PropertyStatus.OCCUPIED)
+        db.add_all([user, prop])
+        db.flush()
+        tenant = Tenant(user_id=user.id)
+        db.add(tenant)
+        db.flush()
+        lease = Lease(property_id=prop.id, tenant_id=tenant.id, start_date=date(2025, 1, 1), rent_amount=500,
+                      status=LeaseStatus.ACTIVE)
+        db.add(lease)
+        db.flush()
+        # échéances identiques d'un bail à l'autre : l'id départage
+        db.add_all(Payment(lease_id=lease.id, amount=500, due_date=date(2026, m, 5), status=PaymentStatus.PENDING)
+                   for m in range(1, 5))
+        db.add_all(MaintenanceRequest(property_id=prop.id, tenant_id=tenant.id, type=MaintenanceType.OTHER,
+                                      description="d", created_at=base + timedelta(hours=i % 3))
+                   for _ in range(2))
+    db.commit()
+    db.close()
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(payments.router)
+    app.include_router(maintenance.router)
+    for module in (properties, tenants, leases):
+        app.include_router(module.router, prefix="/api")
+    app.dependency_overrides[get_db] = override
+    get_user_cache().clear()
+    yield TestClient(app), Session
+    get_user_cache().clear()
+    engine.dispose()
+
+
+HEADERS = {"Authorization": f"Bearer {create_access_token('owner@example.com')}"}
+
+
+def _walk(http, path, limit):
+    ids, cursor, pages = [], "", 0
+    while cursor is not None:
+        response = http.get(path, params={"cursor": cursor, "limit": limit}, headers=HEADERS)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        ids.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+        pages += 1
+    return ids, pages
+
+
+@pytest.mark.parametrize(
+    "path, total",
+    [
+        ("/api/payments/", 24),
+        ("/api/maintenance/", 12),
+        ("/api/properties/", 6),
+        ("/api/tenants/", 6),
+        ("/api/leases/", 6),
+    ],
+)
+def test_cursor_pages_match_offset_order(client, path, total):
+    http, _ = client
+    everything = [item["id"] for item in http.get(path, params={"limit": 500}, headers=HEADERS).json()]
+    assert len(everything) == total
+    ids, pages = _walk(http, path, limit=5)
+    assert ids == everything
+    assert pages == -(-total // 5)
+
+
+def test_inserts_between_pages_do_not_shift_results(client):
+    http, Session = client
+    first = http.get("/api/payments/", params={"cursor": "", "limit": 10}, headers=HEADERS).json()
+
+    db = Session()
+    db.add(Payment(lease_id=1, amount=500, due_date=date(2026, 12, 5), status=PaymentStatus.PENDING))
+    db.commit()
+    db.close()
+
+    second = http.get("/api/payments/", params={"cursor": first["next_cursor"], "limit": 10}, headers=HEADERS).json()
+    seen = [p["id"] for p in first["items"]] + [p["id"] for p in second["items"]]
+    assert len(seen) == len(set(seen)) == 20
+
+
+def test_invalid_cursor_is_rejected(client):
+    http, _ = client
+    response = http.get("/api/payments/", params={"cursor": "not-a-cursor"}, headers=HEADERS)
+    assert response.status_code == 400
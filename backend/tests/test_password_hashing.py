@@ -0,0 +1,102 @@
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.api import auth, tenants  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.utils.security import _crypt_context, create_access_token  # noqa: E402
+from app.utils.user_cache import get_user_cache  # noqa: E402
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(
+        User(
+            email="owner@example.com",
+            hashed_password=_crypt_context(4).hash("secret123"),
+            first_name="O",
+            last_name="W",
+            role=UserRole.LANDLORD,
+        )
+    )
+    db.commit()
+    db.close()
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.include_router(tenants.router, prefix="/api")
+    app.dependency_overrides[get_db] = override
+    get_user_cache().clear()
+    yield TestClient(app), Session
+    get_user_cache().clear()
+    engine.dispose()
+
+
+def _stored_hash(Session, email):
+    db = Session()
+    try:
+        return db.query(User).filter(User.email == email).one().hashed_password
+    finally:
+        db.close()
+
+
+def test_login_rehashes_when_cost_changes(client):
+    http, Session = client
+    assert _stored_hash(Session, "owner@example.com").startswith("$2b$04$")
+
+    bad = http.post("/api/auth/login", data={"username": "owner@example.com", "password": "nope"})
+    assert bad.status_code == 401
+    assert _stored_hash(Session, "owner@example.com").startswith("$2b$04$")
+
+    ok = http.post("/api/auth/login", data={"username": "owner@example.com", "password": "secret123"})
+    assert ok.status_code == 200, ok.text
+    rehashed = _stored_hash(Session, "owner@example.com")
+    assert rehashed.startswith("$2b$05$")
+    assert _crypt_context(5).verify("secret123", rehashed)
+
+
+def test_unknown_user_is_rejected(client):
+    http, _ = client
+    response = http.post("/api/auth/login", data={"username": "ghost@example.com", "password": "x"})
+    assert response.status_code == 401
+
+
+def test_tenant_password_is_hashed_with_configured_cost(client):
+    http, Session = client
+    headers = {"Authorization": f"Bearer {create_access_token('owner@example.com')}"}
+    response = http.post(
+        "/api/tenants/with-user",
+        json={"email": "t@example.com", "password": "tenantpw", "first_name": "T", "last_name": "U"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["user"]["email"] == "t@example.com"
+    stored = _stored_hash(Session, "t@example.com")
+    assert stored.startswith("$2b$05$") and _crypt_context(5).verify("tenantpw", stored)
+
+    tenant_id = response.json()["id"]
+    response = http.put(f"/api/tenants/{tenant_id}", json={"password": "changed"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert _crypt_context(5).verify("changed", _stored_hash(Session, "t@example.com"))
@@ -14,7 +14,10 @@ from app.models.property import Property, PropertyType, PropertyStatus  # noqa:
 from app.models.tenant import Tenant  # noqa: E402
 from app.models.lease import Lease, LeaseStatus  # noqa: E402
 from app.models.payment import Payment  # noqa: E402
-from app.services.payment_generation_service import generate_monthly_payments  # noqa: E402
+from app.services.payment_generation_service import (  # noqa: E402
+    generate_monthly_payments,
+    generate_monthly_payments_bulk,
+)
 
 
 @pytest.fixture()
@@ -94,3 +97,37 @@ def test_generate_creates_next_payment_and_updates_pointer(db_session):
     report2 = generate_monthly_payments(db_session, today=today, horizon_days=40)
     assert report2["created"] == 0
     assert db_session.query(Payment).count() == 1
+
+
+def test_bulk_generation_matches_report_and_is_idempotent(db_session):
+    lease = seed(db_session)
+    second = Lease(
+        property_id=lease.property_id,
+        tenant_id=lease.tenant_id,
+        start_date=date(2024, 1, 1),
+        rent_amount=700,
+        charges=0,
+        payment_day=20,
+        status=LeaseStatus.ACTIVE,
+    )
+    db_session.add(second)
+    db_session.add(Payment(lease_id=lease.id, amount=550, due_date=date(2024, 1, 15)))
+    db_session.commit()
+    today = date(2024, 1, 10)
+
+    # chunk_size=1 : un paquet par bail
+    report = generate_monthly_payments_bulk(db_session, today=today, horizon_days=40, chunk_size=1)
+    assert report["count"] == 2
+    assert report["created"] == 1
+    assert report["skipped"] == 1
+    assert {entry["status"] for entry in report["log"]} == {"already_planned", "created"}
+
+    created = db_session.query(Payment).filter(Payment.lease_id == second.id).one()
+    assert created.due_date == date(2024, 1, 20)
+    assert created.amount == 700
+    db_session.refresh(second)
+    assert second.next_due_date == date(2024, 2, 20)
+
+    report2 = generate_monthly_payments_bulk(db_session, today=today, horizon_days=40, chunk_size=1)
+    assert report2["created"] == 0
+    assert db_session.query(Payment).count() == 2
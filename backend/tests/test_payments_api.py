@@ -0,0 +1,90 @@
+import os
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.api import payments  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+from app.utils.user_cache import get_user_cache  # noqa: E402
+
+HEADERS = {"Authorization": f"Bearer {create_access_token('owner@example.com')}"}
+
+
+@pytest.fixture()
+def client():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    owner = User(email="owner@example.com", hashed_password="x", first_name="O", last_name="W", role=UserRole.LANDLORD)
+    user = User(email="t@example.com", hashed_password="x", first_name="T", last_name="T")
+    db.add_all([owner, user])
+    db.flush()
+    prop = Property(owner_id=owner.id, title="Bien", address="r", city="Dakar",
+                    property_type=PropertyType.APARTMENT, rent_amount=500, status=PropertyStatus.OCCUPIED)
+    tenant = Tenant(user_id=user.id)
+    db.add_all([prop, tenant])
+    db.flush()
+    db.add(Lease(property_id=prop.id, tenant_id=tenant.id, start_date=date(2026, 1, 1), rent_amount=500,
+                 status=LeaseStatus.ACTIVE))
+    db.commit()
+    db.close()
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(payments.router)
+    app.dependency_overrides[get_db] = override
+    get_user_cache().clear()
+    yield TestClient(app), Session
+    get_user_cache().clear()
+    engine.dispose()
+
+
+def test_duplicate_due_date_is_a_conflict(client):
+    http, _ = client
+    body = {"lease_id": 1, "amount": 500, "due_date": "2026-02-05"}
+    assert http.post("/api/payments/", json=body, headers=HEADERS).status_code == 200
+    response = http.post("/api/payments/", json=body, headers=HEADERS)
+    assert response.status_code == 409
+
+
+def test_confirm_reuses_the_payment_due_today(client, monkeypatch):
+    http, Session = client
+    db = Session()
+    db.add(Payment(lease_id=1, amount=500, due_date=date.today(), status=PaymentStatus.PAID, payment_date=date.today()))
+    db.commit()
+    db.close()
+    session = SimpleNamespace(
+        payment_status="paid", status="complete", payment_intent=SimpleNamespace(id="pi_1", status="succeeded", metadata={}),
+        metadata={"lease_id": "1"}, client_reference_id=None, amount_total=500, currency="xaf",
+    )
+    monkeypatch.setattr(settings, "STRIPE_SECRET_KEY", "sk_test")
+    monkeypatch.setattr(payments.stripe.checkout.Session, "retrieve", lambda *args, **kwargs: session)
+
+    response = http.post("/api/payments/confirm", json={"checkout_session_id": "cs_1"})
+    assert response.status_code == 200, response.text
+    db = Session()
+    assert db.query(Payment).count() == 1 and response.json()["payment_id"] == db.query(Payment).one().id
+    db.close()
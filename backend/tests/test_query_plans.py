@@ -0,0 +1,224 @@
+"""
+Vérifie que les requêtes des chemins chauds passent par des index.
+
+Chaque SELECT exécuté par les routes / services ci-dessous est d'abord passé à EXPLAIN
+sur un jeu de données volumineux ; le test échoue si un parcours séquentiel d'une
+table apparaît. Par défaut SQLite en mémoire ; QUERY_PLAN_DATABASE_URL permet de
+viser une base PostgreSQL jetable (les tables y sont recréées).
+"""
+import os
+import re
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app import main  # noqa: E402
+from app.api import leases, maintenance, notifications, payments, properties, reminders, tenants  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.maintenance import MaintenanceRequest, MaintenanceType  # noqa: E402
+from app.models.notification import Notification, NotificationType  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.reminder_history import ReminderHistory  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.payment_generation_service import generate_monthly_payments_bulk  # noqa: E402
+from app.services.scheduled_reminder_service import get_due_for_today_step  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+from app.utils.user_cache import get_user_cache  # noqa: E402
+
+OWNERS = 40
+PROPERTIES_PER_OWNER = 15
+MONTHS = 24
+
+SEQ_SCAN = {
+    # anon_N : parcours d'une sous-requête déjà matérialisée, pas d'une table ; \b empêche
+    # \w+ de reculer d'un caractère pour contourner le (?! USING) d'un parcours d'index
+    "sqlite": re.compile(r"^SCAN (?!anon_\d)(\w+)\b(?! USING)"),
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+}
+
+
+def _seed(engine) -> None:
+    today = date.today()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"email": f"owner{o}@example.com", "hashed_password": "x", "first_name": "O", "last_name": str(o), "role": UserRole.LANDLORD}
+            for o in range(OWNERS)
+        ])
+        n = OWNERS * PROPERTIES_PER_OWNER
+        conn.execute(insert(User), [
+            {"email": f"t{i}@example.com", "hashed_password": "x", "first_name": "T", "last_name": str(i), "role": UserRole.TENANT}
+            for i in range(n)
+        ])
+        conn.execute(insert(Tenant), [{"user_id": OWNERS + 1 + i} for i in range(n)])
+        conn.execute(insert(Property), [
+            {
+                "owner_id": 1 + i // PROPERTIES_PER_OWNER, "title": f"Bien {i}", "address": "rue", "city": "Paris",
+                "property_type": PropertyType.APARTMENT, "rent_amount": 500, "status": PropertyStatus.OCCUPIED,
+            }
+            for i in range(n)
+        ])
+        conn.execute(insert(Lease), [
+            {
+                "property_id": 1 + i, "tenant_id": 1 + i, "start_date": today - timedelta(days=30 * MONTHS),
+                "rent_amount": 500, "payment_day": 5, "status": LeaseStatus.ACTIVE if i % 5 else LeaseStatus.TERMINATED,
+                "next_due_date": today + timedelta(days=40),
+            }
+            for i in range(n)
+        ])
+        conn.execute(insert(Payment), [
+            {
+                "lease_id": 1 + i, "amount": 500, "due_date": today + timedelta(days=30 * (m - MONTHS + 2)),
+                "status": PaymentStatus.PAID if m < MONTHS - 3 else PaymentStatus.PENDING,
+                "payment_date": today if m < MONTHS - 3 else None,
+            }
+            for i in range(n)
+            for m in range(MONTHS)
+        ])
+        conn.execute(insert(Notification), [
+            {"user_id": 1 + o, "type": NotificationType.GENERAL, "title": "n", "message": "m", "is_read": False}
+            for o in range(OWNERS)
+            for _ in range(50)
+        ])
+        conn.execute(insert(MaintenanceRequest), [
+            {"property_id": 1 + i, "tenant_id": 1 + i, "type": MaintenanceType.OTHER, "description": "fuite"}
+            for i in range(n)
+            for _ in range(3)
+        ])
+        conn.execute(insert(ReminderHistory), [
+            {"key": f"reminder:{1 + i}:{today}:J0", "tenant_id": 1 + i, "due_date": today, "step": "J0"}
+            for i in range(0, n, 3)
+        ])
+        if engine.dialect.name != "sqlite":
+            # SQLite (sans STAT4) ne voit pas l'asymétrie des statuts (majorité "paid") :
+            # ses heuristiques par défaut sont plus proches de la production qu'un ANALYZE.
+            conn.execute(text("ANALYZE"))
+
+
+@pytest.fixture(scope="module")
+def plans():
+    url = os.environ.get("QUERY_PLAN_DATABASE_URL")
+    if url:
+        engine = create_engine(url)
+        Base.metadata.drop_all(bind=engine)
+    else:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    _seed(engine)
+
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    captured = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith("SELECT"):
+            return
+        cursor.execute(prefix + statement, parameters)
+        plan = [row[-1] if engine.dialect.name == "sqlite" else row[0] for row in cursor.fetchall()]
+        captured.append((statement, plan))
+
+    Session = sessionmaker(bind=engine)
+    yield engine, Session, captured
+    engine.dispose()
+
+
+def _primary_key_walk(table: str, statement: str, plan) -> bool:
+    """
+    SQLite note « SCAN t » le parcours de la table dans l'ordre du rowid : avec ORDER BY t.id,
+    LIMIT et sans tri temporaire, c'est la lecture bornée d'une page par clé primaire
+    (« Index Scan using t_pkey » sous PostgreSQL), pas un parcours complet.
+    """
+    flat = " ".join(statement.split())
+    return (
+        f"ORDER BY {table}.id" in flat
+        and " LIMIT " in flat
+        and not any(line.startswith("USE TEMP B-TREE FOR ORDER BY") for line in plan)
+    )
+
+
+def _sequential_scans(dialect: str, captured):
+    pattern = SEQ_SCAN[dialect]
+    found = []
+    for statement, plan in captured:
+        for line in plan:
+            match = pattern.search(line)
+            if match and not (dialect == "sqlite" and _primary_key_walk(match.group(1), statement, plan)):
+                found.append((match.group(1), line, " ".join(statement.split())[:200]))
+    return found
+
+
+@pytest.fixture()
+def client(plans):
+    engine, Session, captured = plans
+
+    def override():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    for module in (payments, reminders, notifications, maintenance):
+        app.include_router(module.router)
+    for module in (leases, properties, tenants):
+        app.include_router(module.router, prefix="/api")
+    app.dependency_overrides[get_db] = override
+    get_user_cache().clear()
+    yield TestClient(app)
+    get_user_cache().clear()
+
+
+ENDPOINTS = [
+    "/api/payments/",
+    "/api/payments/?status=pending",
+    "/api/payments/?cursor=",
+    "/api/payments/export?status=late",
+    "/api/reminders/",
+    "/api/reminders/leases",
+    "/api/leases/",
+    "/api/leases/?status=active",
+    "/api/properties/",
+    "/api/properties/?cursor=",
+    "/api/tenants/",
+    "/api/tenants/?cursor=",
+    "/api/maintenance/",
+    "/api/maintenance/?cursor=",
+    "/api/notifications/",
+]
+
+
+@pytest.mark.parametrize("path", ENDPOINTS)
+def test_endpoint_queries_use_indexes(plans, client, path):
+    engine, _, captured = plans
+    headers = {"Authorization": f"Bearer {create_access_token('owner7@example.com')}"}
+    captured.clear()
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.text
+    assert captured, "aucune requête capturée"
+    assert _sequential_scans(engine.dialect.name, captured) == []
+
+
+def test_batch_job_queries_use_indexes(plans):
+    engine, Session, captured = plans
+    db = Session()
+    try:
+        captured.clear()
+        get_due_for_today_step(date.today(), db)
+        main._pending_reminders_query(db, datetime.utcnow()).all()
+        generate_monthly_payments_bulk(db, chunk_size=200)
+    finally:
+        db.rollback()
+        db.close()
+    assert captured
+    assert _sequential_scans(engine.dialect.name, captured) == []
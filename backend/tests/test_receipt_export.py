@@ -0,0 +1,142 @@
+import io
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.api import payments  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.document_service import DocumentRenderer, receipt_spec  # noqa: E402
+from app.services.receipt_export_service import monthly_receipt_specs, stream_receipts_zip  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+from app.utils.user_cache import get_user_cache  # noqa: E402
+
+HEADERS = {"Authorization": f"Bearer {create_access_token('owner@example.com')}"}
+
+
+@pytest.fixture()
+def env(tmp_path, monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    owner = User(email="owner@example.com", hashed_password="x", first_name="O", last_name="W", role=UserRole.LANDLORD)
+    other = User(email="other@example.com", hashed_password="x", first_name="A", last_name="B", role=UserRole.LANDLORD)
+    tenant_user = User(email="t@example.com", hashed_password="x", first_name="Jean", last_name="Dupont")
+    db.add_all([owner, other, tenant_user])
+    db.flush()
+    tenant = Tenant(user_id=tenant_user.id)
+    mine = Property(owner_id=owner.id, title="Studio", address="r", city="Paris",
+                    property_type=PropertyType.STUDIO, rent_amount=500, status=PropertyStatus.OCCUPIED)
+    theirs = Property(owner_id=other.id, title="Maison", address="r", city="Lyon",
+                      property_type=PropertyType.HOUSE, rent_amount=900, status=PropertyStatus.OCCUPIED)
+    db.add_all([tenant, mine, theirs])
+    db.flush()
+    leases = [
+        Lease(property_id=prop.id, tenant_id=tenant.id, start_date=date(2025, 1, 1), rent_amount=prop.rent_amount,
+              status=LeaseStatus.ACTIVE)
+        for prop in (mine, mine, theirs)
+    ]
+    db.add_all(leases)
+    db.flush()
+    paid = dict(status=PaymentStatus.PAID, payment_date=date(2026, 3, 6))
+    db.add_all([
+        Payment(lease_id=leases[0].id, amount=500, due_date=date(2026, 3, 5), **paid),
+        Payment(lease_id=leases[1].id, amount=450, due_date=date(2026, 3, 31), **paid),
+        Payment(lease_id=leases[0].id, amount=500, due_date=date(2026, 3, 20), status=PaymentStatus.PENDING),
+        Payment(lease_id=leases[0].id, amount=500, due_date=date(2026, 4, 5), **paid),
+        Payment(lease_id=leases[2].id, amount=900, due_date=date(2026, 3, 5), **paid),
+    ])
+    db.commit()
+    db.close()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        renderer = DocumentRenderer(str(tmp_path), executor=pool)
+        monkeypatch.setattr(payments, "document_renderer", renderer)
+
+        def override():
+            session = Session()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app = FastAPI()
+        app.include_router(payments.router)
+        app.dependency_overrides[get_db] = override
+        get_user_cache().clear()
+        yield TestClient(app), renderer, Session
+        get_user_cache().clear()
+    engine.dispose()
+
+
+def test_export_streams_owner_receipts_for_the_month(env):
+    http, renderer, _ = env
+    existing = renderer.ensure(receipt_spec(1, 500, "Jean Dupont", "Studio", date(2026, 3, 6)))
+    before = os.stat(existing).st_mtime_ns
+
+    response = http.get("/api/payments/receipts/export", params={"month": "2026-03"}, headers=HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert 'filename="quittances-2026-03.zip"' in response.headers["content-disposition"]
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.namelist() == ["quittance-1.pdf", "quittance-2.pdf"]
+    assert all(archive.read(name).startswith(b"%PDF") for name in archive.namelist())
+    # Quittance déjà produite : réutilisée telle quelle, une seule nouvelle à rendre
+    assert os.stat(existing).st_mtime_ns == before
+    assert renderer.stats()["renders"] == 2
+
+
+def test_export_reuses_legacy_receipt_files(env, tmp_path):
+    http, renderer, _ = env
+    (tmp_path / "receipt-2.pdf").write_bytes(b"%PDF-legacy")
+
+    response = http.get("/api/payments/receipts/export", params={"month": "2026-03"}, headers=HEADERS)
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.read("quittance-2.pdf") == b"%PDF-legacy"
+    assert renderer.stats()["renders"] == 1
+
+
+def test_receipt_date_is_stable_for_payments_without_payment_date(env):
+    http, _, Session = env
+    db = Session()
+    db.get(Payment, 1).payment_date = None
+    db.commit()
+    specs = list(monthly_receipt_specs(db, 1, "2026-03"))
+    db.close()
+    assert [(spec.payment_id, spec.issued_on) for spec in specs] == [(1, date(2026, 3, 5)), (2, date(2026, 3, 6))]
+
+    # Un paiement marqué payé reçoit sa date d'encaissement
+    response = http.put("/api/payments/3", json={"status": "paid"}, headers=HEADERS)
+    assert response.status_code == 200, response.text
+    assert response.json()["payment_date"] == date.today().isoformat()
+
+
+def test_export_rejects_invalid_month(env):
+    http, _, _ = env
+    assert http.get("/api/payments/receipts/export", params={"month": "2026-13"}, headers=HEADERS).status_code == 422
+
+
+def test_zip_is_emitted_incrementally(env):
+    _, renderer, _ = env
+    specs = [receipt_spec(i, 100 + i, "Jean Dupont", "Studio", date(2026, 3, 6)) for i in range(1, 6)]
+    chunks = list(stream_receipts_zip(specs, renderer))
+    # Un morceau par document puis le répertoire central : l'archive n'est jamais entière en mémoire
+    assert len(chunks) == len(specs) + 1
+    assert zipfile.ZipFile(io.BytesIO(b"".join(chunks))).testzip() is None
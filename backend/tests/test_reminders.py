@@ -0,0 +1,113 @@
+import os
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.api import reminders  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+from app.utils.user_cache import get_user_cache  # noqa: E402
+
+HEADERS = {"Authorization": f"Bearer {create_access_token('owner@example.com')}"}
+LEASES = 6
+
+
+@pytest.fixture()
+def env(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    owner = User(email="owner@example.com", hashed_password="x", first_name="O", last_name="W", role=UserRole.LANDLORD)
+    tenant_user = User(email="t@example.com", hashed_password="x", first_name="T", last_name="U")
+    db.add_all([owner, tenant_user])
+    db.flush()
+    tenant = Tenant(user_id=tenant_user.id)
+    db.add(tenant)
+    for i in range(LEASES):
+        prop = Property(owner_id=owner.id, title=f"Bien {i}", address="r", city="Paris",
+                        property_type=PropertyType.APARTMENT, rent_amount=500, status=PropertyStatus.OCCUPIED)
+        db.add(prop)
+        db.flush()
+        lease = Lease(property_id=prop.id, tenant_id=tenant.id, start_date=date(2025, 1, 1),
+                      end_date=date(2027, 1, 1 + i), rent_amount=500 + i, status=LeaseStatus.ACTIVE)
+        db.add(lease)
+        db.flush()
+        if i % 2 == 0:
+            db.add_all([
+                Payment(lease_id=lease.id, amount=100 + i, due_date=date(2026, 2, 5), status=PaymentStatus.PAID),
+                Payment(lease_id=lease.id, amount=300 + i, due_date=date(2026, 4, 5), status=PaymentStatus.PENDING),
+                Payment(lease_id=lease.id, amount=200 + i, due_date=date(2026, 3, 5), status=PaymentStatus.LATE),
+            ])
+    db.commit()
+    db.close()
+
+    calls = []
+
+    def fake_checkout(**kwargs):
+        calls.append(kwargs)
+        return f"https://checkout.test/{len(calls)}"
+
+    monkeypatch.setattr(reminders, "create_checkout_session", fake_checkout)
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(reminders.router)
+    app.dependency_overrides[get_db] = override
+    get_user_cache().clear()
+    yield TestClient(app), engine, calls
+    get_user_cache().clear()
+    engine.dispose()
+
+
+def test_lease_reminders_use_one_query_and_no_stripe_call(env):
+    http, engine, calls = env
+    selects = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda *args: selects.append(args[2]) if args[2].lstrip().startswith("SELECT") else None)
+
+    body = http.get("/api/reminders/leases", headers=HEADERS).json()
+
+    assert len(body) == LEASES
+    assert [r["end_date"] for r in body] == sorted(r["end_date"] for r in body)
+    assert calls == []
+    # Une requête pour l'utilisateur authentifié, une pour la liste
+    assert len(selects) == 2
+    with_payment = [r for r in body if r["payment_id"]]
+    assert len(with_payment) == LEASES // 2
+    # Plus ancienne échéance ouverte (le retard de mars, pas avril ni le payé de février)
+    assert all(r["amount_due"] == 200 + (r["lease_id"] - 1) for r in with_payment)
+    assert all(r["amount_due"] == r["rent_amount"] for r in body if not r["payment_id"])
+
+
+def test_checkout_link_is_created_on_demand(env):
+    http, _, calls = env
+    response = http.post("/api/reminders/leases/1/checkout", headers=HEADERS)
+    assert response.status_code == 200
+    assert response.json()["url"] == "https://checkout.test/1"
+    assert len(calls) == 1
+    assert calls[0]["amount"] == 200
+    assert calls[0]["metadata"] == {"lease_id": 1, "payment_id": response.json()["payment_id"]}
+
+    assert http.post("/api/reminders/leases/2/checkout", headers=HEADERS).json()["payment_id"] is None
+    assert calls[1]["amount"] == 501
+    assert http.post("/api/reminders/leases/999/checkout", headers=HEADERS).status_code == 404
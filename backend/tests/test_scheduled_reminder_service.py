@@ -17,7 +17,7 @@ from app.models.tenant import Tenant  # noqa: E402
 from app.models.lease import Lease, LeaseStatus  # noqa: E402
 from app.models.payment import Payment, PaymentStatus  # noqa: E402
 from app.models.reminder_history import ReminderHistory  # noqa: E402
-from app.services.scheduled_reminder_service import run_scheduled  # noqa: E402
+from app.services.scheduled_reminder_service import get_due_for_today_step, run_scheduled  # noqa: E402
 
 
 @pytest.fixture()
@@ -102,20 +102,71 @@ def test_run_scheduled_sends_once_and_tracks_history(db_session, monkeypatch):
     today = date(2024, 1, 10)
     sent = []
 
-    def fake_send_email(to_email, subject, content, html_content=None):
-        sent.append({"to": to_email, "subject": subject})
-        return True, None
+    class FakeSender:
+        def __init__(self, rate_limiters=None):
+            pass
 
-    monkeypatch.setattr("app.services.scheduled_reminder_service.send_email", fake_send_email)
+        def send(self, to_email, subject, content, html_content=None):
+            sent.append({"to": to_email, "subject": subject})
+            return True, None
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr("app.services.email_dispatch_service.EmailSender", FakeSender)
 
     report = run_scheduled(db_session, today=today)
     assert report["sent"] == 1
     assert len(sent) == 1
     assert db_session.query(ReminderHistory).count() == 1
 
-    # Second run should not resend the same reminder
+    # Second run should not resend the same reminder (excluded by the candidate query)
     report2 = run_scheduled(db_session, today=today)
     assert report2["sent"] == 0
-    assert report2["skipped_duplicate"] == 1
+    assert report2["count"] == 0
     assert len(sent) == 1
     assert db_session.query(ReminderHistory).count() == 1
+
+
+def test_same_tenant_due_twice_gets_one_reminder_per_run(db_session, monkeypatch):
+    lease, _ = seed(db_session)
+    # Second bail du même locataire, même échéance
+    second = Lease(property_id=lease.property_id, tenant_id=lease.tenant_id, start_date=date(2024, 1, 1),
+                   rent_amount=300, status=LeaseStatus.ACTIVE)
+    db_session.add(second)
+    db_session.flush()
+    db_session.add(Payment(lease_id=second.id, amount=300, due_date=date(2024, 1, 10), status=PaymentStatus.PENDING))
+    db_session.commit()
+    sent = []
+
+    class FakeSender:
+        def __init__(self, rate_limiters=None):
+            pass
+
+        def send(self, to_email, subject, content, html_content=None):
+            sent.append(to_email)
+            return True, None
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr("app.services.email_dispatch_service.EmailSender", FakeSender)
+
+    report = run_scheduled(db_session, today=date(2024, 1, 10))
+    assert report["count"] == 1 and report["sent"] == 1 and report["skipped_duplicate"] == 1
+    assert sent == ["tenant@example.com"]
+    assert db_session.query(ReminderHistory).count() == 1
+
+
+def test_candidates_are_filtered_in_sql(db_session):
+    lease, payment = seed(db_session)
+    # Hors fenêtre (J+5) : jamais candidat
+    db_session.add(Payment(lease_id=lease.id, amount=550, due_date=date(2024, 1, 15), status=PaymentStatus.PENDING))
+    db_session.commit()
+
+    candidates = get_due_for_today_step(date(2024, 1, 10), db_session)
+    assert [(c.payment_id, step) for c, step in candidates] == [(payment.id, "J0")]
+
+    # J-2 pour l'échéance du 15
+    candidates = get_due_for_today_step(date(2024, 1, 13), db_session)
+    assert [step for _, step in candidates] == ["J-2"]
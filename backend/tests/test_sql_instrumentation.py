@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.config import settings  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.utils.sql_instrumentation import (  # noqa: E402
+    NPlusOneError,
+    SQLInstrumentationMiddleware,
+    statement_shape,
+    track_queries,
+)
+
+
+@pytest.fixture()
+def env():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"email": f"u{i}@example.com", "hashed_password": "x", "first_name": "U", "last_name": str(i), "role": UserRole.TENANT}
+            for i in range(20)
+        ])
+    SessionLocal = sessionmaker(bind=engine)
+
+    def override():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/users")
+    def list_users(db: Session = Depends(get_db)):
+        return [user.email for user in db.execute(select(User)).scalars()]
+
+    @app.get("/users/one-by-one")
+    def list_users_one_by_one(db: Session = Depends(get_db)):
+        ids = db.execute(select(User.id)).scalars().all()
+        return [db.execute(select(User.email).where(User.id == user_id)).scalar_one() for user_id in ids]
+
+    app.add_middleware(SQLInstrumentationMiddleware)
+    app.dependency_overrides[get_db] = override
+    yield TestClient(app), engine
+    engine.dispose()
+
+
+def _timing(response):
+    return dict(part.strip().split(";", 1) for part in response.headers["server-timing"].split(","))
+
+
+def test_server_timing_reports_queries_and_db_time(env, caplog):
+    http, _ = env
+    with caplog.at_level(logging.INFO, logger="locatus.sql"):
+        response = http.get("/users")
+    assert response.status_code == 200
+    metrics = _timing(response)
+    assert 'desc="1 queries"' in metrics["db"] and metrics["app"].startswith("dur=")
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["path"] == "/users" and record["status"] == 200 and record["queries"] == 1
+    assert caplog.records[-1].levelno == logging.INFO and "n_plus_one" not in record
+
+
+def test_repeated_select_shape_is_flagged_as_n_plus_one(env, caplog, monkeypatch):
+    http, _ = env
+    with caplog.at_level(logging.INFO, logger="locatus.sql"):
+        response = http.get("/users/one-by-one")
+    assert response.status_code == 200
+    assert 'desc="21 queries"' in _timing(response)["db"]
+    record = json.loads(caplog.records[-1].getMessage())
+    assert caplog.records[-1].levelno == logging.WARNING
+    assert record["n_plus_one"][0]["count"] == 20 and "WHERE users.id = ?" in record["n_plus_one"][0]["statement"]
+
+    # Mode test : la requête échoue au lieu de répondre
+    monkeypatch.setattr(settings, "SQL_N_PLUS_ONE_RAISE", True)
+    with pytest.raises(NPlusOneError):
+        http.get("/users/one-by-one")
+    assert http.get("/users").status_code == 200
+
+
+def test_slow_statements_and_tracking_outside_requests(env, monkeypatch):
+    _, engine = env
+    monkeypatch.setattr(settings, "SQL_SLOW_QUERY_MS", 0.0)
+    with track_queries() as stats, Session(bind=engine) as db:
+        db.execute(select(User).where(User.id.in_([1, 2, 3]))).all()
+        db.execute(select(User).where(User.id.in_([4, 5]))).all()
+    assert stats.query_count == 2 and stats.db_time > 0
+    assert len(stats.slow) == 2 and stats.slow[0][1].startswith("SELECT")
+    # Listes IN de longueurs différentes : même forme
+    assert len(stats.shapes) == 1
+    assert statement_shape("SELECT a FROM t WHERE id IN (?, ?,\n ?) LIMIT 10") == "SELECT a FROM t WHERE id IN (?) LIMIT ?"
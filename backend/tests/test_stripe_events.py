@@ -0,0 +1,153 @@
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.api import stripe_webhook  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.email_outbox import EmailOutbox  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.notification import Notification  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus, PropertyType  # noqa: E402
+from app.models.stripe_event import StripeEvent, StripeEventStatus  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services import stripe_event_service  # noqa: E402
+from app.services.stripe_event_service import process_stripe_events_batch, stripe_event_stats  # noqa: E402
+
+
+def _event(event_id, payment_id, created, event_type="checkout.session.completed"):
+    obj = {"metadata": {"payment_id": str(payment_id)}, "payment_intent": f"pi_{event_id}"}
+    if event_type == "payment_intent.succeeded":
+        obj = {"id": f"pi_{event_id}", "metadata": {"payment_id": str(payment_id)}}
+    return {"id": event_id, "type": event_type, "created": created, "data": {"object": obj}}
+
+
+@pytest.fixture()
+def env(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    owner = User(email="owner@example.com", hashed_password="x", first_name="O", last_name="W", role=UserRole.LANDLORD)
+    tenant_user = User(email="t@example.com", hashed_password="x", first_name="T", last_name="U")
+    db.add_all([owner, tenant_user])
+    db.flush()
+    tenant = Tenant(user_id=tenant_user.id)
+    prop = Property(owner_id=owner.id, title="Bien", address="r", city="Paris",
+                    property_type=PropertyType.APARTMENT, rent_amount=500, status=PropertyStatus.OCCUPIED)
+    db.add_all([tenant, prop])
+    db.flush()
+    lease = Lease(property_id=prop.id, tenant_id=tenant.id, start_date=date(2025, 1, 1), rent_amount=500,
+                  status=LeaseStatus.ACTIVE)
+    db.add(lease)
+    db.flush()
+    db.add_all([
+        Payment(lease_id=lease.id, amount=500, due_date=date(2026, 3, 5), status=PaymentStatus.PENDING),
+        Payment(lease_id=lease.id, amount=500, due_date=date(2026, 4, 5), status=PaymentStatus.PENDING),
+    ])
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(stripe_event_service.document_renderer, "request", lambda spec: spec.url)
+    monkeypatch.setattr(stripe_webhook.stripe.Webhook, "construct_event", lambda payload, sig, secret: json.loads(payload))
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(stripe_webhook.router)
+    app.dependency_overrides[get_db] = override
+    yield TestClient(app), Session
+    engine.dispose()
+
+
+def test_webhook_records_and_dedupes_without_processing(env):
+    http, Session = env
+    body = json.dumps(_event("evt_1", 1, 100))
+    assert http.post("/api/stripe/webhook", content=body).json() == {"received": True, "duplicate": False}
+    assert http.post("/api/stripe/webhook", content=body).json() == {"received": True, "duplicate": True}
+    ignored = json.dumps({"id": "evt_x", "type": "customer.created", "data": {"object": {}}})
+    assert http.post("/api/stripe/webhook", content=ignored).json() == {"received": True}
+
+    db = Session()
+    events = db.query(StripeEvent).all()
+    assert [(e.id, e.ordering_key, e.status) for e in events] == [("evt_1", "payment:1", StripeEventStatus.PENDING)]
+    # Rien n'est traité dans la requête
+    assert db.get(Payment, 1).status == PaymentStatus.PENDING
+    assert db.query(EmailOutbox).count() == 0
+    db.close()
+
+
+def test_consumer_processes_batch_in_one_commit(env):
+    http, Session = env
+    for payload in (_event("evt_b", 2, 200, "payment_intent.succeeded"), _event("evt_a", 1, 100)):
+        http.post("/api/stripe/webhook", content=json.dumps(payload))
+
+    db = Session()
+    commits = []
+    event.listen(db.get_bind(), "commit", lambda conn: commits.append(1))
+    stats = process_stripe_events_batch(db)
+    assert stats == {"claimed": 2, "processed": 2, "retried": 0, "failed": 0, "deferred": 0}
+    assert len(commits) == 1
+    assert [p.status for p in db.query(Payment).order_by(Payment.id)] == [PaymentStatus.PAID, PaymentStatus.PAID]
+    assert db.get(Payment, 2).transaction_reference == "pi_evt_b"
+    assert db.query(EmailOutbox).count() == 4
+    assert db.query(Notification).count() == 2
+    assert process_stripe_events_batch(db)["claimed"] == 0
+    db.close()
+
+
+def test_failed_event_defers_later_events_of_same_payment(env, monkeypatch):
+    http, Session = env
+    for payload in (_event("evt_1", 1, 100), _event("evt_2", 1, 101), _event("evt_3", 2, 102)):
+        http.post("/api/stripe/webhook", content=json.dumps(payload))
+
+    applied = []
+    original = stripe_event_service.apply_event
+
+    def flaky(db, payload):
+        if payload["id"] == "evt_1":
+            raise RuntimeError("boom")
+        applied.append(payload["id"])
+        original(db, payload)
+
+    monkeypatch.setattr(stripe_event_service, "apply_event", flaky)
+    monkeypatch.setattr(stripe_event_service.settings, "STRIPE_EVENTS_MAX_ATTEMPTS", 2)
+    db = Session()
+    assert process_stripe_events_batch(db) == {"claimed": 3, "processed": 1, "retried": 1, "failed": 0, "deferred": 1}
+    assert applied == ["evt_3"]
+    assert db.get(StripeEvent, "evt_1").last_error == "boom"
+
+    # Dernière tentative : evt_1 passe en échec, evt_2 peut enfin être traité
+    assert process_stripe_events_batch(db) == {"claimed": 2, "processed": 1, "retried": 0, "failed": 1, "deferred": 0}
+    assert applied == ["evt_3", "evt_2"]
+    db.close()
+
+
+def test_stats_report_backlog_and_lag(env):
+    http, Session = env
+    http.post("/api/stripe/webhook", content=json.dumps(_event("evt_1", 1, 100)))
+    db = Session()
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    stats = stripe_event_stats(db, now=later)
+    assert stats["backlog"] == 1 and stats["depth"]["pending"] == 1
+    assert stats["lag_seconds"] >= 29
+    process_stripe_events_batch(db)
+    stats = stripe_event_stats(db)
+    assert stats["backlog"] == 0 and stats["lag_seconds"] == 0 and stats["processed_last_minute"] == 1
+    db.close()
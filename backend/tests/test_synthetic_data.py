@@ -0,0 +1,112 @@
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import synthetic_data  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.models.lease import Lease, LeaseStatus  # noqa: E402
+from app.models.notification import Notification  # noqa: E402
+from app.models.payment import Payment, PaymentStatus  # noqa: E402
+from app.models.property import Property, PropertyStatus  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.dashboard_service import compute_owner_summary  # noqa: E402
+from app.utils.security import verify_password  # noqa: E402
+
+TODAY = date(2026, 10, 1)
+
+
+def _engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def _foreign_keys(dbapi_connection, _):
+        # Vérifie que les lots sont écrits dans l'ordre des dépendances
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    return engine
+
+
+def _config(**overrides):
+    values = dict(landlords=3, properties_per_landlord=20, history_depth=2, notifications_per_landlord=10,
+                  notifications_per_tenant=2, seed=7, today=TODAY, batch_size=97)
+    values.update(overrides)
+    return synthetic_data.SyntheticConfig(**values)
+
+
+@pytest.fixture(autouse=True)
+def fast_bcrypt(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+
+
+def _snapshot(engine):
+    with engine.connect() as conn:
+        return {
+            "users": conn.execute(select(User.email, User.last_name, User.unread_notification_count).order_by(User.id)).all(),
+            "payments": conn.execute(
+                select(Payment.lease_id, Payment.due_date, Payment.amount, Payment.status, Payment.payment_date).order_by(Payment.id)
+            ).all(),
+            "leases": conn.execute(select(Lease.property_id, Lease.tenant_id, Lease.start_date, Lease.status).order_by(Lease.id)).all(),
+        }
+
+
+def test_generator_is_consistent_and_counts_match_tables():
+    engine = _engine()
+    counts = synthetic_data.generate(engine, _config())
+    with Session(bind=engine) as db:
+        for model in synthetic_data.TABLES:
+            assert db.scalar(select(func.count()).select_from(model)) == counts[model.__tablename__]
+        assert counts["properties"] == 60 and counts["leases"] >= 120
+
+        # Un bail actif par bien occupé, aucun sur les autres
+        active = db.scalar(select(func.count()).select_from(Lease).where(Lease.status == LeaseStatus.ACTIVE))
+        occupied = db.scalar(select(func.count()).select_from(Property).where(Property.status == PropertyStatus.OCCUPIED))
+        assert active == occupied
+        # Échéances futures en attente, passées selon le mélange de statuts
+        assert not db.scalar(select(func.count()).select_from(Payment).where(
+            Payment.due_date > TODAY, Payment.status != PaymentStatus.PENDING))
+        statuses = set(db.scalars(select(Payment.status).where(Payment.due_date <= TODAY).distinct()))
+        assert PaymentStatus.PAID in statuses and PaymentStatus.LATE in statuses
+
+        # Compteurs de non-lus alignés sur les notifications insérées en masse
+        unread = dict(db.execute(
+            select(Notification.user_id, func.count()).where(Notification.is_read.is_(False)).group_by(Notification.user_id)
+        ).all())
+        for user in db.scalars(select(User)):
+            assert user.unread_notification_count == unread.get(user.id, 0)
+
+        landlord = db.execute(select(User).where(User.email == "landlord1@synthetic.locatus.com")).scalar_one()
+        assert verify_password(synthetic_data.LANDLORD_PASSWORD, landlord.hashed_password)
+        summary = compute_owner_summary(db, landlord.id, today=TODAY)
+        assert summary.properties_total == 20
+    engine.dispose()
+
+
+def test_generator_is_deterministic_for_a_seed():
+    first, second, other = _engine(), _engine(), _engine()
+    synthetic_data.generate(first, _config())
+    synthetic_data.generate(second, _config(batch_size=1000))
+    synthetic_data.generate(other, _config(seed=8))
+    assert _snapshot(first) == _snapshot(second)
+    assert _snapshot(first)["payments"] != _snapshot(other)["payments"]
+
+    # Base déjà peuplée : refus, sauf après reset
+    with pytest.raises(ValueError):
+        synthetic_data.generate(first, _config())
+    synthetic_data.reset(first)
+    synthetic_data.generate(first, _config())
+    assert _snapshot(first) == _snapshot(second)
+    for engine in (first, second, other):
+        engine.dispose()
+
+
+def test_status_mix_parsing():
+    assert synthetic_data.parse_status_mix("paid=0.8, late=0.2") == {PaymentStatus.PAID: 0.8, PaymentStatus.LATE: 0.2}
+    with pytest.raises(ValueError):
+        synthetic_data.parse_status_mix("unknown=1")
@@ -0,0 +1,103 @@
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.api import auth, tenants  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+from app.utils.user_cache import CachedUser, InMemoryUserCache, get_user_cache  # noqa: E402
+
+
+def _identity(user_id: int, email: str) -> CachedUser:
+    return CachedUser(
+        id=user_id, email=email, first_name="A", last_name="B", phone=None, role=UserRole.LANDLORD, is_active=True
+    )
+
+
+def test_in_memory_cache_is_bounded_and_expires():
+    cache = InMemoryUserCache(max_size=2, ttl_seconds=0.05)
+    cache.set("a", _identity(1, "a"))
+    cache.set("b", _identity(2, "b"))
+    assert cache.get("a").id == 1  # "a" devient le plus récent
+    cache.set("c", _identity(3, "c"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+
+@pytest.fixture()
+def client():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    owner = User(email="owner@example.com", hashed_password="x", first_name="O", last_name="W", role=UserRole.LANDLORD)
+    tenant_user = User(email="t@example.com", hashed_password="x", first_name="T", last_name="U", role=UserRole.TENANT)
+    db.add_all([owner, tenant_user])
+    db.flush()
+    db.add(Tenant(user_id=tenant_user.id))
+    db.commit()
+    db.close()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.include_router(tenants.router, prefix="/api")
+    app.dependency_overrides[get_db] = override
+    get_user_cache().clear()
+    yield TestClient(app), statements
+    get_user_cache().clear()
+    engine.dispose()
+
+
+def test_authenticated_user_is_served_from_cache(client):
+    http, statements = client
+    headers = {"Authorization": f"Bearer {create_access_token('owner@example.com', claims={'uid': 1, 'role': 'landlord'})}"}
+
+    assert http.get("/api/auth/me", headers=headers).json()["email"] == "owner@example.com"
+    assert any("FROM users" in sql for sql in statements)
+
+    statements.clear()
+    assert http.get("/api/auth/me", headers=headers).status_code == 200
+    assert statements == []
+
+
+def test_token_for_another_user_id_bypasses_cache(client):
+    http, _ = client
+    get_user_cache().set("owner@example.com", _identity(99, "owner@example.com"))
+    headers = {"Authorization": f"Bearer {create_access_token('owner@example.com', claims={'uid': 1})}"}
+    assert http.get("/api/auth/me", headers=headers).json()["id"] == 1
+
+
+def test_tenant_update_invalidates_cached_identity(client):
+    http, _ = client
+    tenant_headers = {"Authorization": f"Bearer {create_access_token('t@example.com')}"}
+    owner_headers = {"Authorization": f"Bearer {create_access_token('owner@example.com')}"}
+    assert http.get("/api/auth/me", headers=tenant_headers).json()["first_name"] == "T"
+    assert get_user_cache().get("t@example.com") is not None
+
+    response = http.put("/api/tenants/1", json={"first_name": "Tom"}, headers=owner_headers)
+    assert response.status_code == 200, response.text
+    assert get_user_cache().get("t@example.com") is None
+    assert http.get("/api/auth/me", headers=tenant_headers).json()["first_name"] == "Tom"
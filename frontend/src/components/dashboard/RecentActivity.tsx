@@ -4,7 +4,7 @@ import { cn } from "@/lib/utils";
 import { Payment } from "@/types/api";
 
 interface RecentActivityProps {
-  payments: Payment[];
+  payments: Pick<Payment, "id" | "lease_id" | "amount" | "due_date" | "payment_date" | "status">[];
   loading?: boolean;
 }
 
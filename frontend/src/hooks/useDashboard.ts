@@ -0,0 +1,50 @@
+import { useQuery } from "@tanstack/react-query";
+import api from "@/lib/api";
+import { PaymentStatus } from "@/types/api";
+
+export interface DashboardPayment {
+  id: number;
+  lease_id: number;
+  amount: number;
+  due_date: string;
+  payment_date?: string | null;
+  status: PaymentStatus;
+  property_title: string;
+  property_city: string;
+}
+
+export interface DashboardSummary {
+  generated_at: string;
+  today: string;
+  month: string;
+  properties_total: number;
+  properties_by_status: Record<string, number>;
+  properties_by_type: Record<string, number>;
+  occupancy_rate: number;
+  active_leases: number;
+  active_tenants: number;
+  monthly_rent_roll: number;
+  expected_this_month: number;
+  collected_this_month: number;
+  collection_rate: number;
+  late_count: number;
+  late_amount: number;
+  upcoming_days: number;
+  upcoming_count: number;
+  upcoming_amount: number;
+  open_maintenance: Record<string, number>;
+  open_maintenance_total: number;
+  revenue_trend: { month: string; collected: number }[];
+  upcoming_payments: DashboardPayment[];
+  recent_payments: DashboardPayment[];
+}
+
+export function useDashboardSummary() {
+  return useQuery({
+    queryKey: ["dashboard", "summary"],
+    queryFn: async () => {
+      const { data } = await api.get<DashboardSummary>("/dashboard/summary");
+      return data;
+    },
+  });
+}
@@ -14,6 +14,8 @@ export interface LeaseReminder {
   status: string;
   days_until_end: number | null;
   rent_amount?: number;
+  payment_id?: number | null;
+  amount_due?: number;
   pay_url?: string;
 }
 
@@ -204,12 +204,17 @@ export default function Relances() {
   const [selectedPayment, setSelectedPayment] = useState<PaymentReminder | null>(null);
 
   const sendReminder = async (reminder: LeaseReminder) => {
-    const subject = applyTemplate(subjectTemplate, reminder);
-    const html = applyTemplate(htmlTemplate, reminder);
-    const plain = stripHtml(html);
-
     try {
       setSendingId(reminder.lease_id);
+      // Lien Stripe créé à la demande, uniquement pour le bail relancé
+      const { data: checkout } = await api.post<{ url: string }>(
+        `/reminders/leases/${reminder.lease_id}/checkout`
+      );
+      const withLink = { ...reminder, pay_url: checkout.url };
+      const subject = applyTemplate(subjectTemplate, withLink);
+      const html = applyTemplate(htmlTemplate, withLink);
+      const plain = stripHtml(html);
+
       await api.post(`/reminders/leases/${reminder.lease_id}/send`, {
         subject,
         html_content: html,